@@ -0,0 +1,124 @@
+"""
+Latency and throughput of get_user with the process-wide pooled client, compared with opening a client for
+each request. The stub auth ASGI app is served over local TCP by a minimal HTTP/1.1 server, so the cost of
+opening the connections is measured.
+
+    python -m benchmarks.bench_auth_client [requests] [concurrency]
+"""
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+from fastapi import FastAPI
+from fastapi.security import SecurityScopes
+
+from rolf_common.backend.http_client import HttpClientManager, set_auth_client
+from rolf_common.services import user
+from rolf_common.services.user import get_user
+
+
+def build_auth_app() -> FastAPI:
+    app = FastAPI()
+    user_id = str(uuid.uuid4())
+
+    @app.post("/validate/auth")
+    async def validate(payload: dict):
+        return {"userId": user_id}
+
+    return app
+
+
+async def serve(app, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Serve keep-alive HTTP/1.1 requests of one connection with the ASGI app."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+            method, target, _ = request_line.split(" ", 2)
+            headers = [line.split(":", 1) for line in header_lines]
+            headers = [(key.strip().lower().encode(), value.strip().encode()) for key, value in headers]
+            length = int(dict(headers).get(b"content-length", b"0"))
+            body = await reader.readexactly(length) if length else b""
+
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+                "scheme": "http", "path": target.split("?")[0], "raw_path": target.encode(),
+                "query_string": b"", "headers": headers, "server": ("127.0.0.1", 0), "client": ("127.0.0.1", 0),
+            }
+            response = {}
+
+            async def receive():
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    response.update(message)
+                elif message["type"] == "http.response.body":
+                    response.setdefault("body", b"")
+                    response["body"] += message.get("body", b"")
+
+            await app(scope, receive, send)
+
+            data = response.get("body", b"")
+            lines = [f"HTTP/1.1 {response['status']} OK".encode()]
+            lines += [key + b": " + value for key, value in response.get("headers", []) if key != b"content-length"]
+            lines += [b"content-length: " + str(len(data)).encode(), b"connection: keep-alive"]
+            writer.write(b"\r\n".join(lines) + b"\r\n\r\n" + data)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run(requests: int, concurrency: int) -> tuple[list[float], float]:
+    latencies = []
+    scopes = SecurityScopes(["books:read"])
+
+    async def call():
+        start = time.perf_counter()
+        await get_user(scopes, token="token")
+        latencies.append(time.perf_counter() - start)
+
+    for _ in range(requests):
+        await call()
+
+    start = time.perf_counter()
+    for _ in range(requests // concurrency):
+        await asyncio.gather(*(call() for _ in range(concurrency)))
+    throughput = (requests // concurrency) * concurrency / (time.perf_counter() - start)
+
+    return latencies[:requests], throughput
+
+
+async def main(requests: int, concurrency: int) -> None:
+    app = build_auth_app()
+    server = await asyncio.start_server(lambda r, w: serve(app, r, w), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    user.auth_service_base_url = f"http://127.0.0.1:{port}"
+
+    async with server:
+        for name in ("per-request", "pooled"):
+            client = None
+            if name == "pooled":
+                client = HttpClientManager(max_connections=concurrency, max_keepalive_connections=concurrency)
+                await client.initialize()
+            set_auth_client(client)
+
+            latencies, throughput = await run(requests, concurrency)
+
+            if client is not None:
+                await client.close()
+            set_auth_client(None)
+
+            latencies.sort()
+            print(f"{name:<12} p50 {statistics.median(latencies) * 1000:6.2f} ms  "
+                  f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:6.2f} ms  "
+                  f"{throughput:8,.0f} requests/sec ({concurrency} concurrent)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 20))
@@ -0,0 +1,56 @@
+"""
+Throughput (rows/sec) of bulk_load compared with add_all and upsert_all.
+
+    python -m benchmarks.bench_bulk_load [database_url] [rows]
+
+Default database is an in-memory SQLite, use a postgresql+asyncpg url to measure the COPY path.
+"""
+import asyncio
+import sys
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from rolf_common.managers import BaseDataManager
+from rolf_common.models.base import SQLModel
+from rolf_common.models.tests.dummy import DummyModel
+
+
+def rows(total: int):
+    for i in range(total):
+        yield {"name": f"Bench {i}", "description": "x" * 50}
+
+
+async def main(url: str, total: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def add_all(manager):
+        await manager.add_all([DummyModel(**i) for i in rows(total)], refresh_response=False)
+
+    async def upsert_all(manager):
+        await manager.upsert_all(DummyModel, list(rows(total)), returning=False)
+
+    async def bulk_load(manager):
+        await manager.bulk_load(DummyModel, rows(total))
+
+    for name, function in (("add_all", add_all), ("upsert_all", upsert_all), ("bulk_load", bulk_load)):
+        async with session_maker() as session:
+            start = time.perf_counter()
+            await function(BaseDataManager(session))
+            await session.commit()
+            elapsed = time.perf_counter() - start
+
+        print(f"{name:<12} {total:>8} rows  {elapsed:8.3f}s  {total / elapsed:12,.0f} rows/sec")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    database_url = sys.argv[1] if len(sys.argv) > 1 else "sqlite+aiosqlite:///:memory:"
+    row_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    asyncio.run(main(database_url, row_count))
@@ -0,0 +1,88 @@
+"""
+Time and peak memory to fetch and aggregate rows with get_all (one RowMapping per row, aggregated in Python)
+compared with the columnar export (Arrow record batches aggregated with pyarrow.compute). Requires rolf_common[arrow].
+
+    python -m benchmarks.bench_columnar [database_url] [rows]
+
+Default database is a SQLite file in a temporary directory, use a postgresql+asyncpg url to measure a server.
+Python memory is measured with tracemalloc, the Arrow buffers with the growth of the Arrow memory pool peak.
+"""
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from rolf_common.managers import BaseDataManager
+from rolf_common.models.base import SQLModel
+from rolf_common.models.tests.dummy import DummyModel
+
+STATEMENT = select(DummyModel.id, DummyModel.name, DummyModel.description, DummyModel.active, DummyModel.created_at)
+
+
+def rows(total: int):
+    for i in range(total):
+        yield {"name": f"Bench {i}", "description": f"Group {i % 20}" if i % 10 else None, "active": i % 3 != 0}
+
+
+async def row_path(manager: BaseDataManager) -> tuple[int, int, int]:
+    items = [dict(i) for i in await manager.get_all(STATEMENT)]
+    groups = Counter(i["description"] for i in items if i["description"] is not None)
+    return len(items), sum(1 for i in items if i["active"]), len(groups)
+
+
+async def columnar_path(manager: BaseDataManager) -> tuple[int, int, int]:
+    table = await manager.get_arrow(STATEMENT)
+    groups = table.group_by("description").aggregate([("id", "count")]).drop_null()
+    return table.num_rows, pc.sum(table.column("active")).as_py(), groups.num_rows
+
+
+async def measure(session_maker, path) -> tuple[float, float, float, tuple]:
+    pool = pa.default_memory_pool()
+    arrow_before = pool.max_memory() or 0
+    async with session_maker() as session:
+        start = time.perf_counter()
+        result = await path(BaseDataManager(session))
+        elapsed = time.perf_counter() - start
+    arrow_peak = max((pool.max_memory() or 0) - arrow_before, 0)
+
+    # Memory is measured in a second run, since tracemalloc slows down the allocations
+    async with session_maker() as session:
+        tracemalloc.start()
+        await path(BaseDataManager(session))
+        _, python_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return elapsed, python_peak / 2 ** 20, arrow_peak / 2 ** 20, result
+
+
+async def main(url: str, total: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as session:
+        await BaseDataManager(session).bulk_load(DummyModel, rows(total))
+        await session.commit()
+
+    for name, path in (("get_all", row_path), ("arrow", columnar_path)):
+        elapsed, python_peak, arrow_peak, result = await measure(session_maker, path)
+        print(f"{name:<8} {elapsed:7.3f}s {total / elapsed:10.0f} rows/s  "
+              f"python peak {python_peak:7.1f} MiB  arrow peak {arrow_peak:6.1f} MiB  result {result}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}"
+        asyncio.run(main(database_url, int(sys.argv[2]) if len(sys.argv) > 2 else 200000))
@@ -0,0 +1,98 @@
+"""
+Throughput and peak memory of LogsMiddleware compared with the previous BaseHTTPMiddleware implementation,
+using an in-process ASGI client.
+
+    python -m benchmarks.bench_logs_middleware [requests] [download_mb]
+"""
+import asyncio
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from rolf_common import base_middleware
+from rolf_common.base_middleware import LogsMiddleware
+
+
+class LegacyLogsMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, buffering the whole request and response bodies."""
+
+    async def dispatch(self, request: Request, call_next):
+        body = await request.body()
+        body = json.loads(body.decode("utf-8")) if body else None
+
+        response: Response = await call_next(request)
+        response_body = b"".join([chunk async for chunk in response.body_iterator])
+
+        response_message = {
+            'path': request.scope.get('path'),
+            'url': str(request.url),
+            'method': request.method,
+            'request_body': body,
+            'request_headers': dict(request.headers),
+            'status_code': response.status_code,
+            'response_headers': dict(response.headers),
+            'response_body': response_body.decode('utf-8'),
+        }
+        logging.getLogger("bench").info(json.dumps(response_message), extra={'is_request': True})
+
+        return StreamingResponse(iter([response_body]), status_code=response.status_code,
+                                 headers=dict(response.headers))
+
+
+def build_app(middleware, download_size: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware)
+
+    @app.post("/items")
+    async def create_item(payload: dict):
+        return payload
+
+    @app.get("/download")
+    async def download():
+        async def chunks():
+            for _ in range(download_size // 65536):
+                yield b"x" * 65536
+
+        return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+    return app
+
+
+async def download_peak(client) -> int:
+    tracemalloc.start()
+    async with client.stream("GET", "/download") as response:
+        async for _ in response.aiter_raw():
+            pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+async def main(requests: int, download_mb: int) -> None:
+    base_middleware.get_logger = lambda: logging.getLogger("bench")
+
+    for name, middleware in (("legacy", LegacyLogsMiddleware), ("asgi", LogsMiddleware)):
+        app = build_app(middleware, download_mb * 1024 * 1024)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            for i in range(requests):
+                await client.post("/items", json={"name": f"Item {i}", "tags": ["a", "b"]})
+            elapsed = time.perf_counter() - start
+
+            peak = await download_peak(client)
+
+        print(f"{name:<7} {requests / elapsed:10,.0f} requests/sec  "
+              f"{download_mb} MB download peak memory {peak / 1024 / 1024:8.2f} MB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 32))
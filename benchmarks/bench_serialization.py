@@ -0,0 +1,64 @@
+"""
+Time to serialize a list of models into a JSON response body, compared with the current path:
+pydantic validation (from_attributes) + jsonable_encoder + JSONResponse.
+
+    python -m benchmarks.bench_serialization [rows] [repeat]
+"""
+import datetime
+import sys
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import ConfigDict
+
+from rolf_common.models.tests.dummy import DummyModel
+from rolf_common.schemas.base import DefaultModel
+from rolf_common.util import serialization
+from rolf_common.util.serialization import FastJSONResponse, dumps, project_rows
+
+
+class DummySchema(DefaultModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: uuid.UUID
+    name: str
+    description: str | None
+    active: bool
+    created_at: datetime.datetime
+    created_by: uuid.UUID | None
+
+
+def current_path(rows):
+    data = [DummySchema.model_validate(i) for i in rows]
+    return JSONResponse(jsonable_encoder({"success": True, "data": data}, by_alias=True)).body
+
+
+def fast_path(rows):
+    return FastJSONResponse({"success": True, "data": project_rows(rows, DummySchema)}).body
+
+
+def fast_path_orjson(rows):
+    return dumps({"success": True, "data": project_rows(rows, DummySchema)}, backend="orjson")
+
+
+def main(total: int, repeat: int) -> None:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    rows = [DummyModel(id=uuid.uuid4(), name=f"Bench {i}", description="x" * 30, active=True, created_at=now)
+            for i in range(total)]
+
+    paths = [("current", current_path), ("fast", fast_path)]
+    if serialization.orjson is not None:
+        paths.append(("fast orjson", fast_path_orjson))
+
+    for name, function in paths:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function(rows)
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{name:<12} {total:>7} rows  {elapsed * 1000:9.2f} ms/response  {total / elapsed:12,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000, int(sys.argv[2]) if len(sys.argv) > 2 else 10)
@@ -0,0 +1,47 @@
+"""
+Calls per second of get_by_id using the prebuilt statements, compared with building the statement on every call.
+
+    python -m benchmarks.bench_statement_cache [calls]
+"""
+import asyncio
+import sys
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from rolf_common.managers import BaseDataManager
+from rolf_common.models.base import SQLModel
+from rolf_common.models.tests.dummy import DummyModel
+
+
+async def main(calls: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        manager = BaseDataManager(session)
+        objects = await manager.add_all([DummyModel(name=f"Bench {i}") for i in range(100)])
+        ids = [i.id for i in objects]
+        await session.commit()
+
+        async def rebuilt(object_id):
+            return await manager.get_only_one(select(DummyModel).where(DummyModel.id == object_id))
+
+        async def prebuilt(object_id):
+            return await manager.get_by_id(DummyModel, object_id)
+
+        for name, function in (("rebuilt", rebuilt), ("prebuilt", prebuilt)):
+            start = time.perf_counter()
+            for i in range(calls):
+                await function(ids[i % len(ids)])
+            elapsed = time.perf_counter() - start
+            print(f"{name:<10} {calls:>8} calls  {elapsed:8.3f}s  {calls / elapsed:10,.0f} calls/sec")
+
+    print("statement cache:", BaseDataManager.statement_cache.stats())
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
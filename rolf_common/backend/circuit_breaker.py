@@ -0,0 +1,108 @@
+import time
+from typing import Any
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Stop calling a remote service that is failing or slow, so the callers fail fast (or use a fallback)
+        instead of waiting for it on every request.
+
+        closed: calls are allowed, failure_threshold consecutive failures (errors or calls slower than
+        slow_call_duration) open the circuit.
+        open: calls are rejected, after reset_timeout the circuit is half open.
+        half_open: up to half_open_max_calls trial calls are allowed, a success closes the circuit and
+        a failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 slow_call_duration: float | None = 1.0, half_open_max_calls: int = 1) -> None:
+        """
+        :param failure_threshold: Number of consecutive failures that open the circuit
+        :param reset_timeout: Time, in seconds, the circuit stays open before the trial calls
+        :param slow_call_duration: Calls that take longer than this, in seconds, count as failures, None to disable
+        :param half_open_max_calls: Number of trial calls allowed while half open
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.slow_call_duration = slow_call_duration
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = CLOSED
+        self._changed_at = time.monotonic()
+        self._failures = 0
+        self._half_open_calls = 0
+
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._changed_at >= self.reset_timeout:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        self._changed_at = time.monotonic()
+        self._failures = 0
+        self._half_open_calls = 0
+        if state == OPEN:
+            self.opened += 1
+
+    def allow_request(self) -> bool:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Whether a call can be made now, the result of an allowed call must be recorded
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+
+        if state == HALF_OPEN:
+            # a trial call without result (e.g. cancelled) does not keep the circuit half open forever
+            if time.monotonic() - self._changed_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+
+        self.rejected += 1
+        return False
+
+    def record_success(self, duration: float = 0.0) -> None:
+        if self.slow_call_duration is not None and duration >= self.slow_call_duration:
+            self.record_failure()
+            return
+
+        self.successes += 1
+        if self._state == HALF_OPEN:
+            self._set_state(CLOSED)
+        else:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state == HALF_OPEN:
+            self._set_state(OPEN)
+            return
+
+        self._failures += 1
+        if self._state == CLOSED and self._failures >= self.failure_threshold:
+            self._set_state(OPEN)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'state': self.state,
+            'successes': self.successes,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'opened': self.opened,
+        }
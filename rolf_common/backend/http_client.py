@@ -0,0 +1,140 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from rolf_common.backend.settings import settings
+from rolf_common.backend.circuit_breaker import CircuitBreaker
+
+
+class HttpClientManager:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Keep one httpx.AsyncClient for the whole process, so the connections (and TLS sessions) are reused
+        between requests instead of opened on every call.
+
+        Open and close it with the FastAPI lifespan, e.g. FastAPI(lifespan=manager.lifespan).
+        Only connection failures are retried (by the transport), so a request is never sent twice.
+        The circuit breaker, if given, is used by the callers to stop calling the service while it fails.
+    """
+
+    def __init__(self, base_url: str = '', max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, http2: bool = False, timeout: float = 5.0,
+                 connect_timeout: float = 2.0, retries: int = 2,
+                 transport: httpx.AsyncBaseTransport | None = None, breaker: CircuitBreaker | None = None):
+        """
+        :param base_url: Base url of the requests
+        :param max_connections: Max number of connections open at the same time
+        :param max_keepalive_connections: Max number of idle connections kept open
+        :param keepalive_expiry: Time, in seconds, an idle connection is kept open
+        :param http2: Whether HTTP/2 is used (requires rolf_common[http2])
+        :param timeout: Read, write and pool timeout, in seconds
+        :param connect_timeout: Connect timeout, in seconds
+        :param retries: Max number of retries when the connection fails
+        :param transport: Transport used instead of the pooled one, e.g. an httpx.ASGITransport in tests
+        :param breaker: Circuit breaker of the service
+        """
+        self.base_url = base_url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.retries = retries
+        self.transport = transport
+        self.breaker = breaker
+        self._client: httpx.AsyncClient | None = None
+
+    async def initialize(self) -> None:
+        if self._client is None:
+            transport = self.transport or httpx.AsyncHTTPTransport(
+                limits=self.limits, http2=self.http2, retries=self.retries
+            )
+            self._client = httpx.AsyncClient(base_url=self.base_url, transport=transport, timeout=self.timeout)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError('HTTP client is not initialized')
+        return self._client
+
+    @asynccontextmanager
+    async def lifespan(self, app=None) -> AsyncIterator[None]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Open the client when the application starts and close it when it stops
+        """
+        await self.initialize()
+        try:
+            yield
+        finally:
+            await self.close()
+
+
+_auth_client: HttpClientManager | None = None
+
+
+def set_auth_client(client: HttpClientManager | None):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Create a global variable to store the client used to call the auth service
+    """
+    global _auth_client
+    _auth_client = client
+
+
+def get_auth_client() -> HttpClientManager | None:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Get the client used to call the auth service, None if it was not set
+    """
+    return _auth_client
+
+
+def build_auth_client() -> HttpClientManager:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Build the auth service client with the settings
+    """
+    return HttpClientManager(
+        base_url=settings.auth_service_base_url,
+        max_connections=settings.auth_client_max_connections,
+        max_keepalive_connections=settings.auth_client_max_keepalive_connections,
+        keepalive_expiry=settings.auth_client_keepalive_expiry,
+        http2=settings.auth_client_http2,
+        timeout=settings.auth_client_timeout,
+        connect_timeout=settings.auth_client_connect_timeout,
+        retries=settings.auth_client_retries,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.auth_breaker_failure_threshold,
+            reset_timeout=settings.auth_breaker_reset_timeout,
+            slow_call_duration=settings.auth_breaker_slow_call_duration,
+        ) if settings.auth_breaker_enabled else None,
+    )
+
+
+@asynccontextmanager
+async def auth_client_lifespan(app=None) -> AsyncIterator[None]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        FastAPI lifespan that opens the auth service client used by get_user,
+        e.g. FastAPI(lifespan=auth_client_lifespan)
+    """
+    client = build_auth_client()
+    async with client.lifespan(app):
+        set_auth_client(client)
+        try:
+            yield
+        finally:
+            set_auth_client(None)
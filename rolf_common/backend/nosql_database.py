@@ -1,20 +1,49 @@
+import asyncio
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import CollectionInvalid, OperationFailure
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from rolf_common.backend.nosql_pool import MongoPoolConfig, MongoPoolMonitor
 from rolf_common.backend.settings import settings
 
+# The index already exists with other options, e.g. another TTL
+INDEX_OPTIONS_CONFLICT = 85
+
 class NoSqlDatabaseSessionManager:
-    def __init__(self, host: str, db_name: str):
+    def __init__(self, host: str, db_name: str, pool_config: MongoPoolConfig | None = None,
+                 monitor: MongoPoolMonitor | None = None):
+        """
+        :param host: The MongoDB uri
+        :param db_name: The database name
+        :param pool_config: The connection pool and client options, default uses the driver defaults
+        :param monitor: Listener that keeps the pool and command metrics, see MongoPoolMonitor.stats
+        """
         self._uri = host
         self._db_name = db_name
+        self.pool_config = pool_config
+        self.monitor = monitor
         self._client = None
 
     async def initialize(self):
         if self._client is None:
-            self._client = AsyncIOMotorClient(self._uri)
+            options = self.pool_config.client_options() if self.pool_config else {}
+            if self.monitor is not None:
+                options['event_listeners'] = [self.monitor]
+            self._client = AsyncIOMotorClient(self._uri, **options)
+
+            if self.pool_config and self.pool_config.prewarm_connections:
+                await self._prewarm(self.pool_config.prewarm_connections)
+
+    async def _prewarm(self, connections: int):
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Open the connections with concurrent pings, each one needs its own connection
+        """
+        await asyncio.gather(*(self._client.admin.command('ping') for _ in range(connections)))
 
     async def close(self):
         if self._client:
@@ -34,6 +63,83 @@ class NoSqlDatabaseSessionManager:
         finally:
             pass
 
+    async def ensure_collection(self, name: str, time_field: str | None = None, timeseries: bool = True,
+                                meta_field: str | None = None, granularity: str = 'seconds',
+                                expire_after_seconds: int | None = None,
+                                indexes: list[IndexModel] | None = None) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Create the collection and its indexes if they don't exist yet, safe to be called on every startup.
+
+            With a time_field the collection is a time-series collection on it, with the expiry set in the
+            collection itself. If timeseries is False, a plain collection is used and the expiry is a TTL index on
+            the time_field. When the collection or the TTL index already exist, the expiry is updated with collMod,
+            or removed if expire_after_seconds is None.
+
+            A plain collection that already exists (e.g. created before the time-series collections were used)
+            can't be converted in place, so it keeps the TTL index expiry. To use a time-series collection,
+            rename it and copy the documents to the new collection.
+
+        :param name: The collection name
+        :param time_field: The datetime field of the documents, required for time-series and expiry
+        :param timeseries: Whether a time-series collection is created
+        :param meta_field: The time-series meta field, documents with the same value are stored together
+        :param granularity: The time-series granularity ('seconds', 'minutes' or 'hours')
+        :param expire_after_seconds: Time the documents are kept, None to keep forever
+        :param indexes: The indexes of the collection, the ones that already exist are left as they are
+        """
+        if time_field is None and (timeseries or expire_after_seconds is not None):
+            if expire_after_seconds is not None:
+                raise ValueError('The expiry of a collection requires a time_field')
+            timeseries = False
+
+        async with self.session() as db:
+            cursor = await db.list_collections(filter={'name': name})
+            collections = await cursor.to_list(length=None)
+            # The options the collection was created with, None if it does not exist
+            options = collections[0].get('options', {}) if collections else None
+
+            if timeseries and options is not None and 'timeseries' not in options:
+                # collMod expireAfterSeconds is rejected on collections that are not time-series (or clustered)
+                timeseries = False
+
+            if timeseries:
+                if options is None:
+                    options = {'timeseries': {'timeField': time_field, 'granularity': granularity}}
+                    if meta_field is not None:
+                        options['timeseries']['metaField'] = meta_field
+                    if expire_after_seconds is not None:
+                        options['expireAfterSeconds'] = expire_after_seconds
+                    try:
+                        await db.create_collection(name, **options)
+                    except CollectionInvalid:
+                        # created by another instance in the meantime
+                        pass
+                elif options.get('expireAfterSeconds') != expire_after_seconds:
+                    await db.command('collMod', name, expireAfterSeconds=(
+                        'off' if expire_after_seconds is None else expire_after_seconds
+                    ))
+
+            elif expire_after_seconds is not None:
+                ttl_index = IndexModel([(time_field, ASCENDING)], expireAfterSeconds=expire_after_seconds)
+                try:
+                    await db[name].create_indexes([ttl_index])
+                except OperationFailure as e:
+                    if e.code != INDEX_OPTIONS_CONFLICT:
+                        raise
+                    await db.command(
+                        'collMod', name, index={'keyPattern': {time_field: 1}, 'expireAfterSeconds': expire_after_seconds}
+                    )
+
+            elif options is not None and time_field is not None:
+                # Keep forever, remove the TTL index of a previous expiry
+                for index_name, index in (await db[name].index_information()).items():
+                    if index.get('key') == [(time_field, ASCENDING)] and 'expireAfterSeconds' in index:
+                        await db[name].drop_index(index_name)
+
+            if indexes:
+                await db[name].create_indexes(indexes)
+
 
 _db_connection: NoSqlDatabaseSessionManager | None = None
 
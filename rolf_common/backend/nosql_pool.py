@@ -0,0 +1,189 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+from pymongo import monitoring
+
+
+@dataclass(frozen=True)
+class MongoPoolConfig:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Connection pool and client options of NoSqlDatabaseSessionManager, None keeps the driver default.
+        E.g. a log-heavy service can use a bigger pool, w=0 or w=1 without journal, and zstd/zlib compression.
+    """
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    max_idle_time_ms: int | None = None
+    max_connecting: int = 2
+    wait_queue_timeout_ms: int | None = None
+    connect_timeout_ms: int | None = None
+    server_selection_timeout_ms: int | None = None
+    compressors: tuple[str, ...] | None = None
+    read_preference: str | None = None
+    write_concern_w: int | str | None = None
+    journal: bool | None = None
+    app_name: str | None = None
+    # Number of connections opened by initialize, so the first requests don't pay for them
+    prewarm_connections: int = 0
+    extra_options: dict[str, Any] = field(default_factory=dict)
+
+    def client_options(self) -> dict[str, Any]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the keyword arguments of the MongoDB client
+        """
+        options = {
+            'maxPoolSize': self.max_pool_size,
+            'minPoolSize': self.min_pool_size,
+            'maxIdleTimeMS': self.max_idle_time_ms,
+            'maxConnecting': self.max_connecting,
+            'waitQueueTimeoutMS': self.wait_queue_timeout_ms,
+            'connectTimeoutMS': self.connect_timeout_ms,
+            'serverSelectionTimeoutMS': self.server_selection_timeout_ms,
+            'compressors': ','.join(self.compressors) if self.compressors else None,
+            'readPreference': self.read_preference,
+            'w': self.write_concern_w,
+            'journal': self.journal,
+            'appname': self.app_name,
+        }
+        options = {key: value for key, value in options.items() if value is not None}
+        options.update(self.extra_options)
+        return options
+
+
+class _Timing:
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def stats(self) -> dict[str, float]:
+        return {
+            'count': self.count,
+            'avg_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+        }
+
+
+class MongoPoolMonitor(monitoring.ConnectionPoolListener, monitoring.CommandListener):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Pool and command listener that keeps the pool pressure and the operation latency of a MongoDB client.
+
+        'waiting' is the number of operations waiting for a connection right now and 'checkout' the time they waited,
+        a growing wait with 'in_use' at max_pool_size means the pool is too small for the workload.
+        The listeners are called by the driver threads, so the counters are updated under a lock.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.open = 0
+            self.in_use = 0
+            self.waiting = 0
+            self.max_in_use = 0
+            self.max_waiting = 0
+            self.checkout_failed = 0
+            self.pool_cleared = 0
+            self.checkout = _Timing()
+            self.commands: dict[str, _Timing] = {}
+            self.command_failures: dict[str, int] = {}
+
+    # Connection pool events
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        with self._lock:
+            self.pool_cleared += 1
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        with self._lock:
+            self.open += 1
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event) -> None:
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def connection_check_out_failed(self, event) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failed += 1
+            if event.duration is not None:
+                self.checkout.add(event.duration)
+
+    def connection_checked_out(self, event) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            if event.duration is not None:
+                self.checkout.add(event.duration)
+
+    def connection_checked_in(self, event) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    # Command events
+    def started(self, event) -> None:
+        pass
+
+    def succeeded(self, event) -> None:
+        with self._lock:
+            self._command(event.command_name).add(event.duration_micros / 1_000_000)
+
+    def failed(self, event) -> None:
+        with self._lock:
+            self._command(event.command_name).add(event.duration_micros / 1_000_000)
+            self.command_failures[event.command_name] = self.command_failures.get(event.command_name, 0) + 1
+
+    def _command(self, name: str) -> _Timing:
+        timing = self.commands.get(name)
+        if timing is None:
+            timing = self.commands[name] = _Timing()
+        return timing
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'open': self.open,
+                'in_use': self.in_use,
+                'waiting': self.waiting,
+                'max_in_use': self.max_in_use,
+                'max_waiting': self.max_waiting,
+                'checkout': self.checkout.stats(),
+                'checkout_failed': self.checkout_failed,
+                'pool_cleared': self.pool_cleared,
+                'commands': {
+                    name: {**timing.stats(), 'failures': self.command_failures.get(name, 0)}
+                    for name, timing in self.commands.items()
+                },
+            }
@@ -9,6 +9,24 @@ class Settings(BaseSettings):
 
     # Microservice comm settings
     auth_service_base_url: str = 'http://localhost:8001'
+    auth_client_max_connections: int = 100
+    auth_client_max_keepalive_connections: int = 20
+    auth_client_keepalive_expiry: float = 30.0
+    auth_client_http2: bool = False
+    auth_client_timeout: float = 5.0
+    auth_client_connect_timeout: float = 2.0
+    auth_client_retries: int = 2
+    auth_breaker_enabled: bool = True
+    auth_breaker_failure_threshold: int = 5
+    auth_breaker_reset_timeout: float = 30.0
+    auth_breaker_slow_call_duration: float | None = 1.0
+
+    # Local token verification, see rolf_common.services.token_verifier
+    auth_verification_mode: str | None = None
+    auth_jwt_secret: str | None = None
+    auth_jwt_algorithms: list[str] = ['HS256']
+    auth_jwt_issuer: str | None = None
+    auth_jwt_audience: str | None = None
 
     log_database_name: str | None = None
     log_database_url: str | None = None
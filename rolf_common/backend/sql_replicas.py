@@ -0,0 +1,230 @@
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from rolf_common.backend.sql_database import SqlPoolConfig
+
+ROUND_ROBIN = 'round_robin'
+LEAST_LATENCY = 'least_latency'
+
+# Replication lag, in seconds, of a PostgreSQL standby (0 on a primary or when nothing was replayed yet)
+POSTGRES_LAG_QUERY = (
+    'SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)'
+)
+
+
+class Replica:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        A read replica of the primary database, with its health and latency as seen by ReplicaRouter.
+    """
+    __slots__ = ('url', 'engine', 'healthy', 'latency', 'lag', 'reads', 'failures', 'last_error')
+
+    def __init__(self, url: str, engine: AsyncEngine) -> None:
+        self.url = url
+        self.engine = engine
+        self.healthy = True
+        # Moving average of the read latency, in seconds, None until the first read or health check
+        self.latency: float | None = None
+        self.lag: float | None = None
+        self.reads = 0
+        self.failures = 0
+        self.last_error: str | None = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'healthy': self.healthy,
+            'latency_ms': self.latency * 1000 if self.latency is not None else None,
+            'lag': self.lag,
+            'reads': self.reads,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
+
+
+class ReplicaRouter:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Own the engines of the read replicas and choose the one used by each read of BaseDataManager.
+
+        The reads run in the same session as the writes, only bound to the replica engine, so the models
+        loaded belong to the session as usual. A session that has written (or has pending changes) reads from
+        the primary, so a request always sees its own writes.
+
+        check_health runs 'SELECT 1' (and lag_query, if given) on every replica: a replica that fails or
+        lags more than max_lag_seconds is ejected until a later check passes. A read that fails also ejects
+        the replica. When no replica is healthy the reads go to the primary.
+    """
+
+    def __init__(self, urls: Sequence[str], pool_config: SqlPoolConfig | None = None,
+                 strategy: str = ROUND_ROBIN, health_check_interval: float | None = 10.0,
+                 lag_query: str | None = None, max_lag_seconds: float | None = None,
+                 latency_smoothing: float = 0.2) -> None:
+        """
+        :param urls: The database urls of the replicas
+        :param pool_config: The connection pool options of each replica engine, default SqlPoolConfig()
+        :param strategy: ROUND_ROBIN or LEAST_LATENCY
+        :param health_check_interval: Time, in seconds, between the health checks, None to only check on initialize
+        :param lag_query: A query returning the replication lag in seconds, e.g. POSTGRES_LAG_QUERY
+        :param max_lag_seconds: Replicas lagging more than this are ejected, None to disable (requires lag_query)
+        :param latency_smoothing: Weight of the last sample in the latency moving average, from 0 to 1
+        """
+        if strategy not in (ROUND_ROBIN, LEAST_LATENCY):
+            raise ValueError(f'Unknown replica strategy {strategy}')
+        if max_lag_seconds is not None and lag_query is None:
+            raise ValueError('max_lag_seconds requires a lag_query')
+
+        self._urls = list(urls)
+        self.pool_config = pool_config or SqlPoolConfig()
+        self.strategy = strategy
+        self.health_check_interval = health_check_interval
+        self.lag_query = lag_query
+        self.max_lag_seconds = max_lag_seconds
+        self.latency_smoothing = latency_smoothing
+
+        self._replicas: list[Replica] = []
+        self._counter = itertools.count()
+        self._health_task: asyncio.Task | None = None
+
+    async def initialize(self):
+        if not self._replicas:
+            self._replicas = [
+                Replica(url, create_async_engine(url, **self.pool_config.engine_options(url))) for url in self._urls
+            ]
+            await self.check_health()
+
+            if self.health_check_interval:
+                self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        for replica in self._replicas:
+            await replica.engine.dispose()
+        self._replicas = []
+
+    @asynccontextmanager
+    async def lifespan(self, app=None) -> AsyncIterator[None]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Open the replica engines when the application starts and close them when it stops
+        """
+        await self.initialize()
+        try:
+            yield
+        finally:
+            await self.close()
+
+    @property
+    def replicas(self) -> list[Replica]:
+        return self._replicas
+
+    def choose(self) -> Replica | None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the replica used by the next read, None if no replica is healthy
+        """
+        healthy = [i for i in self._replicas if i.healthy]
+        if not healthy:
+            return None
+
+        if self.strategy == LEAST_LATENCY:
+            # Replicas without samples are tried first, so every replica gets a latency
+            return min(healthy, key=lambda i: -1.0 if i.latency is None else i.latency)
+
+        return healthy[next(self._counter) % len(healthy)]
+
+    def record_latency(self, replica: Replica, seconds: float) -> None:
+        replica.reads += 1
+        self._add_latency(replica, seconds)
+
+    def _add_latency(self, replica: Replica, seconds: float) -> None:
+        if replica.latency is None:
+            replica.latency = seconds
+        else:
+            replica.latency += self.latency_smoothing * (seconds - replica.latency)
+
+    def mark_failed(self, replica: Replica, error: BaseException | str) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Eject the replica until the next health check that passes
+        """
+        replica.healthy = False
+        replica.failures += 1
+        replica.last_error = str(error)
+
+    async def check_health(self) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Check all replicas at the same time, ejecting the failed or lagging ones and restoring the others
+        """
+        await asyncio.gather(*(self._check_replica(i) for i in self._replicas))
+
+    async def _check_replica(self, replica: Replica) -> None:
+        try:
+            start = time.perf_counter()
+            async with replica.engine.connect() as connection:
+                await connection.execute(text('SELECT 1'))
+                elapsed = time.perf_counter() - start
+                if self.lag_query is not None:
+                    lag = await connection.scalar(text(self.lag_query))
+                    replica.lag = float(lag) if lag is not None else None
+        except Exception as e:
+            self.mark_failed(replica, e)
+            return
+
+        if self.max_lag_seconds is not None and replica.lag is not None and replica.lag > self.max_lag_seconds:
+            self.mark_failed(replica, f'Replication lag of {replica.lag:.1f}s')
+            return
+
+        replica.healthy = True
+        replica.last_error = None
+        self._add_latency(replica, elapsed)
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            await self.check_health()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {i.url: i.stats() for i in self._replicas}
+
+
+def track_writes(session: AsyncSession, key: str) -> None:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Set session.info[key] when the session flushes or executes an INSERT, UPDATE or DELETE, so the writes
+        done without BaseDataManager (e.g. session.add followed by a flush or commit, or
+        session.execute(update(...)), that does not flush) also keep the next reads on the primary
+    """
+    sync_session = session.sync_session
+    if key in sync_session.info or event.contains(sync_session, 'after_flush', _mark_written):
+        return
+
+    sync_session.info['rolf_written_key'] = key
+    event.listen(sync_session, 'after_flush', _mark_written)
+    event.listen(sync_session, 'do_orm_execute', _mark_dml_written)
+
+
+def _mark_written(session, flush_context) -> None:
+    session.info[session.info['rolf_written_key']] = True
+
+
+def _mark_dml_written(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        session = orm_execute_state.session
+        session.info[session.info['rolf_written_key']] = True
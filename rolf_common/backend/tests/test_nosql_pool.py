@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+import pytest
+from pymongo import monitoring
+
+from rolf_common.backend.nosql_database import NoSqlDatabaseSessionManager
+from rolf_common.backend.nosql_pool import MongoPoolConfig, MongoPoolMonitor
+
+ADDRESS = ("localhost", 27017)
+
+
+def test_pool_config_client_options():
+    config = MongoPoolConfig(max_pool_size=50, min_pool_size=5, compressors=("zstd", "zlib"), write_concern_w=1)
+
+    assert config.client_options() == {
+        "maxPoolSize": 50,
+        "minPoolSize": 5,
+        "maxConnecting": 2,
+        "compressors": "zstd,zlib",
+        "w": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_manager_uses_pool_config_and_monitor():
+    monitor = MongoPoolMonitor()
+    manager = NoSqlDatabaseSessionManager(
+        "mongodb://localhost:27017", "test",
+        pool_config=MongoPoolConfig(max_pool_size=7, read_preference="secondaryPreferred"), monitor=monitor,
+    )
+    # the client connects lazily, no server is needed
+    await manager.initialize()
+    try:
+        options = manager._client.delegate.options
+        assert options.pool_options.max_pool_size == 7
+        assert options.read_preference.mongos_mode == "secondaryPreferred"
+        assert monitor in options.event_listeners
+    finally:
+        await manager.close()
+
+
+def test_monitor_pool_pressure():
+    monitor = MongoPoolMonitor()
+
+    for connection_id in (1, 2):
+        monitor.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, connection_id))
+        monitor.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+    monitor.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+    monitor.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, 0.001))
+    monitor.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 2, 0.003))
+
+    stats = monitor.stats()
+    assert stats["open"] == 2
+    assert stats["in_use"] == 2
+    # the third operation is waiting for a connection
+    assert stats["waiting"] == 1
+    assert stats["max_waiting"] == 3
+
+    monitor.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+    monitor.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(ADDRESS, monitoring.ConnectionCheckOutFailedReason.TIMEOUT, 0.5)
+    )
+
+    stats = monitor.stats()
+    assert stats["in_use"] == 1
+    assert stats["waiting"] == 0
+    assert stats["checkout_failed"] == 1
+    assert stats["checkout"] == {"count": 3, "avg_ms": pytest.approx(168.0), "max_ms": pytest.approx(500.0)}
+
+
+def test_monitor_command_latency():
+    monitor = MongoPoolMonitor()
+    monitor.succeeded(monitoring.CommandSucceededEvent(timedelta(milliseconds=1), {"ok": 1}, "insert", 1, ADDRESS, 1))
+    monitor.succeeded(monitoring.CommandSucceededEvent(timedelta(milliseconds=3), {"ok": 1}, "insert", 2, ADDRESS, 2))
+    monitor.failed(monitoring.CommandFailedEvent(timedelta(milliseconds=5), {"ok": 0}, "insert", 3, ADDRESS, 3))
+
+    assert monitor.stats()["commands"]["insert"] == {
+        "count": 3, "avg_ms": pytest.approx(3.0), "max_ms": pytest.approx(5.0), "failures": 1
+    }
@@ -1,39 +1,221 @@
 import json
+import random
+import time
+from typing import Iterable
+from urllib.parse import parse_qsl
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import StreamingResponse
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from rolf_common.backend.logger import get_logger
 
+REDACTED = '***'
+DEFAULT_REDACT_HEADERS = ('authorization', 'cookie', 'set-cookie', 'proxy-authorization', 'x-api-key')
+DEFAULT_REDACT_FIELDS = ('password', 'accesstoken', 'access_token', 'refreshtoken', 'refresh_token', 'token', 'secret')
 
-class LogsMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # TODO: add code in a try block
-        body = await request.body()
-        body = json.loads(body.decode("utf-8")) if body else None
 
-        response: Response = await call_next(request)
-        response_body = b"".join([chunk async for chunk in response.body_iterator])
+class RequestLogSampler:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
 
-        response_message = {
+        Decide which requests are logged.
+
+        The head decision is made when the request starts, using the rate of the longest matching path prefix
+        (or default_rate), so the bodies of requests not sampled are not even captured.
+        When the response ends, errors and slow requests are always kept, and the sampled ones are filtered again
+        by the rate of their status class ('2xx', '4xx'...), if any.
+    """
+
+    def __init__(self, default_rate: float = 1.0,
+                 path_rates: dict[str, float] | None = None,
+                 status_rates: dict[str, float] | None = None,
+                 exclude_paths: Iterable[str] = ('/health',),
+                 slow_threshold_ms: float | None = 1000.0,
+                 always_keep_status: int = 500):
+        """
+        :param default_rate: Fraction of the requests logged, when no path rate matches
+        :param path_rates: Rate by path prefix, e.g. {'/books': 0.1}
+        :param status_rates: Rate by status class, e.g. {'2xx': 0.1}
+        :param exclude_paths: Path prefixes never logged, like health checks
+        :param slow_threshold_ms: Requests slower than this are always logged, None to disable
+        :param always_keep_status: Responses with this status code or higher are always logged
+        """
+        self.default_rate = default_rate
+        self.path_rates = sorted((path_rates or {}).items(), key=lambda i: len(i[0]), reverse=True)
+        self.status_rates = status_rates or {}
+        self.exclude_paths = tuple(exclude_paths)
+        self.slow_threshold_ms = slow_threshold_ms
+        self.always_keep_status = always_keep_status
+
+    def is_excluded(self, path: str) -> bool:
+        return path.startswith(self.exclude_paths) if self.exclude_paths else False
+
+    def head_sample(self, path: str) -> bool:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Decide, when the request starts, if it's sampled
+        """
+        rate = self.default_rate
+        for prefix, path_rate in self.path_rates:
+            if path.startswith(prefix):
+                rate = path_rate
+                break
+        return rate >= 1 or random.random() < rate
+
+    def should_log(self, head_sampled: bool, status_code: int | None, latency_ms: float) -> bool:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Decide, when the response ends, if the request is logged
+        """
+        if status_code is None or status_code >= self.always_keep_status:
+            return True
+        if self.slow_threshold_ms is not None and latency_ms >= self.slow_threshold_ms:
+            return True
+        if not head_sampled:
+            return False
+
+        rate = self.status_rates.get(f'{status_code // 100}xx')
+        return rate is None or rate >= 1 or random.random() < rate
+
+
+class LogsMiddleware:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Pure ASGI middleware that logs every request.
+
+        The receive/send messages are passed straight through, so streaming responses are not buffered, only
+        the first max_body_bytes of the request and response bodies are kept for the log.
+        The log is written after the response is sent, with the latency of the request.
+
+        The request log is sent to the logger as a dict in the 'request_log' extra field (the message is only
+        a short summary), so it's serialized once, by the log handler. Sensitive headers, query parameters and the
+        fields of json and form bodies (request and response) are redacted, other bodies are not logged.
+        The sampler decides which requests are logged.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int = 4096,
+                 sampler: RequestLogSampler | None = None,
+                 redact_headers: Iterable[str] = DEFAULT_REDACT_HEADERS,
+                 redact_fields: Iterable[str] = DEFAULT_REDACT_FIELDS) -> None:
+        """
+        :param app: The ASGI application
+        :param max_body_bytes: Max number of bytes of each body kept in the log, longer json bodies are truncated
+            and logged as an '<unparsed N bytes>' marker
+        :param sampler: Decide which requests are logged, default logs all but health checks
+        :param redact_headers: Headers (case-insensitive) replaced by '***' in the log
+        :param redact_fields: Json body fields (case-insensitive, any level) and query parameters replaced by '***'
+            in the log
+        """
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.sampler = sampler or RequestLogSampler()
+        self.redact_headers = frozenset(i.lower() for i in redact_headers)
+        self.redact_fields = frozenset(i.lower() for i in redact_fields)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or self.sampler.is_excluded(scope['path']):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        head_sampled = self.sampler.head_sample(scope['path'])
+        request_body = bytearray()
+        response_body = bytearray()
+        response_start: Message = {}
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if head_sampled and message['type'] == 'http.request':
+                self._tee(request_body, message.get('body', b''))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                response_start.update(message)
+            elif head_sampled and message['type'] == 'http.response.body':
+                self._tee(response_body, message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Exception:
+            response_start.setdefault('status', 500)
+            raise
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            try:
+                if self.sampler.should_log(head_sampled, response_start.get('status'), latency_ms):
+                    self._log(scope, request_body, response_start, response_body, latency_ms)
+            except Exception:
+                get_logger().exception('Error logging request')
+
+    def _tee(self, buffer: bytearray, body: bytes) -> None:
+        missing = self.max_body_bytes - len(buffer)
+        if missing > 0 and body:
+            buffer.extend(body[:missing])
+
+    def _log(self, scope: Scope, request_body: bytearray, response_start: Message,
+             response_body: bytearray, latency_ms: float) -> None:
+        request = Request(scope)
+        response_headers = [
+            (key.decode('latin-1'), value.decode('latin-1')) for key, value in response_start.get('headers', [])
+        ]
+        response_content_type = next((value for key, value in response_headers if key.lower() == 'content-type'), None)
+
+        request_log = {
             'base_url': str(request.base_url),
             'host': request.url.netloc,
-            'path': request.scope.get('path'),
-            'url': str(request.url),
+            'path': scope.get('path'),
+            # The query string may have secrets, it's only logged in query_params, redacted
+            'url': str(request.url.replace(query='')),
             'method': request.method,
-            'path_params': request.path_params,
-            'request_body': body,
-            'query_params': dict(request.query_params),
-            'request_headers': dict(request.headers),
+            'path_params': scope.get('path_params', {}),
+            'request_body': self._redact_body(_parse_body(request_body, request.headers.get('content-type'))),
+            'query_params': self._redact_body(dict(request.query_params)),
+            'request_headers': self._redact_headers(request.headers.items()),
 
-            'client_host': request.client.host,
+            'client_host': request.client.host if request.client else None,
 
-            'status_code': response.status_code,
-            'response_headers': dict(response.headers),
-            'response_body': response_body.decode('utf-8'),
+            'status_code': response_start.get('status'),
+            'response_headers': self._redact_headers(response_headers),
+            'response_body': self._redact_body(_parse_body(response_body, response_content_type)),
+            'latency_ms': round(latency_ms, 3),
         }
 
-        get_logger().info(json.dumps(response_message), extra={'is_request': True})
+        get_logger().info(
+            '%s %s %s', request_log['method'], request_log['path'], request_log['status_code'],
+            extra={'is_request': True, 'request_log': request_log},
+        )
+
+    def _redact_headers(self, headers: Iterable[tuple[str, str]]) -> dict[str, str]:
+        return {key: REDACTED if key.lower() in self.redact_headers else value for key, value in headers}
+
+    def _redact_body(self, body):
+        if isinstance(body, dict):
+            return {
+                key: REDACTED if key.lower() in self.redact_fields else self._redact_body(value)
+                for key, value in body.items()
+            }
+        if isinstance(body, list):
+            return [self._redact_body(i) for i in body]
+        return body
+
+
+def _parse_body(body: bytearray, content_type: str | None = None):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the body as json, or as a dict for url encoded forms, so its fields can be redacted.
+        Bodies that can't be parsed (other content types, or truncated by max_body_bytes) are replaced by a marker
+        with their size, since their sensitive fields can't be redacted
+    """
+    if not body:
+        return None
+
+    if content_type is not None and content_type.startswith('application/x-www-form-urlencoded'):
+        return dict(parse_qsl(bytes(body).decode('utf-8', errors='replace'), keep_blank_values=True))
 
-        return StreamingResponse(iter([response_body]), status_code=response.status_code, headers=dict(response.headers))
+    try:
+        return json.loads(body)
+    except ValueError:
+        return f'<unparsed {len(body)} bytes>'
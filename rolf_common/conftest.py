@@ -1,4 +1,7 @@
+from contextlib import contextmanager
+
 import pytest_asyncio
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
@@ -23,4 +26,18 @@ async def session(async_engine):
         async_engine, expire_on_commit=False
     )
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+@contextmanager
+def count_statements(async_engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
@@ -1,15 +1,53 @@
+import time
 from datetime import datetime, timezone
-from typing import Any, List, Sequence, Type
+from typing import Any, AsyncIterator, Iterable, List, Sequence, Type
 
 from fastapi import HTTPException, status
 from pydantic import BaseModel
-from sqlalchemy import func, select, RowMapping
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy import func, inspect, select, text, RowMapping
+from sqlalchemy.exc import InterfaceError, MultipleResultsFound, NoResultFound, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql.expression import Executable
-
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.expression import ColumnElement, Executable, Select
+
+from rolf_common.backend.sql_replicas import Replica, ReplicaRouter, track_writes
+from rolf_common.managers.bulk import BulkRowBuilder, BulkRows, iterate_rows
+from rolf_common.managers.cache import BaseEntityCache, invalidate_after_commit
+from rolf_common.managers.columnar import (
+    DEFAULT_CHUNK_SIZE,
+    ColumnarConverter,
+    columnar_statement,
+    pa,
+    to_numpy,
+)
+from rolf_common.managers.counting import (
+    CACHED,
+    ESTIMATE,
+    EXACT,
+    RELTUPLES_QUERY,
+    CountCache,
+    Explain,
+    count_statement,
+    plain_table,
+    plan_rows,
+    statement_tables,
+)
+from rolf_common.managers.instrumentation import QueryInstrumentation
+from rolf_common.managers.pagination import (
+    NEXT,
+    PREVIOUS,
+    KeysetPage,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+    row_key,
+    split_order_column,
+)
+from rolf_common.managers.statements import OBJECT_ID_PARAM, OBJECT_IDS_PARAM, StatementCache
 from rolf_common.models.base import SQLModel
 from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 
 class BaseDataManager:
@@ -19,18 +57,61 @@ class BaseDataManager:
         Base data manager class responsible for operations over a database.
     """
 
-    def __init__(self, session: AsyncSession) -> None:
-        self.session = session
+    # Max number of ids sent in a single "IN (...)" clause
+    in_clause_chunk_size: int = 500
+
+    # Cache used by get_by_id and get_by_ids, shared by all instances unless one is passed to the constructor
+    cache: BaseEntityCache | None = None
+
+    # Prebuilt generic statements (by id, by ids, exists), shared by all instances
+    statement_cache: StatementCache = StatementCache()
+
+    # Counts of the CACHED strategy of count, shared by all instances
+    count_cache: CountCache = CountCache()
 
-    @staticmethod
-    def query_builder(query_model: Any, columns: list):
+    # Key set in session.info once the session has written something
+    session_written_key: str = 'rolf_has_written'
+
+    # Receives the number of rows fetched by the read methods, see QueryInstrumentation (attached to the engine)
+    instrumentation: QueryInstrumentation | None = None
+
+    # Read replicas used by the read methods while the session has not written, shared by all instances
+    # unless one is passed to the constructor
+    replicas: ReplicaRouter | None = None
+
+    def __init__(self, session: AsyncSession, use_returning: bool = False,
+                 cache: BaseEntityCache | None = None,
+                 replicas: ReplicaRouter | None = None) -> None:
+        """
+        :param session: The session used by all operations
+        :param use_returning: If true, inserts and updates fetch the server generated columns using RETURNING in the
+            same statement, instead of issuing an extra SELECT for each model (falls back if dialect does not support it)
+        :param cache: The cache used by get_by_id and get_by_ids, overrides the class attribute
+        :param replicas: The read replicas, overrides the class attribute
+        """
+        self.session = session
+        self.use_returning = use_returning
+        if cache is not None:
+            self.cache = cache
+        if replicas is not None:
+            self.replicas = replicas
+        if self.replicas is not None:
+            # Writes done directly in the session also keep the reads on the primary
+            track_writes(session, self.session_written_key)
+
+    @classmethod
+    def query_builder(cls, query_model: Any, columns: list):
         """
         Created by: Lucas Penha de Moura - 01/05/2025
 
             This method creates a basic query based on the selected columns
+            When selecting a whole mapped class the statement is built once and reused (statements are immutable).
+            Other entities (e.g. aliased) are built on every call, since each one would be a new cache entry
         """
         if columns is None:
-            columns = [query_model]
+            if isinstance(query_model, type):
+                return cls.statement_cache.get((query_model, 'query'), lambda: select(query_model))
+            return select(query_model)
         return select(*columns)
 
     async def add_one(self, sql_model: SQLModel) -> SQLModel:
@@ -44,7 +125,12 @@ class BaseDataManager:
         """
         self.session.add(sql_model)
         await self.session.flush()
-        await self.session.refresh(sql_model)
+        await self._on_write(type(sql_model), [sql_model.id])
+
+        if self.use_returning:
+            await self._refresh_unloaded([sql_model])
+        else:
+            await self.session.refresh(sql_model)
 
         return sql_model
 
@@ -61,7 +147,15 @@ class BaseDataManager:
         self.session.add_all(sql_models)
         await self.session.flush()
 
-        if refresh_response:
+        written: dict[type, list[Any]] = {}
+        for i in sql_models:
+            written.setdefault(type(i), []).append(i.id)
+        for model_class, ids in written.items():
+            await self._on_write(model_class, ids)
+
+        if refresh_response and self.use_returning:
+            await self._refresh_unloaded(sql_models)
+        elif refresh_response:
             [await self.session.refresh(i) for i in sql_models]
 
         return sql_models
@@ -71,7 +165,7 @@ class BaseDataManager:
         Created by: Lucas Penha de Moura - 31/08/2024
 
             Method to add batch to a sql model ignoring if an entry with the same id already exists.
-            This should be used with caution, it uses a dialect specific implementation and may be slow for some cases (not tested)
+            This should be used with caution, it uses a dialect specific implementation (see upsert_all)
 
             This was created for populate in-memory test databases and development database, and should not be used in actual code.
                 It uses commit directly, and this disrupts the "transaction mode" used in all endpoints
@@ -80,15 +174,172 @@ class BaseDataManager:
         :param list_fields: A list o dict. The dict must contain all fields that will be added to the model.
         :return: The list o added models
         """
-        for idx, i in enumerate(list_fields):
-            new_row = pg_insert(sql_model).values(i).on_conflict_do_nothing(index_elements=['id'])
-            await self.session.execute(new_row)
+        await self.upsert_all(sql_model, list_fields, returning=False)
 
         await self.session.commit()
         added_rows = await self.get_all(select(sql_model))
 
         return added_rows
 
+    async def upsert_all(self, sql_model: Type[SQLModel], list_fields: list[dict[str, Any]],
+                         conflict_columns: Sequence[str] = ('id',),
+                         update_columns: Sequence[str] | None = None,
+                         chunk_size: int = 500,
+                         returning: bool = True) -> list[RowMapping]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+
+            Bulk insert a list of rows using multi-row INSERT ... ON CONFLICT statements, one per chunk.
+            Works with PostgreSQL and SQLite. It does not commit, so it runs inside the caller's transaction.
+
+        :param sql_model: The model that data will be added to
+        :param list_fields: A list o dict. Each dict contains the fields of one row
+        :param conflict_columns: The columns of the unique constraint used to detect the conflict, default 'id'
+        :param update_columns: The columns updated when a conflict happens, if None the conflicting row is ignored
+        :param chunk_size: Max number of rows sent in each statement
+        :param returning: Whether to return the inserted/updated rows using RETURNING
+        :return: The list of rows inserted or updated, ignored rows are not returned
+        """
+        insert_function = self._dialect_insert()
+        table = sql_model.__table__
+        rows: list[RowMapping] = []
+
+        for start in range(0, len(list_fields), chunk_size):
+            chunk = list_fields[start:start + chunk_size]
+
+            # multi-row VALUES requires the same keys in every row, so rows are grouped by their keys
+            groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+            for i in chunk:
+                groups.setdefault(tuple(sorted(i.keys())), []).append(i)
+
+            for values in groups.values():
+                stmt = insert_function(table).values(values)
+
+                if update_columns:
+                    set_ = {i: stmt.excluded[i] for i in update_columns}
+                    if 'edited_at' in table.c and 'edited_at' not in set_:
+                        set_['edited_at'] = datetime.now(timezone.utc)
+                    stmt = stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=set_)
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+
+                if returning:
+                    stmt = stmt.returning(*table.c)
+
+                result = await self.session.execute(stmt)
+                if returning:
+                    rows.extend(result.mappings().all())
+
+        # Without RETURNING the touched rows are unknown
+        await self._on_write(sql_model, [i['id'] for i in rows] if returning else None)
+
+        return rows
+
+    async def bulk_load(self, sql_model: Type[SQLModel], rows: BulkRows, chunk_size: int = 5000) -> int:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+
+            Load a large amount of rows into the model table, used for backfills and migrations.
+
+            On PostgreSQL (asyncpg) the rows are streamed with COPY FROM STDIN, on other dialects they are inserted
+            with one executemany per chunk. The column defaults (id, active, created_by...) are filled client-side,
+            server defaults (created_at) are filled by the database.
+            It does not commit, and the models are not added to the session.
+
+        :param sql_model: The model that data will be added to
+        :param rows: An iterable or async iterable of dicts or model objects
+        :param chunk_size: Number of rows buffered before sending, only used by the executemany fallback
+        :return: The number of rows loaded
+        """
+        rows = iterate_rows(rows)
+        first_row = await anext(rows, None)
+        if first_row is None:
+            return 0
+
+        builder = BulkRowBuilder(sql_model, first_row)
+
+        async def records():
+            yield builder.record(first_row)
+            async for row in rows:
+                yield builder.record(row)
+
+        dialect = self.session.get_bind().dialect
+        if dialect.name == 'postgresql' and dialect.driver == 'asyncpg':
+            total = await self._copy_records(sql_model, builder, records())
+        else:
+            total = await self._executemany_records(sql_model, builder, records(), chunk_size)
+
+        # New rows are never cached, only mark the session as written
+        await self._on_write(sql_model, [])
+
+        return total
+
+    async def _copy_records(self, sql_model: Type[SQLModel], builder: BulkRowBuilder,
+                            records: AsyncIterator[tuple]) -> int:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Stream the records using COPY over the asyncpg connection of the session (same transaction)
+        """
+        connection = await self.session.connection()
+        # The asyncpg adapter only sends BEGIN on the first execute, without it the COPY would run outside the
+        # session transaction (committed on its own and not undone by a rollback)
+        await connection.execute(text('SELECT 1'))
+
+        total = 0
+
+        async def counted():
+            nonlocal total
+            async for record in records:
+                total += 1
+                yield record
+
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            sql_model.__table__.name,
+            records=counted(),
+            columns=[i.name for i in builder.columns],
+            schema_name=sql_model.__table__.schema,
+        )
+
+        return total
+
+    async def _executemany_records(self, sql_model: Type[SQLModel], builder: BulkRowBuilder,
+                                   records: AsyncIterator[tuple], chunk_size: int) -> int:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Insert the records with one executemany per chunk, fallback for dialects without COPY
+        """
+        table = sql_model.__table__
+        keys = [i.key for i in builder.columns]
+        total = 0
+        chunk = []
+
+        async for record in records:
+            chunk.append(dict(zip(keys, record)))
+            if len(chunk) >= chunk_size:
+                await self.session.execute(table.insert(), chunk)
+                total += len(chunk)
+                chunk = []
+
+        if chunk:
+            await self.session.execute(table.insert(), chunk)
+            total += len(chunk)
+
+        return total
+
+    def _dialect_insert(self):
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the dialect specific insert construct, that supports ON CONFLICT clauses
+        """
+        dialect_name = self.session.get_bind().dialect.name
+        if dialect_name == 'postgresql':
+            return pg_insert
+        if dialect_name == 'sqlite':
+            return sqlite_insert
+
+        raise NotImplementedError(f'Upsert is not implemented for dialect {dialect_name}')
+
     async def update_one(self, sql_statement: Executable, sql_model: SQLModel) -> SQLModel:
         """
         Created by: Lucas Penha de Moura - 28/04/2024
@@ -101,6 +352,14 @@ class BaseDataManager:
         if not sql_statement.is_update:
             raise HTTPException(status_code=status.HTTP_428_PRECONDITION_REQUIRED)
 
+        if self.use_returning and self._supports_returning(is_update=True):
+            updated_ids = await self._update_returning(sql_statement, sql_model)
+            await self._on_write(type(sql_model), [*updated_ids, sql_model.id])
+            if sql_model.id not in updated_ids:
+                # The statement did not touch the model row, so just sync it with the database
+                await self.session.refresh(sql_model)
+            return sql_model
+
         try:
             sql_model.edited_at = datetime.now(timezone.utc)
             await self.session.execute(sql_statement)
@@ -109,8 +368,154 @@ class BaseDataManager:
         except Exception as e:
             raise e
 
+        # The statement may touch other rows of the model, and they are unknown here
+        await self._on_write(type(sql_model))
+
         return sql_model
 
+    async def _on_write(self, sql_model: Type[SQLModel], object_ids: Iterable[Any] | None = None) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Called after every write. Mark the session as written and invalidate the cached entries of the model,
+            now and again when the session commits
+
+        :param sql_model: The model written
+        :param object_ids: The ids of the rows written, if None all entries of the model are invalidated
+        """
+        self.session.info[self.session_written_key] = True
+        self.count_cache.invalidate(sql_model.table_name())
+
+        if self.cache is None:
+            return
+
+        if object_ids is None:
+            await self.cache.delete_model(sql_model)
+        else:
+            object_ids = list(object_ids)
+            if not object_ids:
+                return
+            await self.cache.delete(sql_model, object_ids)
+        invalidate_after_commit(self.session, self.cache, sql_model, object_ids)
+
+    def _read_replica(self) -> Replica | None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the replica used by a read, None to read from the primary.
+            Once the session has written (or while it has pending changes) it reads from the primary
+        """
+        if self.replicas is None:
+            return None
+
+        session = self.session
+        if session.info.get(self.session_written_key) or session.new or session.deleted or session.dirty:
+            return None
+
+        return self.replicas.choose()
+
+    async def _execute_read(self, statement: Executable, params: dict[str, Any] | None = None,
+                            stream: bool = False, core: bool = False):
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Execute a read statement in the session, bound to a replica when one can be used.
+            A replica that fails to connect is ejected (see ReplicaRouter) and the error is raised
+
+        :param statement: A select Executable SQLAlchemy statement
+        :param params: The values of the bound parameters of the statement, if any
+        :param stream: Whether to return an AsyncResult using a server side cursor
+        :param core: Whether to execute in the connection of the session (same transaction), skipping the ORM
+            processing of the rows. Only for statements of columns
+        """
+        replica = self._read_replica()
+        bind_arguments = {'bind': replica.engine.sync_engine} if replica is not None else None
+
+        start = time.perf_counter()
+        try:
+            if core:
+                connection = await self.session.connection(bind_arguments=bind_arguments)
+                execute = connection.stream if stream else connection.execute
+                result = await execute(statement, params)
+            else:
+                execute = self.session.stream if stream else self.session.execute
+                result = await execute(statement, params, bind_arguments=bind_arguments)
+        except (OperationalError, InterfaceError) as e:
+            if replica is not None:
+                self.replicas.mark_failed(replica, e)
+            raise
+
+        if replica is not None:
+            self.replicas.record_latency(replica, time.perf_counter() - start)
+        return result
+
+    def _record_rows(self, rows: int) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.record_rows(rows)
+
+    def _supports_returning(self, is_update: bool = False) -> bool:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Check if the dialect bound to the session supports INSERT/UPDATE ... RETURNING
+        """
+        dialect = self.session.get_bind().dialect
+        if is_update:
+            return bool(dialect.update_returning)
+        return bool(dialect.insert_returning)
+
+    async def _refresh_unloaded(self, sql_models: Sequence[SQLModel]) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Load the column attributes that were not fetched by the flush.
+
+            When the dialect supports RETURNING the server generated columns are already loaded by the INSERT,
+            so nothing is executed. Otherwise, all pending models of the same class are loaded by a single
+            SELECT ... WHERE id IN (...) per chunk, instead of one refresh per model.
+
+        :param sql_models: The flushed models
+        """
+        pending: dict[type, list[SQLModel]] = {}
+        for sql_model in sql_models:
+            state = inspect(sql_model)
+            if state.expired_attributes.intersection(state.mapper.column_attrs.keys()):
+                pending.setdefault(type(sql_model), []).append(sql_model)
+
+        for model_class, models in pending.items():
+            ids = [i.id for i in models]
+            for start in range(0, len(ids), self.in_clause_chunk_size):
+                stmt = (
+                    select(model_class)
+                    .where(model_class.id.in_(ids[start:start + self.in_clause_chunk_size]))
+                    .execution_options(populate_existing=True)
+                )
+                await self.session.execute(stmt)
+
+    async def _update_returning(self, sql_statement: Executable, sql_model: SQLModel) -> list[Any]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Execute the update statement setting 'edited_at' and returning all model columns in the same statement.
+            The returned values are set as committed values in the model, so no refresh is needed.
+
+        :param sql_statement: An update Executable SQLAlchemy statement
+        :param sql_model: The model object with the changes to be updated
+        :return: The ids of all rows updated by the statement
+        """
+        column_attrs = list(sql_model.__mapper__.column_attrs)
+        stmt = (
+            sql_statement
+            .values(edited_at=datetime.now(timezone.utc))
+            .returning(*[i.columns[0] for i in column_attrs])
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+
+        updated_ids = []
+        for row in result.all():
+            values = dict(zip([i.key for i in column_attrs], row))
+            updated_ids.append(values['id'])
+            if values['id'] == sql_model.id:
+                for key, value in values.items():
+                    set_committed_value(sql_model, key, value)
+
+        return updated_ids
+
     async def get_first(self, sql_statement: Executable,
                         raise_exception: bool = False) -> BaseModel | None:
         """
@@ -121,47 +526,128 @@ class BaseDataManager:
         :param raise_exception: Whether raise exception if some error occurs
         :return: The first model object fetched
         """
-        result = await self.session.execute(sql_statement)
+        result = await self._execute_read(sql_statement)
         result = result.scalar()
+        self._record_rows(0 if result is None else 1)
 
         if raise_exception and result is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No data found')
 
         return result
 
-    async def get_only_one(self, select_statement: Executable) -> SQLModel | None:
+    async def get_only_one(self, select_statement: Executable,
+                           params: dict[str, Any] | None = None) -> SQLModel | None:
         """
         Created by: Lucas Penha de Moura - 09/02/2024
             Get one register, and only one.
 
         :param select_statement: A select Executable SQLAlchemy statement, usually filtering by 'id'
+        :param params: The values of the bound parameters of the statement, if any
         :return: The model object if only one is found, return None otherwise
         """
+        result = await self._execute_read(select_statement, params)
         try:
-            result = await self.session.execute(select_statement)
             result = result.scalar_one()
-        except Exception as e:
+        except (NoResultFound, MultipleResultsFound):
             result = None
 
-        # TODO: maybe handle exceptions to return default values
+        self._record_rows(0 if result is None else 1)
 
         return result
 
-    async def get_by_id(self, sql_model: Type[SQLModel], object_id: Any) -> SQLModel | None:
+    async def get_by_id(self, sql_model: Type[SQLModel], object_id: Any,
+                        exclude_deleted: bool = False) -> SQLModel | None:
         """
         Created by: Lucas Penha de Moura - 09/02/2024
             Get element by ID.
             Generic method to get a register from any model filtering by ID
         :param sql_model: The model to fetch from
         :param object_id: The ID to be fetched from the model
+        :param exclude_deleted: If true, soft deleted registers (deleted_at is set) are not returned
         :return: The objected fetched, if any. None otherwise
         """
-        stmt = select(sql_model).where(sql_model.id == object_id)
+        if self.cache is not None:
+            values = await self.cache.get(sql_model, object_id)
+            if values is not None:
+                if exclude_deleted and values.get('deleted_at') is not None:
+                    return None
+                return await self._from_cache(sql_model, values)
+
+        stmt = self.statement_cache.by_id(sql_model, exclude_deleted)
 
-        obj: SQLModel = await self.get_only_one(stmt)
+        obj: SQLModel = await self.get_only_one(stmt, {OBJECT_ID_PARAM: object_id})
+
+        if obj is not None:
+            await self._set_cache(obj)
 
         return obj
 
+    async def get_by_ids(self, sql_model: Type[SQLModel], object_ids: Iterable[Any],
+                         exclude_deleted: bool = False) -> list[SQLModel]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Get elements by a list of IDs.
+            The ids not cached are fetched with a single SELECT ... WHERE id IN (...) per chunk
+        :param sql_model: The model to fetch from
+        :param object_ids: The IDs to be fetched from the model
+        :param exclude_deleted: If true, soft deleted registers (deleted_at is set) are not returned
+        :return: The objects fetched, in the same order as the IDs. IDs not found are skipped
+        """
+        object_ids = list(dict.fromkeys(object_ids))
+        found: dict[str, SQLModel] = {}
+
+        missing = []
+        for object_id in object_ids:
+            values = await self.cache.get(sql_model, object_id) if self.cache is not None else None
+            if values is None:
+                missing.append(object_id)
+            elif not exclude_deleted or values.get('deleted_at') is None:
+                found[str(object_id)] = await self._from_cache(sql_model, values)
+
+        stmt = self.statement_cache.by_ids(sql_model, exclude_deleted)
+        for start in range(0, len(missing), self.in_clause_chunk_size):
+            params = {OBJECT_IDS_PARAM: missing[start:start + self.in_clause_chunk_size]}
+            result = await self._execute_read(stmt, params)
+            objects = result.scalars().all()
+            self._record_rows(len(objects))
+            for obj in objects:
+                found[str(obj.id)] = obj
+                await self._set_cache(obj)
+
+        return [found[str(i)] for i in object_ids if str(i) in found]
+
+    async def exists(self, sql_model: Type[SQLModel], object_id: Any, exclude_deleted: bool = False) -> bool:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Check if an ID exists in the model, without fetching the register
+        :param sql_model: The model to check
+        :param object_id: The ID to be checked
+        :param exclude_deleted: If true, soft deleted registers (deleted_at is set) are not considered
+        """
+        result = await self._execute_read(self.statement_cache.exists(sql_model, exclude_deleted),
+                                          {OBJECT_ID_PARAM: object_id})
+        return bool(result.scalar())
+
+    async def _from_cache(self, sql_model: Type[SQLModel], values: dict[str, Any]) -> SQLModel:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Create a model object from the cached values and attach it to the session without querying the database
+        """
+        obj = sql_model(**values)
+        make_transient_to_detached(obj)
+        return await self.session.merge(obj, load=False)
+
+    async def _set_cache(self, sql_model: SQLModel) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Store the model in the cache.
+            Skipped if the session has written, since the values read may not be committed yet
+        """
+        if self.cache is None or self.session.info.get(self.session_written_key):
+            return
+
+        await self.cache.set(type(sql_model), sql_model.id, sql_model.to_dict())
+
     async def get_all(self, select_statement: Executable,
                       unique_result: bool = False,
                       raise_exception: bool = False) -> list[RowMapping] | None:
@@ -175,11 +661,12 @@ class BaseDataManager:
 
         :return: The list of objected fetched, if any. If none can raise exception if param is set
         """
-        result = await self.session.execute(select_statement)
+        result = await self._execute_read(select_statement)
         if unique_result:
             result = result.unique()
 
         result = result.mappings().all()
+        self._record_rows(len(result))
 
         if result:
             return list(result)
@@ -189,3 +676,245 @@ class BaseDataManager:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='No data found in model')
 
         return None
+
+    async def get_page(self, select_statement: Select,
+                       order_by: Sequence[ColumnElement] | None = None,
+                       cursor: str | None = None,
+                       page_size: int = 50,
+                       check_has_more: bool = True,
+                       count_strategy: str | None = None) -> KeysetPage:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Get a page using keyset (cursor) pagination.
+
+            Instead of OFFSET, the page starts right after the key of the last row seen, so fetching any page costs
+            the same as the first one (given there's an index over the order columns).
+
+        :param select_statement: A select Executable SQLAlchemy statement, its order by is replaced
+        :param order_by: The columns that define the order, can use .desc(). Together they must be unique.
+            Default is (created_at, id) of the first entity selected
+        :param cursor: The cursor returned by a previous page, if None return the first page
+        :param page_size: Max number of rows in the page
+        :param check_has_more: Whether to fetch one extra row to know if there are more rows after the page
+        :param count_strategy: If set, the page total is counted with this strategy, see count
+        :return: The page with the rows and the cursors to the next and previous pages
+        """
+        if order_by is None:
+            entity = select_statement.column_descriptions[0]['entity']
+            order_by = [entity.created_at, entity.id]
+
+        order_columns = [split_order_column(i) for i in order_by]
+        columns = [i[0] for i in order_columns]
+
+        direction = NEXT
+        stmt = select_statement.order_by(None)
+        if cursor:
+            direction, values = decode_cursor(cursor, columns)
+            stmt = stmt.where(keyset_condition(order_columns, values, direction))
+
+        if direction == PREVIOUS:
+            # Walk backwards from the cursor and reverse the rows after fetching
+            stmt = stmt.order_by(*[i.asc() if descending else i.desc() for i, descending in order_columns])
+        else:
+            stmt = stmt.order_by(*[i.desc() if descending else i.asc() for i, descending in order_columns])
+
+        stmt = stmt.limit(page_size + 1 if check_has_more else page_size)
+        result = await self._execute_read(stmt)
+        items = list(result.mappings().all())
+        self._record_rows(len(items))
+
+        has_more = None
+        if check_has_more:
+            has_more = len(items) > page_size
+            items = items[:page_size]
+
+        if direction == PREVIOUS:
+            items.reverse()
+
+        page = KeysetPage(items=items, has_more=has_more)
+        if count_strategy is not None:
+            page.total = await self.count(select_statement, count_strategy)
+
+        if not items:
+            return page
+
+        more = has_more if check_has_more else len(items) == page_size
+        if direction == PREVIOUS or more:
+            page.next_cursor = encode_cursor(NEXT, row_key(items[-1], columns))
+        if (direction == NEXT and cursor) or (direction == PREVIOUS and more):
+            page.previous_cursor = encode_cursor(PREVIOUS, row_key(items[0], columns))
+
+        return page
+
+    async def count(self, select_statement: Select, strategy: str = EXACT,
+                    params: dict[str, Any] | None = None,
+                    exact_below: int | None = 1000) -> int:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Count the rows returned by a select statement, ignoring its order by, limit and offset.
+
+            EXACT runs SELECT count(*) over the statement, it's always correct but scans all matching rows.
+            ESTIMATE uses the PostgreSQL planner: the table statistics (pg_class.reltuples) for an unfiltered
+            statement, or the rows estimated by EXPLAIN for a filtered one. Nothing is scanned, but the value
+            is only as good as the statistics, so use it for totals shown as "about N results".
+            On other dialects it's the same as EXACT.
+            CACHED is the exact count reused for a short time (see CountCache), for totals that can be a bit stale.
+
+        :param select_statement: A select SQLAlchemy statement, usually the same statement used to fetch the page
+        :param strategy: EXACT, ESTIMATE or CACHED
+        :param params: The values of the bound parameters of the statement, if any
+        :param exact_below: ESTIMATE only, when the estimate is below this value the rows are counted,
+            since counting is cheap and the estimates of small results are the least accurate. None to disable
+        :return: The number of rows
+        """
+        if strategy == ESTIMATE:
+            total = await self._estimate_count(select_statement, params)
+            if total is not None and (exact_below is None or total >= exact_below):
+                return total
+        elif strategy == CACHED:
+            return await self._cached_count(select_statement, params)
+        elif strategy != EXACT:
+            raise ValueError(f'Unknown count strategy {strategy}')
+
+        result = await self._execute_read(count_statement(select_statement), params)
+        total = result.scalar_one()
+        self._record_rows(1)
+        return total
+
+    async def _estimate_count(self, select_statement: Select, params: dict[str, Any] | None = None) -> int | None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the planner estimate of the rows returned by the statement, None if it can't be estimated
+        """
+        dialect = self.session.get_bind().dialect
+        if dialect.name != 'postgresql':
+            return None
+
+        table = plain_table(select_statement)
+        if table is not None:
+            result = await self._execute_read(text(RELTUPLES_QUERY),
+                                              {'table_name': dialect.identifier_preparer.format_table(table)})
+            total = result.scalar()
+            self._record_rows(0 if total is None else 1)
+            # A table never analyzed has no statistics (-1), then the planner estimate is used
+            if total is not None and total >= 0:
+                return total
+
+        stmt = select_statement.order_by(None).limit(None).offset(None)
+        result = await self._execute_read(Explain(stmt), params)
+        plan = result.scalar()
+        self._record_rows(1)
+        return plan_rows(plan)
+
+    async def _cached_count(self, select_statement: Select, params: dict[str, Any] | None = None) -> int:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the cached exact count of the statement, counting and caching it if missing.
+            The count is not cached if the session has written, since it may include rows not committed yet
+        """
+        stmt = count_statement(select_statement)
+        key = self.count_cache.fingerprint(stmt, self.session.get_bind().dialect, params)
+
+        total = self.count_cache.get(key)
+        if total is not None:
+            # No statement executed, so no rows to record
+            return total
+
+        total = (await self._execute_read(stmt, params)).scalar_one()
+        self._record_rows(1)
+        if not self.session.info.get(self.session_written_key):
+            self.count_cache.set(key, statement_tables(select_statement), total)
+
+        return total
+
+    async def stream_all(self, select_statement: Executable,
+                         batch_size: int = 1000,
+                         unique_result: bool = False) -> AsyncIterator[RowMapping]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Similar to get_all, but yield the rows lazily using a server side cursor.
+            Only 'batch_size' rows are buffered at a time, so the memory used does not depend on the number of rows.
+
+        :param select_statement: A select Executable SQLAlchemy statement
+        :param batch_size: Number of rows fetched from the cursor at a time
+        :param unique_result: If true, apply unique to the query, used when query contains joins.
+            It keeps the identities already seen in memory
+        :return: An async iterator over the rows fetched
+        """
+        async for batch in self.stream_batches(select_statement, batch_size, unique_result):
+            for row in batch:
+                yield row
+
+    async def stream_batches(self, select_statement: Executable,
+                             batch_size: int = 1000,
+                             unique_result: bool = False) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Same as stream_all, but yield lists with up to 'batch_size' rows
+
+        :param select_statement: A select Executable SQLAlchemy statement
+        :param batch_size: Number of rows fetched from the cursor at a time
+        :param unique_result: If true, apply unique to the query, used when query contains joins
+        :return: An async iterator over the batches of rows fetched
+        """
+        result = await self._execute_read(select_statement.execution_options(yield_per=batch_size), stream=True)
+        try:
+            if unique_result:
+                result = result.unique()
+
+            async for batch in result.mappings().partitions(batch_size):
+                self._record_rows(len(batch))
+                yield batch
+        finally:
+            await result.close()
+
+    async def stream_arrow(self, select_statement: Select,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator['pa.RecordBatch']:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Similar to stream_batches, but yield Arrow record batches with up to 'chunk_size' rows, one array
+            per column, instead of one RowMapping per row. Requires rolf_common[arrow].
+
+            Whole entities selected (e.g. select(Model)) are exported as their columns, see columnar.arrow_type
+            for the types. The batches can be aggregated with pyarrow.compute or streamed with
+            columnar.arrow_ipc_stream / columnar.parquet_stream.
+
+        :param select_statement: A select SQLAlchemy statement
+        :param chunk_size: Number of rows in each record batch, also fetched from the cursor at a time
+        :return: An async iterator over the record batches, empty if no rows are found
+        """
+        stmt = columnar_statement(select_statement)
+        converter = ColumnarConverter(stmt)
+
+        # The rows are only transposed into columns, so the ORM processing of each row is skipped
+        result = await self._execute_read(stmt.execution_options(yield_per=chunk_size), stream=True, core=True)
+        try:
+            async for rows in result.partitions(chunk_size):
+                self._record_rows(len(rows))
+                yield converter.record_batch(rows)
+        finally:
+            await result.close()
+
+    async def get_arrow(self, select_statement: Select, chunk_size: int = DEFAULT_CHUNK_SIZE) -> 'pa.Table':
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Fetch all rows of the statement into an Arrow table, built from the batches of stream_arrow
+
+        :param select_statement: A select SQLAlchemy statement
+        :param chunk_size: Number of rows in each record batch
+        :return: The table, with the schema of the statement even if no rows are found
+        """
+        converter = ColumnarConverter(columnar_statement(select_statement))
+        batches = [i async for i in self.stream_arrow(select_statement, chunk_size)]
+        return pa.Table.from_batches(batches, schema=converter.schema)
+
+    async def get_numpy(self, select_statement: Select, chunk_size: int = DEFAULT_CHUNK_SIZE) -> dict[str, Any]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Fetch all rows of the statement as NumPy arrays, one per column, see columnar.to_numpy
+
+        :param select_statement: A select SQLAlchemy statement
+        :param chunk_size: Number of rows converted at a time
+        :return: The arrays by column name
+        """
+        return to_numpy(await self.get_arrow(select_statement, chunk_size))
@@ -0,0 +1,104 @@
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Type
+
+from sqlalchemy import Column, inspect
+
+from rolf_common.models.base import SQLModel
+
+BulkRows = Iterable[dict[str, Any] | SQLModel] | AsyncIterable[dict[str, Any] | SQLModel]
+
+
+async def iterate_rows(rows: BulkRows) -> AsyncIterator[dict[str, Any] | SQLModel]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Iterate over sync or async iterables the same way
+    """
+    if hasattr(rows, '__aiter__'):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+class BulkRowBuilder:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Convert dicts or model objects into tuples of column values, used by bulk loads.
+
+        Columns missing in a row are filled client-side with the column default (e.g. id, active and created_by),
+        or None when the column has no default. Columns with only a server default (e.g. created_at)
+        are left out of the load, so the database fills them, unless the first row sets them.
+        Keys that are not columns of the model, and server default columns set only after the first row,
+        raise a ValueError instead of being dropped.
+    """
+
+    def __init__(self, sql_model: Type[SQLModel], first_row: dict[str, Any] | SQLModel) -> None:
+        self.sql_model = sql_model
+        self._attribute_columns = {i.key: i.columns[0].name for i in sql_model.__mapper__.column_attrs}
+
+        first_values = self.values(first_row)
+        self.columns: list[Column] = [
+            i for i in sql_model.__table__.c if i.server_default is None or i.name in first_values
+        ]
+        self._column_names = frozenset(i.name for i in self.columns)
+        # Server default columns left out of the load, since the first row does not set them
+        self._skipped_columns = frozenset(i.name for i in sql_model.__table__.c) - self._column_names
+        self._defaults: list[Callable[[], Any] | None] = [self._default_factory(i) for i in self.columns]
+
+    @staticmethod
+    def _default_factory(column: Column) -> Callable[[], Any] | None:
+        default = column.default
+        if default is None:
+            return None
+
+        if default.is_scalar:
+            return lambda: default.arg
+        if default.is_callable:
+            # SQLAlchemy wraps the callables to receive the execution context, that is not used by the defaults here
+            return lambda: default.arg(None)
+
+        raise ValueError(f'Default of column {column.name} cannot be computed client-side')
+
+    def values(self, row: dict[str, Any] | SQLModel) -> dict[str, Any]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Get the values set in the row, keyed by column name
+        """
+        if isinstance(row, SQLModel):
+            # only attributes set in the object, unset ones must get the column default
+            state = inspect(row)
+            row = {i: state.dict[i] for i in self._attribute_columns if i in state.dict}
+
+        return {self._attribute_columns.get(key, key): value for key, value in row.items()}
+
+    def record(self, row: dict[str, Any] | SQLModel) -> tuple[Any, ...]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Build the tuple with the values of all load columns, filling the missing ones
+        """
+        values = self.values(row)
+        if not self._column_names.issuperset(values):
+            self._check_keys(values)
+
+        record = []
+        for column, default in zip(self.columns, self._defaults):
+            if column.name in values:
+                record.append(values[column.name])
+            elif default is not None:
+                record.append(default())
+            elif column.server_default is not None:
+                raise ValueError(f'Column {column.name} is set in the first row, so it must be set in all rows')
+            else:
+                record.append(None)
+
+        return tuple(record)
+
+    def _check_keys(self, values: dict[str, Any]) -> None:
+        extra = values.keys() - self._column_names
+        skipped = sorted(extra & self._skipped_columns)
+        if skipped:
+            raise ValueError(
+                f'Columns {", ".join(skipped)} are not set in the first row, so they must not be set in any row'
+            )
+        raise ValueError(f'Unknown columns for {self.sql_model.__name__}: {", ".join(sorted(extra))}')
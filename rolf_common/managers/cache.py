@@ -0,0 +1,165 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Iterable, Type
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.util import await_only
+
+from rolf_common.models.base import SQLModel
+
+# session.info key of the invalidations repeated when the session commits
+PENDING_INVALIDATIONS_KEY = 'rolf_cache_invalidations'
+
+
+class BaseEntityCache(ABC):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Base class for the caches used by BaseDataManager.get_by_id and get_by_ids.
+        The values stored are the column values of the model (SQLModel.to_dict), never the model object itself,
+        since model objects belong to a session.
+
+        The methods are async so a shared backend (e.g. Redis) can implement it.
+    """
+
+    @abstractmethod
+    async def get(self, sql_model: Type[SQLModel], object_id: Any) -> dict[str, Any] | None:
+        ...
+
+    @abstractmethod
+    async def set(self, sql_model: Type[SQLModel], object_id: Any, values: dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, sql_model: Type[SQLModel], object_ids: Iterable[Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_model(self, sql_model: Type[SQLModel]) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        ...
+
+
+def invalidate_after_commit(session: AsyncSession, cache: BaseEntityCache, sql_model: Type[SQLModel],
+                            object_ids: Iterable[Any] | None = None) -> None:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Invalidate the entries again when the session commits. The invalidation done at write time is not enough:
+        until the commit, other sessions still read the old row and may cache it again.
+
+    :param object_ids: The ids of the rows written, if None all entries of the model are invalidated
+    """
+    sync_session = session.sync_session
+    sync_session.info.setdefault(PENDING_INVALIDATIONS_KEY, []).append(
+        (cache, sql_model, None if object_ids is None else list(object_ids))
+    )
+    if not event.contains(sync_session, 'after_commit', _invalidate_pending):
+        event.listen(sync_session, 'after_commit', _invalidate_pending)
+        event.listen(sync_session, 'after_rollback', _discard_pending)
+
+
+def _invalidate_pending(session) -> None:
+    # Runs inside AsyncSession.commit, so the async cache methods can be awaited with await_only
+    for cache, sql_model, object_ids in session.info.pop(PENDING_INVALIDATIONS_KEY, ()):
+        if object_ids is None:
+            await_only(cache.delete_model(sql_model))
+        else:
+            await_only(cache.delete(sql_model, object_ids))
+
+
+def _discard_pending(session) -> None:
+    # The writes were undone, the entries invalidated at write time are enough
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+
+
+class LRUEntityCache(BaseEntityCache):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        In-process cache with a max number of entries (least recently used are evicted first)
+        and a time to live for each entry.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0) -> None:
+        """
+        :param max_size: Max number of entries kept in the cache
+        :param ttl: Time, in seconds, an entry is valid after being set
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, str], tuple[float, dict[str, Any]]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(sql_model: Type[SQLModel], object_id: Any) -> tuple[str, str]:
+        return sql_model.table_name(), str(object_id)
+
+    async def get(self, sql_model: Type[SQLModel], object_id: Any) -> dict[str, Any] | None:
+        key = self._key(sql_model, object_id)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, values = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return values
+
+    async def set(self, sql_model: Type[SQLModel], object_id: Any, values: dict[str, Any]) -> None:
+        key = self._key(sql_model, object_id)
+        self._entries[key] = (time.monotonic() + self.ttl, values)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, sql_model: Type[SQLModel], object_ids: Iterable[Any]) -> None:
+        for object_id in object_ids:
+            if self._entries.pop(self._key(sql_model, object_id), None) is not None:
+                self.invalidations += 1
+
+    async def delete_model(self, sql_model: Type[SQLModel]) -> None:
+        table_name = sql_model.table_name()
+        for key in [i for i in self._entries if i[0] == table_name]:
+            del self._entries[key]
+            self.invalidations += 1
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,249 @@
+import enum
+import json
+from typing import Any, AsyncIterator, Callable, Iterable, Sequence
+
+from sqlalchemy import inspect
+from sqlalchemy.sql import sqltypes
+from sqlalchemy.sql.expression import Select
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # optional, install with rolf_common[arrow]
+    np = pa = pc = pq = None
+
+# Rows per record batch, large enough to amortize the conversion and small enough to keep the memory bounded
+DEFAULT_CHUNK_SIZE = 65536
+
+Converter = Callable[[Any], Any]
+
+
+def require_arrow() -> None:
+    if pa is None:
+        raise RuntimeError('pyarrow and numpy are not installed, install rolf_common[arrow] to use the columnar export')
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _json_value(value: Any) -> str | None:
+    return None if value is None else json.dumps(value, default=str)
+
+
+def _float_value(value: Any) -> float | None:
+    return None if value is None else float(value)
+
+
+def _str_value(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def arrow_type(type_: sqltypes.TypeEngine) -> tuple['pa.DataType', Converter | None]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the Arrow type of a SQLAlchemy column type and the converter applied to each value, if any.
+
+        Uuid is stored as the arrow.uuid extension type (16 bytes), timezone-aware timestamps as UTC microseconds
+        (naive values, e.g. from SQLite, are taken as UTC), Numeric without precision as float64, JSON as text
+        and the types not mapped here as their str(). Expressions without a type (e.g. most func.*) are also text,
+        use cast or type_coerce to export them with their type
+    """
+    if isinstance(type_, sqltypes.Uuid):
+        return (pa.uuid(), None) if type_.as_uuid else (pa.string(), None)
+    if isinstance(type_, sqltypes.DateTime):
+        return pa.timestamp('us', tz='UTC' if type_.timezone else None), None
+    if isinstance(type_, sqltypes.Date):
+        return pa.date32(), None
+    if isinstance(type_, sqltypes.Time):
+        return pa.time64('us'), None
+    if isinstance(type_, sqltypes.Interval):
+        return pa.duration('us'), None
+    if isinstance(type_, sqltypes.Boolean):
+        return pa.bool_(), None
+    if isinstance(type_, sqltypes.SmallInteger):
+        return pa.int16(), None
+    if isinstance(type_, sqltypes.Integer):
+        return pa.int64(), None
+    if isinstance(type_, sqltypes.Float):
+        return pa.float64(), _float_value
+    if isinstance(type_, sqltypes.Numeric):
+        if type_.asdecimal and type_.precision is not None and type_.precision <= 38:
+            return pa.decimal128(type_.precision, type_.scale or 0), None
+        return pa.float64(), _float_value
+    if isinstance(type_, sqltypes.Enum):
+        return pa.string(), _enum_value
+    if isinstance(type_, sqltypes.String):
+        return pa.string(), None
+    if isinstance(type_, sqltypes.LargeBinary):
+        return pa.binary(), None
+    if isinstance(type_, sqltypes.JSON):
+        return pa.string(), _json_value
+
+    return pa.string(), _str_value
+
+
+def columnar_statement(select_statement: Select) -> Select:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Replace the whole entities selected (e.g. select(Model)) by their columns, so each row is a plain tuple
+    """
+    columns = []
+    expanded = False
+    for description, column in zip(select_statement.column_descriptions, select_statement.selected_columns):
+        entity = description.get('entity')
+        if entity is not None and description['expr'] is entity:
+            columns.extend(inspect(entity).columns)
+            expanded = True
+        else:
+            columns.append(column)
+
+    return select_statement.with_only_columns(*columns) if expanded else select_statement
+
+
+class ColumnarConverter:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Convert the rows of a select statement into Arrow record batches.
+        The Arrow schema comes from the column types of the statement, so every batch (even an empty result)
+        has the same schema. The rows are transposed once per batch and each column is built by a single
+        pyarrow call, nulls included.
+    """
+
+    def __init__(self, select_statement: Select) -> None:
+        """
+        :param select_statement: A select statement of columns, see columnar_statement
+        """
+        require_arrow()
+
+        fields = []
+        self.converters: list[Converter | None] = []
+        for key, column in select_statement.selected_columns.items():
+            type_, converter = arrow_type(column.type)
+            fields.append(pa.field(key, type_, nullable=getattr(column, 'nullable', True)))
+            self.converters.append(converter)
+
+        self.schema: 'pa.Schema' = pa.schema(fields)
+
+    def record_batch(self, rows: Sequence[Sequence[Any]]) -> 'pa.RecordBatch':
+        if not rows:
+            return pa.RecordBatch.from_pylist([], schema=self.schema)
+
+        arrays = []
+        for values, field, converter in zip(zip(*rows), self.schema, self.converters):
+            if converter is not None:
+                values = [converter(i) for i in values]
+            arrays.append(pa.array(values, type=field.type))
+
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def arrow_schema(select_statement: Select) -> 'pa.Schema':
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the Arrow schema of the batches exported for the statement, e.g. to start an IPC stream
+    """
+    return ColumnarConverter(columnar_statement(select_statement)).schema
+
+
+def to_numpy(table: 'pa.Table') -> dict[str, 'np.ndarray']:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the columns of an Arrow table as NumPy arrays.
+
+        Numeric, boolean and temporal columns keep their dtype (timestamps as UTC datetime64), columns with nulls
+        are masked arrays. UUID and text columns are object arrays of uuid.UUID and str
+    """
+    require_arrow()
+
+    arrays = {}
+    for name, column in zip(table.column_names, table.columns):
+        type_ = column.type
+        if isinstance(type_, pa.BaseExtensionType) or pa.types.is_string(type_) or pa.types.is_binary(type_):
+            arrays[name] = np.array(column.to_pylist(), dtype=object)
+            continue
+
+        if column.null_count == 0:
+            arrays[name] = column.to_numpy()
+            continue
+
+        mask = column.is_null().to_numpy(zero_copy_only=False)
+        if pa.types.is_boolean(type_):
+            values = pc.fill_null(column, False).to_numpy()
+        elif pa.types.is_integer(type_) or pa.types.is_floating(type_):
+            values = pc.fill_null(column, pa.scalar(0, type_)).to_numpy()
+        else:
+            values = column.to_numpy(zero_copy_only=False)
+        arrays[name] = np.ma.masked_array(values, mask=mask)
+
+    return arrays
+
+
+class _BytesSink:
+    """File-like object keeping the bytes written by the Arrow writers until they are taken."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def arrow_ipc_stream(batches: AsyncIterator['pa.RecordBatch'] | Iterable['pa.RecordBatch'],
+                           schema: 'pa.Schema') -> AsyncIterator[bytes]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Encode the record batches in the Arrow IPC stream format, yielding the bytes of each batch as soon as it's
+        written, e.g. StreamingResponse(arrow_ipc_stream(...), media_type='application/vnd.apache.arrow.stream')
+    """
+    require_arrow()
+
+    sink = _BytesSink()
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode='w'), schema) as writer:
+        async for batch in _iterate(batches):
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
+
+
+async def parquet_stream(batches: AsyncIterator['pa.RecordBatch'] | Iterable['pa.RecordBatch'],
+                         schema: 'pa.Schema', compression: str = 'zstd') -> AsyncIterator[bytes]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Encode the record batches as a Parquet file, one row group per batch, yielding the bytes of each row group
+        as soon as it's written (the file footer comes last)
+    """
+    require_arrow()
+
+    sink = _BytesSink()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression=compression) as writer:
+        async for batch in _iterate(batches):
+            writer.write_batch(batch)
+            yield sink.take()
+    yield sink.take()
+
+
+async def _iterate(batches):
+    if hasattr(batches, '__aiter__'):
+        async for batch in batches:
+            yield batch
+    else:
+        for batch in batches:
+            yield batch
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import Table, func, select
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable, Select
+from sqlalchemy.sql.util import find_tables
+
+# Count strategies of BaseDataManager.count
+EXACT = 'exact'
+ESTIMATE = 'estimate'
+CACHED = 'cached'
+
+# Estimated rows of a table, from the statistics kept by ANALYZE/autovacuum (-1 if never analyzed)
+RELTUPLES_QUERY = 'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)'
+
+
+class Explain(Executable, ClauseElement):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        EXPLAIN (FORMAT JSON) of a statement, the statement is planned but not executed.
+        The bound parameters of the statement are kept, so it's executed like the statement itself.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
+def count_statement(select_statement: Select) -> Select:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Build the SELECT count(*) of the rows returned by the statement, ignoring its order by, limit and offset.
+        The statement is counted as a subquery, that the database flattens when possible, so DISTINCT and
+        GROUP BY are counted correctly
+    """
+    stmt = select_statement.order_by(None).limit(None).offset(None)
+    return select(func.count()).select_from(stmt.subquery())
+
+
+def plain_table(select_statement: Select) -> Table | None:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the table read by the statement if it reads all its rows (no where, join, group by or distinct)
+    """
+    froms = select_statement.get_final_froms()
+    if (
+        len(froms) != 1
+        or not isinstance(froms[0], Table)
+        or select_statement.whereclause is not None
+        or select_statement._group_by_clauses
+        or select_statement._distinct
+    ):
+        return None
+    return froms[0]
+
+
+def plan_rows(plan: Any) -> int:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the rows estimated by the planner in the EXPLAIN (FORMAT JSON) output
+    """
+    if isinstance(plan, (str, bytes)):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def statement_tables(select_statement: Select) -> frozenset[str]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the names of the tables read by the statement, including joins and subqueries
+    """
+    return frozenset(i.name for i in find_tables(select_statement))
+
+
+class CountCache:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        In-process cache of the exact counts used by BaseDataManager.count with the CACHED strategy.
+
+        An entry is keyed by the fingerprint of the count statement: a hash of the SQL compiled for the dialect
+        and of the parameter values, so the same filters with other values have different entries.
+        The entries of a table are invalidated when BaseDataManager writes to it, and they expire after the ttl,
+        so the counts of writes made by other processes are stale for at most ttl seconds.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0) -> None:
+        """
+        :param max_size: Max number of entries kept in the cache
+        :param ttl: Time, in seconds, a count is valid after being set
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, frozenset[str], int]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def fingerprint(statement: Select, dialect: Dialect, params: dict[str, Any] | None = None) -> str:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the key of the statement with its parameter values
+        """
+        compiled = statement.compile(dialect=dialect)
+        values = {**compiled.params, **(params or {})}
+        key = repr((compiled.string, sorted((name, repr(value)) for name, value in values.items())))
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> int | None:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, _, total = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return total
+
+    def set(self, key: str, tables: frozenset[str], total: int) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, tables, total)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, table_name: str) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Remove the counts of all statements that read the table
+        """
+        for key in [key for key, entry in self._entries.items() if table_name in entry[1]]:
+            del self._entries[key]
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
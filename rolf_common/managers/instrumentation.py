@@ -0,0 +1,308 @@
+import bisect
+import hashlib
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Upper bounds, in seconds, of the latency histogram buckets (the last one is +Inf)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_START_KEY = '_rolf_query_start'
+
+_BIND = r'(?:\?|\$\d+|%s|%\(\w+\)s|:\w+)'
+_IN_LIST = re.compile(rf'\bIN\s*\(\s*{_BIND}(?:\s*,\s*{_BIND})*\s*\)', re.IGNORECASE)
+_PLACEHOLDER = re.compile(r'\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Normalize a SQL statement into its shape: literals and placeholders become '?', IN lists of any size
+        become 'IN (...)' and whitespace is collapsed, so the same query with other values has the same fingerprint
+    """
+    statement = _STRING.sub('?', statement)
+    statement = _IN_LIST.sub('IN (...)', statement)
+    statement = _PLACEHOLDER.sub('?', statement)
+    statement = _NUMBER.sub('?', statement)
+    return _SPACES.sub(' ', statement).strip()
+
+
+class StatementStats:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Latency histogram, row count and errors of a statement fingerprint
+    """
+    __slots__ = ('buckets', 'bucket_counts', 'count', 'total', 'max', 'rows', 'errors', 'n_plus_one')
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.errors = 0
+        self.n_plus_one = 0
+
+    def observe(self, seconds: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative = 0
+        histogram = {}
+        for bound, count in zip((*self.buckets, float('inf')), self.bucket_counts):
+            cumulative += count
+            histogram[bound] = cumulative
+        return {
+            'count': self.count,
+            'total_seconds': self.total,
+            'avg_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'max_ms': self.max * 1000,
+            'rows': self.rows,
+            'errors': self.errors,
+            'n_plus_one': self.n_plus_one,
+            'histogram': histogram,
+        }
+
+
+class QueryScope:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Statements executed in one request (or any unit of work), used to detect N+1 queries
+    """
+
+    def __init__(self, name: str | None = None) -> None:
+        self.name = name
+        self.counts: dict[str, int] = {}
+        self.flagged: set[str] = set()
+
+
+_current_scope: ContextVar[QueryScope | None] = ContextVar('rolf_query_scope', default=None)
+# The fingerprint of the last statement executed in the current context, the rows fetched are added to it
+_last_fingerprint: ContextVar[str | None] = ContextVar('rolf_last_query_fingerprint', default=None)
+
+
+class QueryInstrumentation:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Opt-in instrumentation of the SQL statements, using the engine cursor events.
+
+        For each statement fingerprint (see fingerprint) it keeps a latency histogram, the errors and the rows
+        returned (reported by BaseDataManager), logs the statements slower than slow_query_ms and flags as
+        likely N+1 a fingerprint executed n_plus_one_threshold times in the same scope (usually a request,
+        see scope and QueryScopeMiddleware).
+
+        Nothing is done until attach is called, so there's no overhead when it's not used.
+        The metrics are available with snapshot and prometheus_text.
+    """
+
+    def __init__(self, slow_query_ms: float | None = 500.0, n_plus_one_threshold: int | None = 10,
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS, max_fingerprints: int = 1000,
+                 logger: logging.Logger | None = None) -> None:
+        """
+        :param slow_query_ms: Statements slower than this are logged, None to disable
+        :param n_plus_one_threshold: Number of executions of the same fingerprint in a scope flagged as N+1,
+            None to disable
+        :param buckets: Upper bounds, in seconds, of the latency histogram buckets
+        :param max_fingerprints: Max number of fingerprints kept, the others are counted under 'other'
+        :param logger: Logger of the slow queries and N+1 warnings, default 'rolf_common.sql'
+        """
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.buckets = tuple(sorted(buckets))
+        self.max_fingerprints = max_fingerprints
+        self.logger = logger or logging.getLogger('rolf_common.sql')
+
+        self._lock = threading.Lock()
+        self._stats: dict[str, StatementStats] = {}
+        self._engines: list[Engine] = []
+
+    def attach(self, engine: Engine | AsyncEngine) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Start instrumenting the statements of the engine
+        """
+        sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        if sync_engine in self._engines:
+            return
+
+        event.listen(sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(sync_engine, 'handle_error', self._handle_error)
+        self._engines.append(sync_engine)
+
+    def detach(self, engine: Engine | AsyncEngine) -> None:
+        sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        if sync_engine not in self._engines:
+            return
+
+        event.remove(sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.remove(sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.remove(sync_engine, 'handle_error', self._handle_error)
+        self._engines.remove(sync_engine)
+
+    @contextmanager
+    def scope(self, name: str | None = None) -> Iterator[QueryScope]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Count the statements executed inside the block (in the current context) to detect N+1 queries
+        """
+        query_scope = QueryScope(name)
+        token = _current_scope.set(query_scope)
+        try:
+            yield query_scope
+        finally:
+            _current_scope.reset(token)
+
+    def _statement_stats(self, statement_fingerprint: str) -> StatementStats:
+        stats = self._stats.get(statement_fingerprint)
+        if stats is None:
+            if len(self._stats) >= self.max_fingerprints:
+                statement_fingerprint = 'other'
+                stats = self._stats.get(statement_fingerprint)
+            if stats is None:
+                stats = self._stats[statement_fingerprint] = StatementStats(self.buckets)
+        return stats
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if context is not None:
+            setattr(context, _START_KEY, time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        start = getattr(context, _START_KEY, None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+
+        statement_fingerprint = fingerprint(statement)
+        _last_fingerprint.set(statement_fingerprint)
+
+        with self._lock:
+            stats = self._statement_stats(statement_fingerprint)
+            stats.observe(elapsed)
+            # for DML statements the driver knows the affected rows, selects are reported by the data manager
+            if context.isinsert or context.isupdate or context.isdelete:
+                if cursor.rowcount is not None and cursor.rowcount >= 0:
+                    stats.rows += cursor.rowcount
+
+        if self.slow_query_ms is not None and elapsed * 1000 >= self.slow_query_ms:
+            self.logger.warning('Slow query (%.1f ms): %s', elapsed * 1000, statement_fingerprint,
+                                extra={'query_fingerprint': statement_fingerprint, 'duration_ms': elapsed * 1000})
+
+        query_scope = _current_scope.get()
+        if query_scope is not None:
+            self._check_n_plus_one(query_scope, statement_fingerprint)
+
+    def _check_n_plus_one(self, query_scope: QueryScope, statement_fingerprint: str) -> None:
+        count = query_scope.counts[statement_fingerprint] = query_scope.counts.get(statement_fingerprint, 0) + 1
+
+        if (self.n_plus_one_threshold is None or count < self.n_plus_one_threshold
+                or statement_fingerprint in query_scope.flagged):
+            return
+
+        query_scope.flagged.add(statement_fingerprint)
+        with self._lock:
+            self._statement_stats(statement_fingerprint).n_plus_one += 1
+        self.logger.warning('Possible N+1 query, executed %s times in %s: %s',
+                            count, query_scope.name or 'the same scope', statement_fingerprint,
+                            extra={'query_fingerprint': statement_fingerprint})
+
+    def _handle_error(self, exception_context) -> None:
+        if exception_context.statement is None:
+            return
+        with self._lock:
+            self._statement_stats(fingerprint(exception_context.statement)).errors += 1
+
+    def record_rows(self, rows: int) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Add the rows fetched to the last statement executed in the current context, called by BaseDataManager
+        """
+        statement_fingerprint = _last_fingerprint.get()
+        if statement_fingerprint is None:
+            return
+        with self._lock:
+            self._statement_stats(statement_fingerprint).rows += rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the metrics of each statement fingerprint
+        """
+        with self._lock:
+            return {key: stats.snapshot() for key, stats in self._stats.items()}
+
+    def prometheus_text(self, prefix: str = 'rolf_sql') -> str:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the metrics in the Prometheus text exposition format.
+            The 'query' label is a short hash of the fingerprint, the 'statement' label has its first 200 characters
+        """
+        lines = [
+            f'# HELP {prefix}_query_duration_seconds Latency of the SQL statements',
+            f'# TYPE {prefix}_query_duration_seconds histogram',
+        ]
+        counters = {'rows': [], 'errors': [], 'n_plus_one': []}
+
+        for statement_fingerprint, stats in self.snapshot().items():
+            labels = (f'query="{hashlib.sha1(statement_fingerprint.encode()).hexdigest()[:12]}",'
+                      f'statement="{_escape_label(statement_fingerprint[:200])}"')
+            for bound, count in stats['histogram'].items():
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_query_duration_seconds_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f'{prefix}_query_duration_seconds_sum{{{labels}}} {stats["total_seconds"]}')
+            lines.append(f'{prefix}_query_duration_seconds_count{{{labels}}} {stats["count"]}')
+            for name, values in counters.items():
+                values.append(f'{prefix}_query_{name}_total{{{labels}}} {stats[name]}')
+
+        for name, values in counters.items():
+            lines.append(f'# TYPE {prefix}_query_{name}_total counter')
+            lines.extend(values)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class QueryScopeMiddleware:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Pure ASGI middleware that opens a query scope for each request, so N+1 queries are detected per request
+    """
+
+    def __init__(self, app: ASGIApp, instrumentation: QueryInstrumentation) -> None:
+        self.app = app
+        self.instrumentation = instrumentation
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        with self.instrumentation.scope(f"{scope['method']} {scope['path']}"):
+            await self.app(scope, receive, send)
@@ -0,0 +1,203 @@
+import os
+import threading
+from pathlib import Path
+
+from bson import json_util
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.log'
+# Segments with an entry that can't be read are renamed with this prefix, kept for inspection but not replayed
+QUARANTINE_PREFIX = 'quarantine-'
+
+
+class LogSpillBuffer:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Append-only segment files used to keep log entries on local disk while the database is unreachable.
+
+        Each line is one entry serialized with bson json_util (keeps datetimes and the _id, so a replayed entry
+        that was already written is detected as a duplicate). Segments are rotated by size and replayed oldest
+        first, a segment is deleted only after all its entries were written back.
+        Segments left by a previous process are found on start and replayed too.
+        A segment with a corrupt entry is quarantined (renamed, not replayed) from that entry on.
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_segment_bytes: int = 16 * 1024 * 1024,
+                 max_total_bytes: int = 1024 * 1024 * 1024):
+        """
+        :param directory: The directory where the segment files are stored
+        :param max_segment_bytes: Size that makes the active segment to be rotated
+        :param max_total_bytes: Max size of all segments, entries beyond it are rejected
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_total_bytes = max_total_bytes
+
+        self._lock = threading.Lock()
+        segments = self._segments()
+        self._sequence = int(segments[-1].name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) if segments else 0
+        self._total_bytes = sum(i.stat().st_size for i in segments)
+
+        self._active_file = None
+        self._active_path: Path | None = None
+        self._replay_path: Path | None = None
+        self._replay_offset = 0
+
+        self.appended = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.unserializable = 0
+        self.quarantined = 0
+
+    def _segments(self) -> list[Path]:
+        return sorted(self.directory.glob(f'{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}'))
+
+    def _open_segment(self) -> None:
+        self._sequence += 1
+        self._active_path = self.directory / f'{SEGMENT_PREFIX}{self._sequence:012d}{SEGMENT_SUFFIX}'
+        self._active_file = open(self._active_path, 'ab')
+
+    def _close_segment(self) -> None:
+        if self._active_file is not None:
+            self._active_file.close()
+        self._active_file = None
+        self._active_path = None
+
+    def append(self, entries: list[tuple[str, dict]]) -> int:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Append (collection, entry) pairs to the active segment.
+            Entries that can't be serialized (e.g. an object json_util does not know) are skipped, not the batch
+
+        :return: The number of entries appended, 0 if they were rejected because the max total size was reached
+        """
+        lines = []
+        for collection, entry in entries:
+            try:
+                lines.append(json_util.dumps({'c': collection, 'e': entry}).encode('utf-8') + b'\n')
+            except (TypeError, ValueError, OverflowError):
+                self.unserializable += 1
+        data = b''.join(lines)
+
+        with self._lock:
+            if self._total_bytes + len(data) > self.max_total_bytes:
+                self.rejected += len(lines)
+                return 0
+            if not lines:
+                return 0
+
+            if self._active_file is None:
+                self._open_segment()
+
+            self._active_file.write(data)
+            self._active_file.flush()
+            self._total_bytes += len(data)
+            self.appended += len(lines)
+
+            if self._active_file.tell() >= self.max_segment_bytes:
+                self._close_segment()
+
+        return len(lines)
+
+    def pending(self) -> bool:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Whether there are entries waiting to be replayed
+        """
+        return self._total_bytes > 0
+
+    def read_batch(self, max_entries: int) -> tuple[list[tuple[str, dict]], int]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Read the next entries to be replayed, from the oldest segment.
+            The entries are only removed after commit is called with the returned offset.
+
+        :return: The (collection, entry) pairs and the offset to be committed
+        """
+        with self._lock:
+            while True:
+                if self._replay_path is None:
+                    segments = [i for i in self._segments() if i != self._active_path]
+                    if not segments and self._active_path is not None:
+                        # Only the active segment has entries, rotate so it can be replayed
+                        self._close_segment()
+                        segments = self._segments()
+                    if not segments:
+                        return [], 0
+
+                    self._replay_path = segments[0]
+                    self._replay_offset = 0
+
+                entries = []
+                corrupt = False
+                with open(self._replay_path, 'rb') as file:
+                    file.seek(self._replay_offset)
+                    offset = self._replay_offset
+                    while len(entries) < max_entries:
+                        line = file.readline()
+                        # a line without the line break is a partial write left by a crash
+                        if not line.endswith(b'\n'):
+                            break
+                        try:
+                            item = json_util.loads(line)
+                            entries.append((item['c'], item['e']))
+                        except Exception:
+                            corrupt = True
+                            break
+                        offset = file.tell()
+
+                if entries:
+                    # a corrupt entry is found again (first) by the next read
+                    return entries, offset
+
+                if corrupt:
+                    self._quarantine_replay_segment()
+                else:
+                    # Nothing left to read in the segment
+                    self._remove_replay_segment()
+
+    def _quarantine_replay_segment(self) -> None:
+        self._total_bytes -= self._replay_path.stat().st_size - self._replay_offset
+        self._replay_path.rename(self._replay_path.with_name(QUARANTINE_PREFIX + self._replay_path.name))
+        self._replay_path = None
+        self._replay_offset = 0
+        self.quarantined += 1
+
+    def _remove_replay_segment(self) -> None:
+        self._total_bytes -= self._replay_path.stat().st_size - self._replay_offset
+        self._replay_path.unlink()
+        self._replay_path = None
+        self._replay_offset = 0
+
+    def commit(self, offset: int, count: int) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Mark the entries read until the offset as written, deleting the segment when all were written
+        """
+        with self._lock:
+            if self._replay_path is None:
+                return
+
+            self._total_bytes -= offset - self._replay_offset
+            self._replay_offset = offset
+            self.replayed += count
+
+            if offset >= self._replay_path.stat().st_size:
+                self._remove_replay_segment()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'segments': len(self._segments()),
+            'bytes': self._total_bytes,
+            'appended': self.appended,
+            'replayed': self.replayed,
+            'rejected': self.rejected,
+            'unserializable': self.unserializable,
+            'quarantined': self.quarantined,
+        }
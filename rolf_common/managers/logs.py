@@ -1,17 +1,76 @@
 import json
 import logging
 import datetime
+import threading
+import time
+from collections import deque
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from bson import ObjectId
+from pymongo.errors import (
+    AutoReconnect,
+    BulkWriteError,
+    ConnectionFailure,
+    DuplicateKeyError,
+    NetworkTimeout,
+    ServerSelectionTimeoutError,
+)
 
 from rolf_common.backend.nosql_database import NoSqlDatabaseSessionManager
+from rolf_common.managers.log_spill import LogSpillBuffer
 import asyncio
 
+DROP_NEW = 'drop_new'
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
+
+TIMESTAMP_FIELD = 'timestamp'
+# The errors of a database that can't be reached, the entries can be retried later
+UNAVAILABLE_ERRORS = (AutoReconnect, ConnectionFailure, ServerSelectionTimeoutError, NetworkTimeout)
+LOG_INDEXES = [
+    IndexModel([('level', ASCENDING), (TIMESTAMP_FIELD, DESCENDING)]),
+]
+REQUEST_LOG_INDEXES = [
+    IndexModel([('path', ASCENDING), ('status_code', ASCENDING), (TIMESTAMP_FIELD, DESCENDING)]),
+    IndexModel([('status_code', ASCENDING), (TIMESTAMP_FIELD, DESCENDING)]),
+]
+
 
 class BaseLogDataManager(logging.Handler):
     def __init__(self, connection_class: NoSqlDatabaseSessionManager, collection_name: str | None = None):
         super().__init__()
         self.db_connection_class: NoSqlDatabaseSessionManager = connection_class
         self.base_collection: str = collection_name or 'logs'
-        self.collection = self.base_collection
+
+    async def provision_collections(self, expire_after_seconds: int | None = 30 * 24 * 60 * 60,
+                                    request_expire_after_seconds: int | None = None,
+                                    timeseries: bool = True) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Create the log collections, with the expiry and the indexes on level, path and status_code.
+            Call it at startup (e.g. in the FastAPI lifespan), it does nothing on collections already set up.
+
+            Collections created before (e.g. by the first insert of an older version) are plain collections and can't
+            become time-series in place, their expiry is kept with a TTL index, see ensure_collection.
+
+            Time-series collections don't enforce a unique _id, so an entry replayed from the spill buffer after
+            a write that failed half way may be stored twice.
+
+        :param expire_after_seconds: Time the logs are kept, None to keep forever (removing an expiry already set)
+        :param request_expire_after_seconds: Time the request logs are kept, default is expire_after_seconds
+        :param timeseries: Whether time-series collections (on the timestamp) are used, otherwise TTL indexes
+        """
+        if request_expire_after_seconds is None:
+            request_expire_after_seconds = expire_after_seconds
+
+        await self.db_connection_class.ensure_collection(
+            self.base_collection, time_field=TIMESTAMP_FIELD, timeseries=timeseries,
+            expire_after_seconds=expire_after_seconds, indexes=LOG_INDEXES,
+        )
+        await self.db_connection_class.ensure_collection(
+            f'request_{self.base_collection}', time_field=TIMESTAMP_FIELD, timeseries=timeseries,
+            expire_after_seconds=request_expire_after_seconds, indexes=REQUEST_LOG_INDEXES,
+        )
 
     def emit(self, record):
         """
@@ -20,47 +79,383 @@ class BaseLogDataManager(logging.Handler):
         """
         try:
             log_entry = self._format_record(record)
+            collection = self._record_collection(record)
 
             loop = asyncio.get_event_loop()
             if loop.is_running():
                 asyncio.run_coroutine_threadsafe(
-                    self._emit_with_session(log_entry), loop
+                    self._emit_with_session(log_entry, collection), loop
                 )
             else:
-                loop.run_until_complete(self._emit_with_session(log_entry))
+                loop.run_until_complete(self._emit_with_session(log_entry, collection))
         except Exception as e:
             self.handleError(record)
 
-    async def _emit_with_session(self, log_entry):
+    async def _emit_with_session(self, log_entry, collection: str):
         """
         Created by: Lucas Penha de Moura - 21/11/2024
             Insert the new log into specified collection asynchronously
         """
         async with self.db_connection_class.session() as session:
-            await session[self.collection].insert_one(log_entry)
+            await session[collection].insert_one(log_entry)
+
+    def _record_collection(self, record) -> str:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the collection of the record, request logs go to the base collection with a 'request_' prefix
+        """
+        if record.__dict__.get('is_request'):
+            return 'request_' + self.base_collection
+        return self.base_collection
 
     def _format_record(self, record):
         """
         Created by: Lucas Penha de Moura - 21/11/2024
             Create the json to be inserted into the database
 
-            If it is a request log (set using extra field 'is_request') save in a different collection
-            By default it's the same name as base_collection with a 'request_' prefix
+            If it is a request log (set using extra field 'is_request') it's saved in a different collection,
+            see _record_collection. The middleware sends the request log already structured in the
+            'request_log' extra field, the message is only parsed for logs sent as json text.
+            The timestamp is stored as a BSON datetime, as required by time-series collections and TTL indexes.
         """
+        timestamp = datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc)
+
+        request_log = record.__dict__.get('request_log')
+        if request_log is not None:
+            # new dict, the driver adds the _id to the inserted document and the record is shared by handlers
+            return {TIMESTAMP_FIELD: timestamp, **request_log}
 
         is_request = record.__dict__.get('is_request')
         if is_request:
-            # If it is a request log (set using extra field 'is_request') save in a different collection
-            # By default it's the same name as base_collection with a 'request_' prefix
-            self.collection = 'request_' + self.base_collection
-            return json.loads(record.getMessage())
+            return {TIMESTAMP_FIELD: timestamp, **json.loads(record.getMessage())}
 
         return {
-            "timestamp": datetime.datetime.utcfromtimestamp(record.created).isoformat(),
+            TIMESTAMP_FIELD: timestamp,
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
             "function": record.funcName,
             "line": record.lineno,
-            "extra": record.__dict__.get("extra", {})  # Inclui campos adicionais
+            "extra": _bson_safe(record.__dict__.get("extra", {}))  # Inclui campos adicionais
+        }
+
+
+def _bson_safe(value):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the value with the types BSON can't encode (e.g. UUID, date, Decimal, ints beyond 64 bits)
+        converted to str, so one log record can't make the insert of its whole batch fail
+    """
+    if value is None or isinstance(value, (str, bool, float, datetime.datetime, ObjectId, bytes)):
+        return value
+    if isinstance(value, int):
+        return value if -2 ** 63 <= value < 2 ** 63 else str(value)
+    if isinstance(value, dict):
+        return {str(key): _bson_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_bson_safe(item) for item in value]
+    return str(value)
+
+
+class BufferedLogDataManager(BaseLogDataManager):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Log handler that does not write on emit. The records are put into a bounded buffer and a single
+        background task writes them with insert_many, when batch_size records are buffered or every flush_interval.
+
+        The writer must be started inside the event loop (e.g. in the FastAPI lifespan) with start(),
+        and stopped with stop(), that writes the records still buffered.
+
+        If a spill buffer is given, records are not lost when the database is slow or unreachable: failed batches
+        and records that don't fit in the memory buffer are appended to local disk, and replayed in small batches,
+        between the live writes, once the database is back.
+    """
+
+    def __init__(self, connection_class: NoSqlDatabaseSessionManager, collection_name: str | None = None,
+                 batch_size: int = 500, flush_interval: float = 1.0, max_buffer: int = 10000,
+                 overflow_policy: str = DROP_NEW, block_timeout: float = 1.0,
+                 spill: LogSpillBuffer | None = None, retry_interval: float = 5.0, replay_interval: float = 0.05):
+        """
+        :param connection_class: The NoSQL connection used to write the logs
+        :param collection_name: The base collection name, default 'logs'
+        :param batch_size: Max number of records written by each insert_many
+        :param flush_interval: Max time, in seconds, a record waits in the buffer
+        :param max_buffer: Max number of records in the buffer
+        :param overflow_policy: What to do when the buffer is full: 'drop_new' discard the new record,
+            'drop_oldest' discard the oldest buffered record, 'block' wait up to block_timeout for space and then
+            discard the new record (only when called outside the event loop thread, inside it behaves as 'drop_new'
+            since blocking would stop the writer)
+        :param block_timeout: Max time, in seconds, the 'block' policy waits
+        :param spill: Disk buffer used when the database fails or the memory buffer is full (instead of dropping)
+        :param retry_interval: Time, in seconds, the batches go straight to the spill buffer after a failed write
+        :param replay_interval: Time, in seconds, between two replayed batches, so live records have priority
+        """
+        super().__init__(connection_class, collection_name)
+        if overflow_policy not in (DROP_NEW, DROP_OLDEST, BLOCK):
+            raise ValueError(f'Invalid overflow policy {overflow_policy}')
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.spill = spill
+        self.retry_interval = retry_interval
+        self.replay_interval = replay_interval
+        self._unavailable_until = 0.0
+
+        self._buffer: deque[tuple[str, dict]] = deque()
+        self._condition = threading.Condition()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._writer: asyncio.Task | None = None
+        self._stopping = False
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.spilled = 0
+        self.spill_errors = 0
+        self.writer_errors = 0
+
+    def emit(self, record):
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Only format the record and put it into the buffer
+        """
+        try:
+            log_entry = self._format_record(record)
+            self._enqueue(self._record_collection(record), log_entry)
+        except Exception as e:
+            self.handleError(record)
+
+    def _enqueue(self, collection: str, log_entry: dict) -> None:
+        with self._condition:
+            if len(self._buffer) >= self.max_buffer:
+                if self.overflow_policy == DROP_OLDEST:
+                    self._spill_or_drop([self._buffer.popleft()])
+                elif self.overflow_policy == BLOCK and not self._in_loop_thread():
+                    self._condition.wait_for(lambda: len(self._buffer) < self.max_buffer, self.block_timeout)
+
+                if len(self._buffer) >= self.max_buffer:
+                    self._spill_or_drop([(collection, log_entry)])
+                    return
+
+            self._buffer.append((collection, log_entry))
+            self.enqueued += 1
+            buffered = len(self._buffer)
+
+        if buffered >= self.batch_size:
+            self._wake_writer()
+
+    def _spill_or_drop(self, entries: list[tuple[str, dict]]) -> None:
+        # The entries not spilled (no spill buffer, spill full or entries that can't be serialized) are dropped
+        spilled = 0
+        try:
+            if self.spill is not None:
+                spilled = self.spill.append(entries)
+        except OSError:
+            # e.g. disk full, the entries are dropped but the writer keeps running
+            self.spill_errors += 1
+
+        self.spilled += spilled
+        self.dropped += len(entries) - spilled
+
+    def _in_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _wake_writer(self) -> None:
+        if self._loop is None or self._wakeup is None:
+            return
+        if self._in_loop_thread():
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Start the background writer in the running event loop
+        """
+        if self._writer is not None and not self._writer.done():
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._writer = self._loop.create_task(self._run_writer())
+
+    async def stop(self) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Stop the background writer and write all records still in the buffer.
+            The writer is not cancelled, since a batch being written is already out of the buffer,
+            it's woken up to write the remaining records and then exits
+        """
+        if self._writer is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._writer
+            self._writer = None
+
+        await self.flush_async()
+        if self.spill is not None:
+            self.spill.close()
+
+    async def flush_async(self) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Write all records in the buffer
+        """
+        while self._buffer:
+            await self._write_batch()
+
+    async def _run_writer(self) -> None:
+        while True:
+            replaying = self.spill is not None and self.spill.pending() and self._available()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.replay_interval if replaying else self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if self._stopping:
+                await self.flush_async()
+                return
+
+            try:
+                while self._buffer:
+                    await self._write_batch()
+                    if len(self._buffer) < self.batch_size:
+                        break
+
+                if replaying and len(self._buffer) < self.batch_size:
+                    await self._replay_batch()
+            except Exception:
+                # An unexpected error must not stop the writer, or every later record would be lost
+                self.writer_errors += 1
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    async def _replay_batch(self) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Write back one batch of spilled records, they are removed from disk only if written
+        """
+        entries, offset = self.spill.read_batch(self.batch_size)
+        if not entries:
+            return
+
+        collections: dict[str, list[dict]] = {}
+        for collection, log_entry in entries:
+            collections.setdefault(collection, []).append(log_entry)
+
+        for collection, log_entries in collections.items():
+            if not await self._try_insert_many(collection, log_entries):
+                return
+
+        self.spill.commit(offset, len(entries))
+
+    def _take_batch(self) -> list[tuple[str, dict]]:
+        with self._condition:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            self._condition.notify_all()
+        return batch
+
+    async def _write_batch(self) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Write up to batch_size records, with one unordered insert_many per collection
+        """
+        batch = self._take_batch()
+
+        collections: dict[str, list[dict]] = {}
+        for collection, log_entry in batch:
+            collections.setdefault(collection, []).append(log_entry)
+
+        for collection, log_entries in collections.items():
+            await self._insert_many(collection, log_entries)
+
+    async def _insert_many(self, collection: str, log_entries: list[dict]) -> None:
+        # If the database failed recently, don't wait for it again
+        if (self.spill is None or self._available()) and await self._try_insert_many(collection, log_entries):
+            return
+
+        if self.spill is not None:
+            self._spill_or_drop([(collection, i) for i in log_entries])
+        else:
+            self.failed += len(log_entries)
+
+    async def _try_insert_many(self, collection: str, log_entries: list[dict]) -> bool:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Write the entries, return False if the database could not be reached (the entries can be retried)
+        """
+        try:
+            async with self.db_connection_class.session() as session:
+                await session[collection].insert_many(log_entries, ordered=False)
+            self.written += len(log_entries)
+        except BulkWriteError as e:
+            # with ordered=False the valid entries are written even if some fail,
+            # duplicated keys are entries already written before a retry
+            errors = e.details.get('writeErrors', [])
+            duplicated = len([i for i in errors if i.get('code') == 11000])
+            self.written += e.details.get('nInserted', 0) + duplicated
+            self.failed += len(errors) - duplicated
+        except UNAVAILABLE_ERRORS:
+            self._unavailable_until = time.monotonic() + self.retry_interval
+            return False
+        except Exception:
+            # A client side error (e.g. an entry bson can't encode) fails the whole insert_many,
+            # write the entries one by one so only the invalid ones are lost
+            return await self._insert_each(collection, log_entries)
+
+        return True
+
+    async def _insert_each(self, collection: str, log_entries: list[dict]) -> bool:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Write the entries one at a time, counting the ones that fail as failed.
+            Return False if the database could not be reached (the entries can be retried)
+        """
+        done = 0
+        try:
+            async with self.db_connection_class.session() as session:
+                for log_entry in log_entries:
+                    try:
+                        await session[collection].insert_one(log_entry)
+                        self.written += 1
+                    except DuplicateKeyError:
+                        # already written before a retry
+                        self.written += 1
+                    except UNAVAILABLE_ERRORS:
+                        raise
+                    except Exception:
+                        self.failed += 1
+                    done += 1
+        except UNAVAILABLE_ERRORS:
+            self._unavailable_until = time.monotonic() + self.retry_interval
+            return False
+        except Exception:
+            # e.g. the connection is not initialized, retrying would fail the same way
+            self.failed += len(log_entries) - done
+
+        return True
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'buffered': len(self._buffer),
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'spilled': self.spilled,
+            'spill_errors': self.spill_errors,
+            'writer_errors': self.writer_errors,
         }
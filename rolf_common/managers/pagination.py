@@ -0,0 +1,130 @@
+import base64
+import datetime
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import RowMapping, and_, or_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import ColumnElement, UnaryExpression
+
+NEXT = 'next'
+PREVIOUS = 'prev'
+
+
+@dataclass
+class KeysetPage:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        A page fetched using keyset pagination.
+        The cursors are opaque tokens that must be sent back to get the next or previous page.
+    """
+    items: list[RowMapping]
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+    has_more: bool | None = None
+    # Total of rows of the statement (all pages), only set when requested, see BaseDataManager.count
+    total: int | None = None
+
+
+def split_order_column(order_column: ColumnElement) -> tuple[ColumnElement, bool]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the column of an order by element and whether the order is descending
+    """
+    if isinstance(order_column, UnaryExpression) and order_column.modifier in (operators.desc_op, operators.asc_op):
+        return order_column.element, order_column.modifier is operators.desc_op
+
+    return order_column, False
+
+
+def keyset_condition(columns: Sequence[tuple[ColumnElement, bool]], values: Sequence[Any],
+                     direction: str = NEXT) -> ColumnElement[bool]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Build the where clause that selects the rows after (or before) the given key.
+
+        For (a, b) ordered ascending it's: a > x OR (a = x AND b > y).
+        The expanded form is used, instead of a row value comparison, to support mixed directions.
+
+    :param columns: The order columns and whether each one is descending
+    :param values: The key values of the last row seen
+    :param direction: NEXT to get the rows after the key, PREVIOUS to get the rows before
+    """
+    clauses = []
+    for idx, (column, descending) in enumerate(columns):
+        after = descending if direction == PREVIOUS else not descending
+        comparison = column > values[idx] if after else column < values[idx]
+        equals = [columns[i][0] == values[i] for i in range(idx)]
+        clauses.append(and_(*equals, comparison))
+
+    return or_(*clauses)
+
+
+def encode_cursor(direction: str, values: Sequence[Any]) -> str:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Encode the key of a row into an opaque url safe token
+    """
+    encoded = [i.isoformat() if isinstance(i, (datetime.datetime, datetime.date)) else
+               str(i) if isinstance(i, uuid.UUID) else i
+               for i in values]
+    token = json.dumps([direction, encoded], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(token).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, columns: Sequence[ColumnElement]) -> tuple[str, list[Any]]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Decode a token created by encode_cursor, converting the values back using the column types
+
+    :return: The direction and the key values
+    """
+    try:
+        token = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, encoded = json.loads(token)
+        if direction not in (NEXT, PREVIOUS) or len(encoded) != len(columns):
+            raise ValueError('Invalid cursor')
+
+        values = []
+        for column, value in zip(columns, encoded):
+            python_type = column.type.python_type
+            if value is None or isinstance(value, python_type):
+                values.append(value)
+            elif python_type is datetime.datetime:
+                values.append(datetime.datetime.fromisoformat(value))
+            elif python_type is datetime.date:
+                values.append(datetime.date.fromisoformat(value))
+            else:
+                values.append(python_type(value))
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid pagination cursor')
+
+    return direction, values
+
+
+def row_key(row: RowMapping, columns: Sequence[ColumnElement]) -> list[Any]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Get the values of the order columns from a fetched row.
+        The column can be selected directly or be an attribute of a selected model
+    """
+    values = []
+    for column in columns:
+        try:
+            values.append(row[column])
+            continue
+        except KeyError:
+            pass
+
+        for value in row.values():
+            if hasattr(value, '__mapper__') and column.table in value.__mapper__.tables:
+                values.append(getattr(value, column.key))
+                break
+        else:
+            raise ValueError(f'Order column {column.key} is not in the select statement')
+
+    return values
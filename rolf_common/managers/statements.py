@@ -0,0 +1,104 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Type
+
+from sqlalchemy import bindparam, exists, select
+from sqlalchemy.sql.expression import Executable
+
+from rolf_common.models.base import SQLModel
+
+OBJECT_ID_PARAM = 'object_id'
+OBJECT_IDS_PARAM = 'object_ids'
+
+
+def select_by_id(sql_model: Type[SQLModel], exclude_deleted: bool = False) -> Executable:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Select a model by id, the id is bound at execution with the OBJECT_ID_PARAM parameter
+    """
+    stmt = select(sql_model).where(sql_model.id == bindparam(OBJECT_ID_PARAM))
+    if exclude_deleted:
+        stmt = stmt.where(sql_model.deleted_at.is_(None))
+    return stmt
+
+
+def select_by_ids(sql_model: Type[SQLModel], exclude_deleted: bool = False) -> Executable:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Select a model by a list of ids, bound at execution with the OBJECT_IDS_PARAM parameter
+    """
+    stmt = select(sql_model).where(sql_model.id.in_(bindparam(OBJECT_IDS_PARAM, expanding=True)))
+    if exclude_deleted:
+        stmt = stmt.where(sql_model.deleted_at.is_(None))
+    return stmt
+
+
+def select_exists(sql_model: Type[SQLModel], exclude_deleted: bool = False) -> Executable:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Check if a model id exists, the id is bound at execution with the OBJECT_ID_PARAM parameter
+    """
+    condition = sql_model.id == bindparam(OBJECT_ID_PARAM)
+    if exclude_deleted:
+        condition = condition & sql_model.deleted_at.is_(None)
+    return select(exists().where(condition))
+
+
+class StatementCache:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Keep the generic statements of each model built once, with bound parameters, so they are not
+        rebuilt on every call. Since the same statement object is executed, SQLAlchemy also reuses its compiled form.
+        The number of statements is bounded, the least recently used are evicted first.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        """
+        :param max_size: Max number of statements kept in the cache
+        """
+        self.max_size = max_size
+        self._statements: OrderedDict[tuple[Any, ...], Executable] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple[Hashable, ...], builder: Callable[[], Executable]) -> Executable:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the statement stored with the key, building it if not stored yet
+        """
+        stmt = self._statements.get(key)
+        if stmt is not None:
+            self._statements.move_to_end(key)
+            self.hits += 1
+            return stmt
+
+        self.misses += 1
+        stmt = self._statements[key] = builder()
+        while len(self._statements) > self.max_size:
+            self._statements.popitem(last=False)
+            self.evictions += 1
+        return stmt
+
+    def by_id(self, sql_model: Type[SQLModel], exclude_deleted: bool = False) -> Executable:
+        return self.get((sql_model, 'by_id', exclude_deleted), lambda: select_by_id(sql_model, exclude_deleted))
+
+    def by_ids(self, sql_model: Type[SQLModel], exclude_deleted: bool = False) -> Executable:
+        return self.get((sql_model, 'by_ids', exclude_deleted), lambda: select_by_ids(sql_model, exclude_deleted))
+
+    def exists(self, sql_model: Type[SQLModel], exclude_deleted: bool = False) -> Executable:
+        return self.get((sql_model, 'exists', exclude_deleted), lambda: select_exists(sql_model, exclude_deleted))
+
+    def clear(self) -> None:
+        self._statements.clear()
+
+    def stats(self) -> dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            'size': len(self._statements),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'evictions': self.evictions,
+        }
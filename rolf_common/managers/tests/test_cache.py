@@ -0,0 +1,129 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from rolf_common.conftest import count_statements
+from rolf_common.managers import BaseDataManager
+from rolf_common.managers.cache import BaseEntityCache, LRUEntityCache
+from rolf_common.models.tests.dummy import DummyModel
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl():
+    cache = LRUEntityCache(max_size=2, ttl=60)
+    await cache.set(DummyModel, 1, {"name": "one"})
+    await cache.set(DummyModel, 2, {"name": "two"})
+    assert await cache.get(DummyModel, 1) == {"name": "one"}
+
+    # 2 is the least recently used
+    await cache.set(DummyModel, 3, {"name": "three"})
+    assert await cache.get(DummyModel, 2) is None
+    assert cache.stats()["evictions"] == 1
+
+    cache.ttl = -1
+    await cache.set(DummyModel, 4, {"name": "four"})
+    assert await cache.get(DummyModel, 4) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["expirations"] == 1
+
+
+@pytest_asyncio.fixture
+async def cached_objects(async_engine):
+    async with async_sessionmaker(async_engine, expire_on_commit=False)() as session:
+        objects = await BaseDataManager(session).add_all([DummyModel(name=f"Cached {i}") for i in range(3)])
+        await session.commit()
+    return objects
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_cache(async_engine, cached_objects):
+    cache = LRUEntityCache()
+    session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
+    object_id = cached_objects[0].id
+
+    async with session_maker() as session:
+        obj = await BaseDataManager(session, cache=cache).get_by_id(DummyModel, object_id)
+        assert obj.name == "Cached 0"
+
+    async with session_maker() as session:
+        with count_statements(async_engine) as statements:
+            obj = await BaseDataManager(session, cache=cache).get_by_id(DummyModel, object_id)
+
+        assert statements == []
+        assert obj.name == "Cached 0"
+        assert obj in session
+
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_by_ids_cache(async_engine, cached_objects):
+    cache = LRUEntityCache()
+    session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
+    ids = [i.id for i in cached_objects]
+
+    async with session_maker() as session:
+        await BaseDataManager(session, cache=cache).get_by_id(DummyModel, ids[1])
+
+        with count_statements(async_engine) as statements:
+            objects = await BaseDataManager(session, cache=cache).get_by_ids(DummyModel, ids)
+
+    assert [i.id for i in objects] == ids
+    assert len(statements) == 1
+    assert cache.stats()["size"] == 3
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_cache(async_engine, cached_objects):
+    cache = LRUEntityCache()
+    session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
+    object_id = cached_objects[0].id
+
+    async with session_maker() as session:
+        manager = BaseDataManager(session, cache=cache)
+        obj = await manager.get_by_id(DummyModel, object_id)
+        stmt = update(DummyModel).where(DummyModel.id == object_id).values(name="Cached changed")
+        await manager.update_one(stmt, obj)
+        await session.commit()
+
+        assert await cache.get(DummyModel, object_id) is None
+
+        # Written sessions don't populate the cache
+        await manager.get_by_id(DummyModel, object_id)
+        assert cache.stats()["size"] == 0
+
+    async with session_maker() as session:
+        obj = await BaseDataManager(session, cache=cache).get_by_id(DummyModel, object_id)
+        assert obj.name == "Cached changed"
+
+
+@pytest.mark.asyncio
+async def test_commit_invalidates_entries_cached_after_the_write(async_engine, cached_objects):
+    cache = LRUEntityCache()
+    session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
+    object_id = cached_objects[1].id
+
+    async with session_maker() as session:
+        manager = BaseDataManager(session, cache=cache)
+        obj = await manager.get_by_id(DummyModel, object_id)
+        stmt = update(DummyModel).where(DummyModel.id == object_id).values(name="Cached committed")
+        await manager.update_one(stmt, obj)
+
+        # Before the commit, another session still reads the old row and caches it
+        await cache.set(DummyModel, object_id, {**obj.to_dict(), "name": "Cached 1"})
+
+        await session.commit()
+        assert await cache.get(DummyModel, object_id) is None
+
+    async with session_maker() as session:
+        obj = await BaseDataManager(session, cache=cache).get_by_id(DummyModel, object_id)
+        assert obj.name == "Cached committed"
+
+
+def test_entity_cache_is_abstract():
+    with pytest.raises(TypeError):
+        BaseEntityCache()
@@ -0,0 +1,106 @@
+import datetime
+import io
+import uuid
+
+import pytest
+from sqlalchemy import Integer, func, select, type_coerce
+
+from rolf_common.managers import BaseDataManager
+from rolf_common.managers import columnar
+from rolf_common.models.tests.dummy import DummyModel
+
+pytestmark = pytest.mark.skipif(columnar.pa is None, reason="pyarrow is not installed")
+
+
+async def add_dummies(manager: BaseDataManager, prefix: str, amount: int) -> list[DummyModel]:
+    now = datetime.datetime(2026, 10, 16, 12, tzinfo=datetime.timezone.utc)
+    models = [
+        DummyModel(name=f"{prefix} {i}", description=None if i % 2 else f"Description {i}",
+                   edited_at=now if i % 2 else None, created_by=uuid.uuid4())
+        for i in range(amount)
+    ]
+    return await manager.add_all(models, refresh_response=False)
+
+
+@pytest.mark.asyncio
+async def test_stream_arrow_types(session):
+    manager = BaseDataManager(session)
+    prefix = uuid.uuid4().hex[:8]
+    models = await add_dummies(manager, prefix, 10)
+
+    stmt = select(DummyModel).where(DummyModel.name.startswith(prefix)).order_by(DummyModel.name)
+    batches = [i async for i in manager.stream_arrow(stmt, chunk_size=4)]
+    assert [i.num_rows for i in batches] == [4, 4, 2]
+
+    schema = batches[0].schema
+    assert schema == columnar.arrow_schema(stmt)
+    assert schema.field("id").type == columnar.pa.uuid()
+    assert schema.field("edited_at").type == columnar.pa.timestamp("us", tz="UTC")
+    assert not schema.field("name").nullable
+    assert schema.field("description").nullable
+
+    table = columnar.pa.Table.from_batches(batches)
+    assert table.column("id").to_pylist() == [i.id for i in models]
+    assert table.column("created_by").to_pylist() == [i.created_by for i in models]
+    assert table.column("description").null_count == 5
+    assert table.column("edited_at")[1].as_py() == datetime.datetime(2026, 10, 16, 12, tzinfo=datetime.timezone.utc)
+
+
+def test_timezone_aware_values():
+    converter = columnar.ColumnarConverter(select(DummyModel.created_at, DummyModel.edited_at))
+    brasilia = datetime.timezone(datetime.timedelta(hours=-3))
+    batch = converter.record_batch([
+        (datetime.datetime(2026, 10, 16, 12, tzinfo=brasilia), None),
+        # Naive values (SQLite) are taken as UTC
+        (datetime.datetime(2026, 10, 16, 12), datetime.datetime(2026, 10, 16, 12)),
+    ])
+
+    assert [i.hour for i in batch.column("created_at").to_pylist()] == [15, 12]
+    assert batch.column("edited_at").null_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_arrow_and_numpy(session):
+    manager = BaseDataManager(session)
+    prefix = uuid.uuid4().hex[:8]
+    await add_dummies(manager, prefix, 6)
+
+    # Expressions without a type are exported as text, so the length is typed
+    length = type_coerce(func.length(DummyModel.name), Integer).label("length")
+    stmt = (
+        select(DummyModel.id, DummyModel.active, DummyModel.edited_at, length)
+        .where(DummyModel.name.startswith(prefix))
+    )
+    table = await manager.get_arrow(stmt)
+    assert table.column_names == ["id", "active", "edited_at", "length"]
+    assert table.num_rows == 6
+
+    arrays = await manager.get_numpy(stmt)
+    assert arrays["length"].sum() == 6 * len(f"{prefix} 0")
+    assert arrays["active"].all()
+    assert arrays["edited_at"].mask.tolist() == [True, False] * 3
+    assert isinstance(arrays["id"][0], uuid.UUID)
+
+    empty = await manager.get_arrow(stmt.where(DummyModel.name == "Missing"))
+    assert empty.num_rows == 0
+    assert empty.schema == table.schema
+
+
+@pytest.mark.asyncio
+async def test_ipc_and_parquet_streams(session):
+    manager = BaseDataManager(session)
+    prefix = uuid.uuid4().hex[:8]
+    await add_dummies(manager, prefix, 9)
+    stmt = select(DummyModel.name, DummyModel.created_by).where(DummyModel.name.startswith(prefix))
+    schema = columnar.arrow_schema(stmt)
+
+    chunks = [i async for i in columnar.arrow_ipc_stream(manager.stream_arrow(stmt, chunk_size=4), schema)]
+    assert len(chunks) > 3
+    table = columnar.pa.ipc.open_stream(b"".join(chunks)).read_all()
+    assert table.num_rows == 9
+    assert table.schema == schema
+
+    chunks = [i async for i in columnar.parquet_stream(manager.stream_arrow(stmt, chunk_size=4), schema)]
+    parquet = columnar.pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.read().column("name").to_pylist() == [f"{prefix} {i}" for i in range(9)]
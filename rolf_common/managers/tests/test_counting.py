@@ -0,0 +1,108 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from rolf_common.conftest import count_statements
+from rolf_common.managers import BaseDataManager
+from rolf_common.managers.counting import CACHED, ESTIMATE, EXACT, CountCache, Explain, plain_table, plan_rows
+from rolf_common.models.tests.dummy import DummyModel
+
+
+async def add_dummies(manager: BaseDataManager, prefix: str, amount: int) -> None:
+    await manager.add_all([DummyModel(name=f"{prefix} {i}", description=str(i % 3)) for i in range(amount)],
+                          refresh_response=False)
+
+
+@pytest.mark.asyncio
+async def test_exact_count(session):
+    manager = BaseDataManager(session)
+    prefix = uuid.uuid4().hex[:8]
+    await add_dummies(manager, prefix, 30)
+
+    stmt = select(DummyModel).where(DummyModel.name.startswith(prefix))
+    assert await manager.count(stmt) == 30
+    # order by, limit and offset are ignored, the total of all pages is counted
+    assert await manager.count(stmt.order_by(DummyModel.name).limit(5).offset(10)) == 30
+    assert await manager.count(stmt.where(DummyModel.description == "0")) == 10
+    assert await manager.count(
+        select(DummyModel.description).where(DummyModel.name.startswith(prefix)).distinct()
+    ) == 3
+
+
+@pytest.mark.asyncio
+async def test_estimate_count(session, monkeypatch):
+    manager = BaseDataManager(session)
+    prefix = uuid.uuid4().hex[:8]
+    await add_dummies(manager, prefix, 10)
+    stmt = select(DummyModel).where(DummyModel.name.startswith(prefix))
+
+    # Without planner estimates (SQLite) the rows are counted
+    assert await manager.count(stmt, ESTIMATE) == 10
+
+    async def estimate(select_statement, params=None):
+        return 5000
+
+    monkeypatch.setattr(manager, "_estimate_count", estimate)
+    assert await manager.count(stmt, ESTIMATE) == 5000
+    # Estimates below exact_below are replaced by the exact count
+    assert await manager.count(stmt, ESTIMATE, exact_below=10000) == 10
+
+
+@pytest.mark.asyncio
+async def test_cached_count(session, async_engine):
+    prefix = uuid.uuid4().hex[:8]
+    await add_dummies(BaseDataManager(session), prefix, 4)
+    await session.commit()
+
+    async with AsyncSession(async_engine, expire_on_commit=False) as read_session:
+        manager = BaseDataManager(read_session)
+        manager.count_cache = CountCache(ttl=60)
+
+        stmt = select(DummyModel).where(DummyModel.name.startswith(prefix))
+        assert await manager.count(stmt, CACHED) == 4
+
+        with count_statements(async_engine) as statements:
+            assert await manager.count(stmt, CACHED) == 4
+        assert statements == []
+
+        # Other values of the same filter are other entries
+        assert await manager.count(select(DummyModel).where(DummyModel.name.startswith(f"{prefix} 1")), CACHED) == 1
+        assert manager.count_cache.stats()["size"] == 2
+
+        # Writing to the table invalidates its counts
+        await add_dummies(manager, prefix, 2)
+        assert manager.count_cache.stats()["size"] == 0
+        assert await manager.count(stmt, CACHED) == 6
+
+
+@pytest.mark.asyncio
+async def test_page_total(session):
+    manager = BaseDataManager(session)
+    prefix = uuid.uuid4().hex[:8]
+    await add_dummies(manager, prefix, 12)
+
+    stmt = select(DummyModel.id, DummyModel.name).where(DummyModel.name.startswith(prefix))
+    page = await manager.get_page(stmt, order_by=[DummyModel.name], page_size=5, count_strategy=EXACT)
+    assert len(page.items) == 5
+    assert page.total == 12
+
+    page = await manager.get_page(stmt, order_by=[DummyModel.name], page_size=5)
+    assert page.total is None
+
+
+def test_postgres_estimate_statements():
+    stmt = select(DummyModel).where(DummyModel.name == "Estimate")
+    compiled = Explain(stmt).compile(dialect=postgresql.asyncpg.dialect())
+    assert str(compiled).startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert compiled.params == {"name_1": "Estimate"}
+
+    assert plain_table(select(DummyModel)) is DummyModel.__table__
+    assert plain_table(stmt) is None
+    assert plain_table(select(DummyModel.name).distinct()) is None
+
+    plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1234}}]
+    assert plan_rows(plan) == plan_rows(json.dumps(plan)) == 1234
@@ -0,0 +1,104 @@
+import logging
+
+import pytest
+from sqlalchemy import select, text
+
+from rolf_common.managers import BaseDataManager
+from rolf_common.managers.counting import CACHED, EXACT, CountCache
+from rolf_common.managers.instrumentation import QueryInstrumentation, fingerprint
+from rolf_common.models.tests.dummy import DummyModel
+
+
+@pytest.fixture
+def instrumentation(async_engine):
+    instrumentation = QueryInstrumentation(slow_query_ms=None, n_plus_one_threshold=5)
+    instrumentation.attach(async_engine)
+    yield instrumentation
+    instrumentation.detach(async_engine)
+
+
+def test_fingerprint():
+    assert fingerprint("SELECT * FROM dummy WHERE id IN (?, ?, ?) AND name = 'a'") == (
+        "SELECT * FROM dummy WHERE id IN (...) AND name = ?"
+    )
+    assert fingerprint("SELECT *\n  FROM dummy WHERE id = $1 LIMIT 10") == "SELECT * FROM dummy WHERE id = ? LIMIT ?"
+
+
+@pytest.mark.asyncio
+async def test_statement_histogram_and_rows(session, instrumentation):
+    manager = BaseDataManager(session)
+    manager.instrumentation = instrumentation
+    await manager.add_all([DummyModel(name=f"Instrumented {i}") for i in range(3)], refresh_response=False)
+
+    await manager.get_all(select(DummyModel).where(DummyModel.name.like("Instrumented%")))
+    await manager.get_all(select(DummyModel).where(DummyModel.name.like("Instrumented 1")))
+
+    snapshot = instrumentation.snapshot()
+    [(statement, stats)] = [i for i in snapshot.items() if "LIKE" in i[0]]
+    assert statement.startswith("SELECT dummy.")
+    assert stats["count"] == 2
+    assert stats["rows"] == 4
+    assert stats["histogram"][float("inf")] == 2
+
+    assert any(i.startswith("INSERT INTO dummy") for i in snapshot)
+
+
+@pytest.mark.asyncio
+async def test_count_rows(session, instrumentation):
+    manager = BaseDataManager(session)
+    manager.instrumentation = instrumentation
+    manager.count_cache = CountCache()
+    stmt = select(DummyModel).where(DummyModel.name.like("Counted%"))
+
+    await manager.count(stmt, EXACT)
+    await manager.count(stmt, CACHED)
+    # Served from the cache, nothing executed
+    await manager.count(stmt, CACHED)
+
+    [stats] = [v for k, v in instrumentation.snapshot().items() if k.startswith("SELECT count(*)")]
+    assert stats["count"] == 2
+    assert stats["rows"] == 2
+
+
+@pytest.mark.asyncio
+async def test_n_plus_one_detection(session, instrumentation, caplog):
+    manager = BaseDataManager(session)
+    objects = await manager.add_all([DummyModel(name=f"N+1 {i}") for i in range(6)], refresh_response=False)
+
+    with caplog.at_level(logging.WARNING, logger="rolf_common.sql"):
+        with instrumentation.scope("GET /dummies") as scope:
+            for obj in objects:
+                await session.execute(select(DummyModel.name).where(DummyModel.id == obj.id))
+        # outside the scope nothing is counted
+        for obj in objects:
+            await session.execute(select(DummyModel.name).where(DummyModel.id == obj.id))
+
+    assert len(scope.flagged) == 1
+    messages = [i.getMessage() for i in caplog.records]
+    assert len(messages) == 1
+    assert messages[0].startswith("Possible N+1 query, executed 5 times in GET /dummies")
+
+    [stats] = [i for i in instrumentation.snapshot().values() if i["n_plus_one"]]
+    assert stats["count"] == 12
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log_and_errors(session, async_engine, caplog):
+    instrumentation = QueryInstrumentation(slow_query_ms=0)
+    instrumentation.attach(async_engine)
+    try:
+        with caplog.at_level(logging.WARNING, logger="rolf_common.sql"):
+            await session.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            await BaseDataManager(session).get_only_one(text("SELECT * FROM missing_table"))
+    finally:
+        instrumentation.detach(async_engine)
+
+    assert caplog.records[0].query_fingerprint == "SELECT ?"
+    assert instrumentation.snapshot()["SELECT * FROM missing_table"]["errors"] == 1
+
+    metrics = instrumentation.prometheus_text()
+    assert 'rolf_sql_query_duration_seconds_count{query="' in metrics
+    assert 'statement="SELECT ?"} 1' in metrics
+    assert 'le="+Inf"' in metrics
+    assert "# TYPE rolf_sql_query_errors_total counter" in metrics
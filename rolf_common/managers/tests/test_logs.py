@@ -0,0 +1,504 @@
+import asyncio
+import datetime
+import logging
+import uuid
+from contextlib import asynccontextmanager
+
+import bson
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, OperationFailure
+
+from rolf_common.backend.nosql_database import NoSqlDatabaseSessionManager
+from rolf_common.managers.log_spill import LogSpillBuffer
+from rolf_common.managers.logs import DROP_OLDEST, BaseLogDataManager, BufferedLogDataManager
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+        self.insert_many_calls = 0
+
+    async def insert_one(self, document):
+        self.documents.append(document)
+
+    async def insert_many(self, documents, ordered=True):
+        self.insert_many_calls += 1
+        self.documents.extend(documents)
+
+
+class FakeConnection:
+    """Stand-in for NoSqlDatabaseSessionManager, keeps the documents in memory."""
+
+    def __init__(self):
+        self.collections: dict[str, FakeCollection] = {}
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+def make_record(message, is_request=False):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+    if is_request:
+        record.is_request = True
+    return record
+
+
+@pytest.mark.asyncio
+async def test_buffered_handler_batches_writes():
+    connection = FakeConnection()
+    handler = BufferedLogDataManager(connection, batch_size=10, flush_interval=60)
+    await handler.start()
+
+    for i in range(25):
+        handler.emit(make_record(f"message {i}"))
+    handler.emit(make_record('{"path": "/"}', is_request=True))
+
+    # the batch size is reached, so the writer wakes up before the flush interval
+    await asyncio.sleep(0.05)
+    assert connection["logs"].insert_many_calls >= 2
+
+    await handler.stop()
+
+    assert len(connection["logs"].documents) == 25
+    request_log = connection["request_logs"].documents[0]
+    assert request_log["path"] == "/"
+    assert isinstance(request_log["timestamp"], datetime.datetime)
+    assert handler.stats()["written"] == 26
+    assert handler.stats()["buffered"] == 0
+
+
+class SlowCollection(FakeCollection):
+    async def insert_many(self, documents, ordered=True):
+        await asyncio.sleep(0.05)
+        await super().insert_many(documents, ordered)
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_the_batch_being_written():
+    connection = FakeConnection()
+    connection.collections["logs"] = SlowCollection()
+    handler = BufferedLogDataManager(connection, batch_size=5, flush_interval=60)
+    await handler.start()
+
+    for i in range(10):
+        handler.emit(make_record(f"message {i}"))
+    # the writer is inside insert_many, with the first batch out of the buffer
+    await asyncio.sleep(0.01)
+    await handler.stop()
+
+    assert handler.stats()["written"] == 10
+    assert len(connection["logs"].documents) == 10
+
+
+def test_request_log_is_not_parsed_again():
+    handler = BufferedLogDataManager(FakeConnection())
+    request_log = {"path": "/", "status_code": 200}
+
+    record = make_record("GET / 200", is_request=True)
+    record.request_log = request_log
+    handler.emit(record)
+    handler.emit(make_record("message"))
+
+    collection, entry = handler._buffer[0]
+    assert collection == "request_logs"
+    assert entry == {"timestamp": entry["timestamp"], **request_log}
+    assert "timestamp" not in request_log
+    assert handler._buffer[1][0] == "logs"
+    # routing a request log to its collection doesn't change the handler
+    assert handler._record_collection(make_record("message")) == "logs"
+
+
+@pytest.mark.asyncio
+async def test_buffered_handler_overflow():
+    connection = FakeConnection()
+    handler = BufferedLogDataManager(connection, batch_size=100, max_buffer=5)
+    for i in range(8):
+        handler.emit(make_record(f"message {i}"))
+
+    oldest = BufferedLogDataManager(connection, collection_name="oldest", max_buffer=5, overflow_policy=DROP_OLDEST)
+    for i in range(8):
+        oldest.emit(make_record(f"message {i}"))
+
+    await handler.flush_async()
+    await oldest.flush_async()
+
+    assert handler.stats()["dropped"] == 3
+    assert [i["message"] for i in connection["logs"].documents] == [f"message {i}" for i in range(5)]
+    assert oldest.stats()["dropped"] == 3
+    assert [i["message"] for i in connection["oldest"].documents] == [f"message {i}" for i in range(3, 8)]
+
+
+class FailingCollection(FakeCollection):
+    def __init__(self, connection):
+        super().__init__()
+        self.connection = connection
+
+    async def insert_many(self, documents, ordered=True):
+        if self.connection.offline:
+            # pymongo sets the _id before sending the documents
+            for document in documents:
+                document.setdefault("_id", ObjectId())
+            raise AutoReconnect("connection refused")
+        await super().insert_many(documents, ordered)
+
+
+class FailingConnection(FakeConnection):
+    def __init__(self):
+        super().__init__()
+        self.offline = True
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FailingCollection(self))
+
+
+@pytest.mark.asyncio
+async def test_spill_when_database_is_unreachable(tmp_path):
+    connection = FailingConnection()
+    spill = LogSpillBuffer(tmp_path, max_segment_bytes=2048)
+    handler = BufferedLogDataManager(connection, batch_size=10, max_buffer=20, spill=spill,
+                                     retry_interval=0, replay_interval=0.01, flush_interval=0.01)
+
+    # More records than the memory buffer holds, without the writer running
+    for i in range(50):
+        handler.emit(make_record(f"offline {i}"))
+    await handler.flush_async()
+
+    assert handler.stats()["dropped"] == 0
+    assert handler.stats()["spilled"] == 50
+    assert spill.stats()["segments"] > 1
+    assert connection["logs"].documents == []
+
+    # The database is back, live records are written while the spilled ones are replayed
+    connection.offline = False
+    await handler.start()
+    for i in range(5):
+        handler.emit(make_record(f"online {i}"))
+
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if not spill.pending():
+            break
+    await handler.stop()
+
+    messages = [i["message"] for i in connection["logs"].documents]
+    assert sorted(messages) == sorted([f"offline {i}" for i in range(50)] + [f"online {i}" for i in range(5)])
+    # live records did not wait for the whole replay
+    assert messages.index("online 0") < messages.index("offline 49")
+    assert spill.stats()["segments"] == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spill_replays_segments_left_by_previous_process(tmp_path):
+    spill = LogSpillBuffer(tmp_path)
+    spill.append([("logs", {"message": f"message {i}"}) for i in range(3)])
+    spill.close()
+    with open(next(tmp_path.iterdir()), "ab") as file:
+        file.write(b'{"c": "logs", "e": {"mess')
+
+    restarted = LogSpillBuffer(tmp_path)
+    entries, offset = restarted.read_batch(10)
+    restarted.commit(offset, len(entries))
+
+    assert [i[1]["message"] for i in entries] == ["message 0", "message 1", "message 2"]
+    assert restarted.read_batch(10) == ([], 0)
+    assert not restarted.pending()
+
+
+def test_spill_quarantines_corrupt_segment(tmp_path):
+    spill = LogSpillBuffer(tmp_path, max_segment_bytes=1)
+    spill.append([("logs", {"message": "message 0"}), ("logs", {"message": "message 1"})])
+    spill.append([("logs", {"message": "message 2"})])
+    spill.close()
+    first = sorted(tmp_path.iterdir())[0]
+    lines = first.read_bytes().splitlines(keepends=True)
+    first.write_bytes(lines[0] + b'{"c": "logs", "e": \n')
+
+    restarted = LogSpillBuffer(tmp_path)
+    replayed = []
+    while restarted.pending():
+        entries, offset = restarted.read_batch(10)
+        restarted.commit(offset, len(entries))
+        replayed.extend(i[1]["message"] for i in entries)
+
+    assert replayed == ["message 0", "message 2"]
+    assert restarted.stats()["quarantined"] == 1
+    assert [i.name for i in tmp_path.iterdir()] == ["quarantine-" + first.name]
+
+
+class FullDiskSpill(LogSpillBuffer):
+    def append(self, entries):
+        raise OSError(28, "No space left on device")
+
+
+@pytest.mark.asyncio
+async def test_writer_survives_spill_errors(tmp_path):
+    connection = FailingConnection()
+    handler = BufferedLogDataManager(connection, batch_size=5, flush_interval=0.01, spill=FullDiskSpill(tmp_path))
+    await handler.start()
+
+    for i in range(5):
+        handler.emit(make_record(f"offline {i}"))
+    await asyncio.sleep(0.05)
+
+    connection.offline = False
+    handler.retry_interval = 0
+    handler._unavailable_until = 0
+    for i in range(3):
+        handler.emit(make_record(f"online {i}"))
+    await asyncio.sleep(0.05)
+
+    assert not handler._writer.done()
+    await handler.stop()
+
+    stats = handler.stats()
+    assert stats["dropped"] == 5
+    assert stats["spill_errors"] == 1
+    assert [i["message"] for i in connection["logs"].documents] == [f"online {i}" for i in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_spill_skips_entries_that_cannot_be_serialized(tmp_path):
+    connection = FailingConnection()
+    spill = LogSpillBuffer(tmp_path)
+    handler = BufferedLogDataManager(connection, batch_size=10, spill=spill)
+
+    for i in range(3):
+        handler.emit(make_record(f"offline {i}"))
+    # An entry json_util can't serialize, e.g. built by a subclass with its own _format_record
+    handler._enqueue("logs", {"message": "bad", "extra": {"value": object()}})
+    await handler.flush_async()
+
+    stats = handler.stats()
+    assert stats["spilled"] == 3
+    assert stats["dropped"] == 1
+    assert stats["writer_errors"] == 0
+    assert spill.stats()["unserializable"] == 1
+    assert [i[1]["message"] for i in spill.read_batch(10)[0]] == [f"offline {i}" for i in range(3)]
+
+
+class EncodingCollection(FakeCollection):
+    """Encode the documents like the driver, so values bson can't encode raise before anything is written."""
+
+    async def insert_one(self, document):
+        bson.encode(document)
+        await super().insert_one(document)
+
+    async def insert_many(self, documents, ordered=True):
+        for document in documents:
+            bson.encode(document)
+        await super().insert_many(documents, ordered)
+
+
+class EncodingConnection(FakeConnection):
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, EncodingCollection())
+
+
+@pytest.mark.asyncio
+async def test_invalid_entry_does_not_fail_its_batch(tmp_path):
+    connection = EncodingConnection()
+    handler = BufferedLogDataManager(connection, batch_size=10, spill=LogSpillBuffer(tmp_path))
+
+    record = make_record("with extra")
+    record.extra = {"id": uuid.UUID(int=1), "day": datetime.date(2026, 10, 16), "big": 2 ** 70, "tags": ("a", "b")}
+    handler.emit(record)
+    handler.emit(make_record("plain"))
+    # An entry bson can't encode, e.g. built by a subclass with its own _format_record
+    handler._enqueue("logs", {"message": "bad", "id": uuid.UUID(int=2)})
+    await handler.flush_async()
+
+    documents = connection["logs"].documents
+    assert [i["message"] for i in documents] == ["with extra", "plain"]
+    assert documents[0]["extra"] == {
+        "id": "00000000-0000-0000-0000-000000000001", "day": "2026-10-16", "big": str(2 ** 70), "tags": ["a", "b"],
+    }
+
+    stats = handler.stats()
+    assert stats["written"] == 2
+    assert stats["failed"] == 1
+    assert stats["spilled"] == 0
+    # The database is not taken as unreachable, the next batches are written
+    assert handler._available()
+
+
+class ProvisioningDatabase:
+    """
+    Stand-in for a MongoDB database that keeps the collection options and indexes, and records the collections
+    created, the collMod commands and the indexes created, with their exact keys and options.
+    Like MongoDB, the expiry of the collection can only be changed on time-series collections.
+    """
+
+    def __init__(self):
+        self.options: dict[str, dict] = {}
+        self.indexes: dict[str, dict[str, dict]] = {}
+        self.created_collections = []
+        self.commands = []
+        self.created_indexes = []
+        self.dropped_indexes = []
+
+    def add_plain_collection(self, name):
+        # Created by the first insert, as the handler did before provisioning
+        self.options[name] = {}
+        self.indexes[name] = {}
+
+    async def list_collections(self, filter=None):
+        return ProvisioningCursor([
+            {"name": name, "type": "collection", "options": options}
+            for name, options in self.options.items() if filter is None or name == filter["name"]
+        ])
+
+    async def create_collection(self, name, **options):
+        self.add_plain_collection(name)
+        self.options[name] = options
+        self.created_collections.append((name, options))
+
+    async def command(self, command, name, **options):
+        collection_options = self.options[name]
+        if "expireAfterSeconds" in options:
+            if "timeseries" not in collection_options and "clusteredIndex" not in collection_options:
+                raise OperationFailure("no expireAfterSeconds field on non-TTL collections", code=72)
+            if options["expireAfterSeconds"] == "off":
+                collection_options.pop("expireAfterSeconds", None)
+            else:
+                collection_options["expireAfterSeconds"] = options["expireAfterSeconds"]
+        if "index" in options:
+            key = list(options["index"]["keyPattern"].items())
+            [index] = [i for i in self.indexes[name].values() if i["key"] == key]
+            index["expireAfterSeconds"] = options["index"]["expireAfterSeconds"]
+        self.commands.append((command, name, options))
+
+    def __getitem__(self, name):
+        return ProvisioningCollection(self, name)
+
+
+class ProvisioningCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class ProvisioningCollection:
+    def __init__(self, database, name):
+        self.database = database
+        self.name = name
+
+    async def create_indexes(self, indexes):
+        if self.name not in self.database.options:
+            self.database.add_plain_collection(self.name)
+        # Keys as a list of pairs, the order of a compound index matters
+        documents = [{**i.document, "key": list(i.document["key"].items())} for i in indexes]
+        collection_indexes = self.database.indexes[self.name]
+        for document in documents:
+            existing = collection_indexes.get(document["name"])
+            if existing is not None and existing != document:
+                raise OperationFailure("An equivalent index already exists with different options", code=85)
+        for document in documents:
+            collection_indexes.setdefault(document["name"], dict(document))
+        self.database.created_indexes.append((self.name, documents))
+        return [i["name"] for i in documents]
+
+    async def index_information(self):
+        return {name: dict(index) for name, index in self.database.indexes[self.name].items()}
+
+    async def drop_index(self, name):
+        del self.database.indexes[self.name][name]
+        self.database.dropped_indexes.append((self.name, name))
+
+
+class ProvisioningConnection(NoSqlDatabaseSessionManager):
+    def __init__(self):
+        super().__init__("mongodb://stand-in", "test")
+        self.database = ProvisioningDatabase()
+
+    @asynccontextmanager
+    async def session(self):
+        yield self.database
+
+
+@pytest.mark.asyncio
+async def test_provision_collections():
+    connection = ProvisioningConnection()
+    handler = BaseLogDataManager(connection)
+
+    await handler.provision_collections(expire_after_seconds=3600, request_expire_after_seconds=600)
+    await handler.provision_collections(expire_after_seconds=3600, request_expire_after_seconds=600)
+
+    database = connection.database
+    timeseries = {"timeField": "timestamp", "granularity": "seconds"}
+    # Created only once, the second call finds the same expiry and changes nothing
+    assert database.created_collections == [
+        ("logs", {"timeseries": timeseries, "expireAfterSeconds": 3600}),
+        ("request_logs", {"timeseries": timeseries, "expireAfterSeconds": 600}),
+    ]
+    assert database.commands == []
+
+    log_indexes = ("logs", [{"name": "level_1_timestamp_-1", "key": [("level", 1), ("timestamp", -1)]}])
+    request_log_indexes = ("request_logs", [
+        {"name": "path_1_status_code_1_timestamp_-1", "key": [("path", 1), ("status_code", 1), ("timestamp", -1)]},
+        {"name": "status_code_1_timestamp_-1", "key": [("status_code", 1), ("timestamp", -1)]},
+    ])
+    assert database.created_indexes == [log_indexes, request_log_indexes] * 2
+
+    # A new expiry is changed, and None removes it
+    await handler.provision_collections(expire_after_seconds=7200)
+    await handler.provision_collections(expire_after_seconds=None)
+    assert database.commands == [
+        ("collMod", "logs", {"expireAfterSeconds": 7200}),
+        ("collMod", "request_logs", {"expireAfterSeconds": 7200}),
+        ("collMod", "logs", {"expireAfterSeconds": "off"}),
+        ("collMod", "request_logs", {"expireAfterSeconds": "off"}),
+    ]
+    assert "expireAfterSeconds" not in database.options["logs"]
+
+
+@pytest.mark.asyncio
+async def test_provision_existing_plain_collections():
+    connection = ProvisioningConnection()
+    database = connection.database
+    database.add_plain_collection("logs")
+    handler = BaseLogDataManager(connection)
+
+    await handler.provision_collections(expire_after_seconds=3600)
+
+    # The plain collection can't become time-series, its expiry is a TTL index
+    timeseries = {"timeField": "timestamp", "granularity": "seconds"}
+    assert database.created_collections == [("request_logs", {"timeseries": timeseries, "expireAfterSeconds": 3600})]
+    assert database.options["logs"] == {}
+    assert database.indexes["logs"]["timestamp_1"]["expireAfterSeconds"] == 3600
+    assert "level_1_timestamp_-1" in database.indexes["logs"]
+
+    await handler.provision_collections(expire_after_seconds=60)
+    assert database.commands[0] == (
+        "collMod", "logs", {"index": {"keyPattern": {"timestamp": 1}, "expireAfterSeconds": 60}}
+    )
+    assert database.indexes["logs"]["timestamp_1"]["expireAfterSeconds"] == 60
+
+    await handler.provision_collections(expire_after_seconds=None)
+    assert database.dropped_indexes == [("logs", "timestamp_1")]
+    assert "expireAfterSeconds" not in database.options["request_logs"]
+
+
+@pytest.mark.asyncio
+async def test_provision_plain_collections_with_ttl_index():
+    connection = ProvisioningConnection()
+    handler = BaseLogDataManager(connection)
+
+    await handler.provision_collections(expire_after_seconds=60, timeseries=False)
+
+    database = connection.database
+    assert database.created_collections == []
+    assert database.commands == []
+    assert database.created_indexes[0] == (
+        "logs", [{"name": "timestamp_1", "key": [("timestamp", 1)], "expireAfterSeconds": 60}]
+    )
+    assert database.created_indexes[2] == (
+        "request_logs", [{"name": "timestamp_1", "key": [("timestamp", 1)], "expireAfterSeconds": 60}]
+    )
+    assert [i[0] for i in database.created_indexes] == ["logs", "logs", "request_logs", "request_logs"]
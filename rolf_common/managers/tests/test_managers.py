@@ -0,0 +1,321 @@
+import datetime
+import tracemalloc
+import uuid
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.orm import aliased
+
+from rolf_common.conftest import count_statements
+from rolf_common.managers import BaseDataManager
+from rolf_common.managers.statements import StatementCache
+from rolf_common.models.tests.dummy import DummyModel
+
+
+@pytest.mark.asyncio
+async def test_add_one_refresh(session, async_engine):
+    manager = BaseDataManager(session)
+
+    with count_statements(async_engine) as statements:
+        obj = await manager.add_one(DummyModel(name="Refresh"))
+
+    assert obj.created_at is not None
+    assert len(statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_add_one_returning(session, async_engine):
+    manager = BaseDataManager(session, use_returning=True)
+
+    with count_statements(async_engine) as statements:
+        obj = await manager.add_one(DummyModel(name="Returning"))
+
+    assert obj.created_at is not None
+    assert len(statements) == 1
+    assert "RETURNING" in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_add_all_returning(session, async_engine):
+    manager = BaseDataManager(session, use_returning=True)
+    models = [DummyModel(name=f"Returning {i}") for i in range(20)]
+
+    with count_statements(async_engine) as statements:
+        await manager.add_all(models)
+
+    assert all(i.created_at is not None for i in models)
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_add_all_returning_fallback(session, async_engine, monkeypatch):
+    manager = BaseDataManager(session, use_returning=True)
+    models = [DummyModel(name=f"Fallback {i}") for i in range(20)]
+    monkeypatch.setattr(async_engine.sync_engine.dialect, "insert_returning", False)
+    monkeypatch.setattr(async_engine.sync_engine.dialect, "insert_executemany_returning", False)
+
+    with count_statements(async_engine) as statements:
+        await manager.add_all(models)
+
+    assert all(i.created_at is not None for i in models)
+    # one executemany INSERT and a single SELECT ... IN for the server defaults
+    assert len(statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_update_one_returning(session, async_engine):
+    manager = BaseDataManager(session, use_returning=True)
+    obj = await manager.add_one(DummyModel(name="Before"))
+
+    stmt = update(DummyModel).where(DummyModel.id == obj.id).values(name="After")
+    with count_statements(async_engine) as statements:
+        obj = await manager.update_one(stmt, obj)
+
+    assert obj.name == "After"
+    assert obj.edited_at is not None
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_upsert_all(session, async_engine):
+    manager = BaseDataManager(session)
+    rows = [{"id": uuid.uuid4(), "name": f"Upsert {i}"} for i in range(25)]
+
+    with count_statements(async_engine) as statements:
+        inserted = await manager.upsert_all(DummyModel, rows, chunk_size=10)
+
+    assert len(inserted) == 25
+    assert len(statements) == 3
+
+    # Ignore the conflicting rows, only new ones are returned
+    new_row = {"id": uuid.uuid4(), "name": "Upsert new"}
+    inserted = await manager.upsert_all(DummyModel, rows[:5] + [new_row])
+    assert [i["id"] for i in inserted] == [new_row["id"]]
+
+    # Update the conflicting rows
+    changed = [{"id": i["id"], "name": "Upsert changed"} for i in rows[:5]]
+    updated = await manager.upsert_all(DummyModel, changed, update_columns=["name"])
+    assert len(updated) == 5
+    assert all(i["name"] == "Upsert changed" and i["edited_at"] is not None for i in updated)
+
+
+async def _stream_peak_memory(manager, stmt) -> tuple[int, int]:
+    tracemalloc.start()
+    total = 0
+    async for _ in manager.stream_all(stmt, batch_size=500):
+        total += 1
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, peak
+
+
+@pytest.mark.asyncio
+async def test_stream_all(session):
+    manager = BaseDataManager(session)
+    rows = [{"name": f"Stream {i}", "description": "x" * 200} for i in range(20000)]
+    await manager.upsert_all(DummyModel, rows, returning=False)
+
+    large_stmt = select(DummyModel.id, DummyModel.description).where(DummyModel.name.like("Stream %"))
+    small_stmt = large_stmt.limit(2000)
+
+    small_total, small_peak = await _stream_peak_memory(manager, small_stmt)
+    large_total, large_peak = await _stream_peak_memory(manager, large_stmt)
+
+    tracemalloc.start()
+    all_rows = await manager.get_all(large_stmt)
+    _, get_all_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert large_total == len(all_rows) == 20000
+    assert small_total == 2000
+    # memory does not grow with the number of rows
+    assert large_peak < small_peak * 2
+    assert large_peak < get_all_peak / 5
+
+
+@pytest.mark.asyncio
+async def test_stream_batches(session):
+    manager = BaseDataManager(session)
+    await manager.upsert_all(DummyModel, [{"name": f"Batch {i}"} for i in range(25)], returning=False)
+
+    stmt = select(DummyModel).where(DummyModel.name.like("Batch %"))
+    batches = [i async for i in manager.stream_batches(stmt, batch_size=10)]
+
+    assert [len(i) for i in batches] == [10, 10, 5]
+    assert all(isinstance(i["DummyModel"], DummyModel) for i in batches[0])
+
+
+@pytest.mark.asyncio
+async def test_get_page(session):
+    manager = BaseDataManager(session)
+    created_at = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    # Repeated created_at, so the id is used as tie-breaker
+    rows = [{"id": uuid.uuid4(), "name": "Page", "created_at": created_at + datetime.timedelta(seconds=i // 3)}
+            for i in range(25)]
+    await manager.upsert_all(DummyModel, rows, returning=False)
+    expected = [i["id"] for i in sorted(rows, key=lambda i: (i["created_at"], i["id"]))]
+
+    stmt = select(DummyModel).where(DummyModel.name == "Page")
+    fetched = []
+    pages = []
+    cursor = None
+    while True:
+        page = await manager.get_page(stmt, cursor=cursor, page_size=10)
+        pages.append(page)
+        fetched.extend(i["DummyModel"].id for i in page.items)
+        if not page.has_more:
+            break
+        cursor = page.next_cursor
+
+    assert fetched == expected
+    assert [len(i.items) for i in pages] == [10, 10, 5]
+    assert pages[0].previous_cursor is None
+    assert pages[-1].next_cursor is None
+
+    previous = await manager.get_page(stmt, cursor=pages[-1].previous_cursor, page_size=10)
+    assert [i["DummyModel"].id for i in previous.items] == expected[10:20]
+    assert previous.has_more
+
+
+@pytest.mark.asyncio
+async def test_get_page_descending_columns(session):
+    manager = BaseDataManager(session)
+    await manager.upsert_all(DummyModel, [{"name": f"Desc {i:02}"} for i in range(15)], returning=False)
+
+    stmt = select(DummyModel.name, DummyModel.id).where(DummyModel.name.like("Desc %"))
+    order_by = [DummyModel.name.desc(), DummyModel.id]
+    first = await manager.get_page(stmt, order_by=order_by, page_size=10)
+    second = await manager.get_page(stmt, order_by=order_by, cursor=first.next_cursor, page_size=10)
+
+    assert [i["name"] for i in first.items + second.items] == [f"Desc {i:02}" for i in reversed(range(15))]
+    assert second.has_more is False
+
+
+@pytest.mark.asyncio
+async def test_bulk_load(session, async_engine):
+    manager = BaseDataManager(session)
+
+    async def rows():
+        for i in range(2500):
+            yield {"name": "Bulk load", "description": str(i)}
+        yield DummyModel(name="Bulk load", description="model")
+
+    with count_statements(async_engine) as statements:
+        total = await manager.bulk_load(DummyModel, rows(), chunk_size=1000)
+
+    assert total == 2501
+    assert len(statements) == 3
+
+    loaded = await manager.get_all(select(DummyModel).where(DummyModel.name == "Bulk load"))
+    assert len(loaded) == 2501
+    assert len({i["DummyModel"].id for i in loaded}) == 2501
+    assert all(i["DummyModel"].active and i["DummyModel"].created_at is not None for i in loaded)
+
+
+@pytest.mark.asyncio
+async def test_bulk_load_invalid_rows(session):
+    manager = BaseDataManager(session)
+    created_at = datetime.datetime.now(datetime.timezone.utc)
+
+    with pytest.raises(ValueError, match="Unknown columns"):
+        await manager.bulk_load(DummyModel, [{"name": "Unknown", "nickname": "x"}])
+
+    # created_at is loaded by the database, since the first row does not set it
+    with pytest.raises(ValueError, match="created_at"):
+        await manager.bulk_load(DummyModel, [{"name": "First"}, {"name": "Second", "created_at": created_at}])
+
+
+class FakeDriverConnection:
+    def __init__(self, calls):
+        self.calls = calls
+        self.records = []
+
+    async def copy_records_to_table(self, table_name, records, columns, schema_name):
+        self.calls.append(("copy", table_name, tuple(columns)))
+        self.records = [i async for i in records]
+
+
+class FakeConnection:
+    def __init__(self):
+        self.calls = []
+        self.driver_connection = FakeDriverConnection(self.calls)
+
+    async def execute(self, statement):
+        self.calls.append(("execute", str(statement)))
+
+    async def get_raw_connection(self):
+        return self
+
+
+class FakeAsyncpgSession:
+    """Session bound to a postgresql+asyncpg dialect, recording what is sent to the connection."""
+
+    def __init__(self):
+        self.info = {}
+        self.raw = FakeConnection()
+
+    def get_bind(self):
+        return type("Bind", (), {"dialect": type("Dialect", (), {"name": "postgresql", "driver": "asyncpg"})})
+
+    async def connection(self):
+        return self.raw
+
+
+@pytest.mark.asyncio
+async def test_bulk_load_copy():
+    session = FakeAsyncpgSession()
+    manager = BaseDataManager(session)
+
+    total = await manager.bulk_load(DummyModel, [{"name": f"Copy {i}"} for i in range(3)])
+
+    assert total == 3
+    # the transaction is started before the COPY, so it runs inside the session transaction
+    assert [i[0] for i in session.raw.calls] == ["execute", "copy"]
+    assert session.raw.calls[0][1] == "SELECT 1"
+    assert session.raw.calls[1][1] == "dummy"
+    assert "created_at" not in session.raw.calls[1][2]
+    assert len(session.raw.driver_connection.records) == 3
+    assert session.info[manager.session_written_key]
+
+
+@pytest.mark.asyncio
+async def test_statement_cache(session):
+    manager = BaseDataManager(session)
+    manager.statement_cache = StatementCache()
+    deleted = DummyModel(name="Deleted", deleted_at=datetime.datetime.now(datetime.timezone.utc))
+    active, deleted = await manager.add_all([DummyModel(name="Active"), deleted])
+
+    assert await manager.get_by_id(DummyModel, active.id) is active
+    assert await manager.get_by_id(DummyModel, deleted.id) is deleted
+    assert await manager.get_by_id(DummyModel, deleted.id, exclude_deleted=True) is None
+    assert await manager.get_by_ids(DummyModel, [active.id, deleted.id], exclude_deleted=True) == [active]
+    assert await manager.exists(DummyModel, active.id)
+    assert not await manager.exists(DummyModel, deleted.id, exclude_deleted=True)
+    assert not await manager.exists(DummyModel, uuid.uuid4())
+
+    stats = manager.statement_cache.stats()
+    assert stats["size"] == 5
+    assert stats["hits"] == 2
+
+
+def test_query_builder_caches_only_mapped_classes():
+    class Manager(BaseDataManager):
+        statement_cache = StatementCache()
+
+    assert Manager.query_builder(DummyModel, None) is Manager.query_builder(DummyModel, None)
+    # A new aliased entity would be a new entry on every call
+    Manager.query_builder(aliased(DummyModel), None)
+    assert Manager.statement_cache.stats()["size"] == 1
+
+
+def test_statement_cache_eviction():
+    cache = StatementCache(max_size=2)
+    first = cache.get(("first",), lambda: select(DummyModel))
+    cache.get(("second",), lambda: select(DummyModel.id))
+    assert cache.get(("first",), lambda: select(DummyModel)) is first
+
+    # second is the least recently used
+    cache.get(("third",), lambda: select(DummyModel.name))
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+    assert cache.get(("first",), lambda: select(DummyModel)) is first
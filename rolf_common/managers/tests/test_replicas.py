@@ -0,0 +1,138 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+
+from rolf_common.backend.sql_database import SqlDatabaseSessionManager
+from rolf_common.backend.sql_replicas import LEAST_LATENCY, ReplicaRouter
+from rolf_common.managers import BaseDataManager
+from rolf_common.models.base import SQLModel
+from rolf_common.models.tests.dummy import DummyModel
+
+
+async def create_database(url: str, name: str) -> None:
+    manager = SqlDatabaseSessionManager(url)
+    async with manager.lifespan():
+        async with manager.engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with manager.session() as session:
+            session.add(DummyModel(name=name))
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path):
+    """A primary and a replica with different rows, so each read shows where it ran."""
+    primary_url = f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"
+    replica_url = f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    await create_database(primary_url, "primary")
+    await create_database(replica_url, "replica")
+
+    primary = SqlDatabaseSessionManager(primary_url)
+    router = ReplicaRouter([replica_url], health_check_interval=None)
+    async with primary.lifespan(), router.lifespan():
+        yield primary, router
+
+
+async def names(manager: BaseDataManager) -> list[str]:
+    return [i["name"] for i in await manager.get_all(select(DummyModel.name).order_by(DummyModel.name))]
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(databases):
+    primary, router = databases
+
+    async with primary.session() as session:
+        manager = BaseDataManager(session, replicas=router)
+        assert await names(manager) == ["replica"]
+
+        obj = await manager.get_first(select(DummyModel))
+        assert obj.name == "replica"
+        assert (await manager.get_by_id(DummyModel, obj.id)).name == "replica"
+        assert [i["name"] async for i in manager.stream_all(select(DummyModel.name))] == ["replica"]
+
+    assert router.replicas[0].reads == 4
+
+
+@pytest.mark.asyncio
+async def test_session_that_wrote_reads_from_primary(databases):
+    primary, router = databases
+
+    async with primary.session() as session:
+        manager = BaseDataManager(session, replicas=router)
+        await manager.add_one(DummyModel(name="written"))
+        assert await names(manager) == ["primary", "written"]
+
+    async with primary.session() as session:
+        # Writes done directly in the session are tracked too
+        manager = BaseDataManager(session, replicas=router)
+        session.add(DummyModel(name="pending"))
+        assert "pending" in await names(manager)
+        await session.flush()
+        assert "pending" in await names(manager)
+
+
+@pytest.mark.asyncio
+async def test_session_that_executed_dml_reads_from_primary(databases):
+    primary, router = databases
+
+    async with primary.session() as session:
+        manager = BaseDataManager(session, replicas=router)
+        assert await names(manager) == ["replica"]
+
+        # Executed directly, without a flush
+        await session.execute(update(DummyModel).where(DummyModel.name == "primary").values(name="updated"))
+        assert await names(manager) == ["updated"]
+
+    assert router.replicas[0].reads == 1
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_is_ejected(databases):
+    primary, router = databases
+    lagging = ReplicaRouter(
+        [router.replicas[0].url], health_check_interval=None, lag_query="SELECT 120", max_lag_seconds=60
+    )
+
+    async with lagging.lifespan(), primary.session() as session:
+        assert not lagging.replicas[0].healthy
+        assert lagging.replicas[0].lag == 120
+        assert await names(BaseDataManager(session, replicas=lagging)) == ["primary"]
+
+        # The replica is restored when it catches up
+        lagging.lag_query = "SELECT 0"
+        await lagging.check_health()
+        assert lagging.replicas[0].healthy
+        assert await names(BaseDataManager(session, replicas=lagging)) == ["replica"]
+
+
+@pytest.mark.asyncio
+async def test_failed_replica_is_ejected(tmp_path, databases):
+    primary, _ = databases
+    router = ReplicaRouter([f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"], health_check_interval=None)
+
+    async with router.lifespan(), primary.session() as session:
+        assert not router.replicas[0].healthy
+        assert router.replicas[0].last_error
+        assert router.choose() is None
+        assert await names(BaseDataManager(session, replicas=router)) == ["primary"]
+
+
+@pytest.mark.asyncio
+async def test_replica_selection(databases):
+    _, router = databases
+    url = router.replicas[0].url
+
+    round_robin = ReplicaRouter([url, url], health_check_interval=None)
+    least_latency = ReplicaRouter([url, url], strategy=LEAST_LATENCY, health_check_interval=None)
+    async with round_robin.lifespan(), least_latency.lifespan():
+        first, second = round_robin.replicas
+        assert [round_robin.choose() for _ in range(4)] == [first, second, first, second]
+
+        round_robin.mark_failed(first, "connection refused")
+        assert [round_robin.choose() for _ in range(2)] == [second, second]
+
+        fast, slow = least_latency.replicas
+        fast.latency, slow.latency = 0.001, 0.05
+        assert least_latency.choose() is fast
+        for _ in range(20):
+            least_latency.record_latency(fast, 0.2)
+        assert least_latency.choose() is slow
@@ -1,7 +1,10 @@
 import datetime
+import operator
 import uuid
+from functools import cache
 from typing import (
     Any,
+    Callable,
     Dict,
     List,
 )
@@ -9,6 +12,7 @@ from typing import (
 from sqlalchemy import MetaData, Table, TIMESTAMP, String, text
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
 
+from rolf_common.models import reflection
 from rolf_common.util.datetime import get_timestamp_aware
 
 
@@ -66,37 +70,81 @@ class SQLModel(DeclarativeBase):
 
         return cls.__mapper__.selectable.c.keys()
 
+    @classmethod
+    @cache
+    def _column_getter(cls) -> tuple[tuple[str, ...], Callable[[Any], tuple]]:
+        """Return the column keys and a getter of all of them, built once per class."""
+
+        keys = tuple(cls.__mapper__.c.keys())
+        if len(keys) == 1:
+            return keys, lambda obj: (getattr(obj, keys[0]),)
+        return keys, operator.attrgetter(*keys)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert model instance to a dictionary."""
 
-        _dict: Dict[str, Any] = dict()
-        for key in self.__mapper__.c.keys():
-            _dict[key] = getattr(self, key)
-        return _dict
+        keys, getter = self._column_getter()
+        return dict(zip(keys, getter(self)))
 
     @classmethod
-    def gather_metadata(cls, engine=None) -> MetaData:
-        """Gather metadata from all subclasses."""
-        metadata = MetaData()
+    def gather_metadata(cls, engine=None, snapshot_path=None) -> MetaData:
+        """Gather metadata from all subclasses (direct or not), reflected in bulk.
+
+        If snapshot_path is given and a snapshot made for the same models exists, it's loaded
+        without touching the database, otherwise the reflection result is stored there.
+        The snapshot is a pickle, so snapshot_path must be trusted (not writable by other users).
+        """
+        tables = reflection.mapped_tables(cls)
+
+        if snapshot_path is not None:
+            snapshot = reflection.load_snapshot(snapshot_path, reflection.declaration_key(tables))
+            if snapshot is not None:
+                return snapshot["metadata"]
+
         if engine is not None and hasattr(engine, "sync_engine"):
             engine = engine.sync_engine
 
-        for subclass in cls.__subclasses__():
-            if engine is None:
-                raise ValueError("Engine must be provided for autoload")
-            Table(subclass.__tablename__, metadata, autoload_with=engine)
-        return metadata
+        if not tables:
+            return MetaData()
+        if engine is None:
+            raise ValueError("Engine must be provided for autoload")
+
+        with engine.connect() as conn:
+            return reflection.reflect_with_snapshot(conn, tables, snapshot_path)
 
     @classmethod
-    async def async_gather_metadata(cls, async_engine) -> MetaData:
+    async def async_gather_metadata(cls, async_engine, snapshot_path=None) -> MetaData:
         """Async-safe version of gather_metadata."""
-        metadata = MetaData()
+        tables = reflection.mapped_tables(cls)
+
+        if snapshot_path is not None:
+            snapshot = reflection.load_snapshot(snapshot_path, reflection.declaration_key(tables))
+            if snapshot is not None:
+                return snapshot["metadata"]
+
+        if not tables:
+            return MetaData()
 
         async with async_engine.connect() as conn:
 
             def sync_fn(sync_conn):
-                for subclass in cls.__subclasses__():
-                    Table(subclass.__tablename__, metadata, autoload_with=sync_conn)
-                return metadata
+                return reflection.reflect_with_snapshot(sync_conn, tables, snapshot_path)
 
             return await conn.run_sync(sync_fn)
+
+    @classmethod
+    def is_metadata_snapshot_stale(cls, engine, snapshot_path) -> bool:
+        """Check if the metadata snapshot is missing, outdated or the database schema changed since it was made."""
+        if hasattr(engine, "sync_engine"):
+            engine = engine.sync_engine
+
+        with engine.connect() as conn:
+            return reflection.is_snapshot_stale(conn, reflection.mapped_tables(cls), snapshot_path)
+
+    @classmethod
+    async def async_is_metadata_snapshot_stale(cls, async_engine, snapshot_path) -> bool:
+        """Async-safe version of is_metadata_snapshot_stale."""
+        tables = reflection.mapped_tables(cls)
+
+        async with async_engine.connect() as conn:
+            return await conn.run_sync(reflection.is_snapshot_stale, tables, snapshot_path)
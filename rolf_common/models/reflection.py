@@ -0,0 +1,126 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Iterable
+
+import sqlalchemy
+from sqlalchemy import MetaData, Table, inspect
+
+# Increase when the snapshot content changes, so old files are ignored
+SNAPSHOT_VERSION = 1
+
+
+def mapped_tables(base_model: type) -> list[Table]:
+    """Return the tables of all (direct or indirect) subclasses of the model, skipping abstract classes."""
+
+    tables: dict[str, Table] = {}
+    pending = list(base_model.__subclasses__())
+    while pending:
+        subclass = pending.pop(0)
+        pending.extend(subclass.__subclasses__())
+
+        table = getattr(subclass, '__table__', None)
+        if isinstance(table, Table):
+            # single table inheritance share the same table
+            tables.setdefault(table.fullname, table)
+
+    return list(tables.values())
+
+
+def declaration_key(tables: Iterable[Table]) -> str:
+    """Hash of the tables declared by the models, used to know if a snapshot was made for them."""
+
+    digest = hashlib.sha256(f'{SNAPSHOT_VERSION}:{sqlalchemy.__version__}'.encode())
+    for table in sorted(tables, key=lambda i: i.fullname):
+        digest.update(table.fullname.encode())
+        for column in table.c:
+            digest.update(f'{column.name}:{column.type!r}:{column.nullable}'.encode())
+    return digest.hexdigest()
+
+
+def _tables_by_schema(tables: Iterable[Table]) -> dict[str | None, list[str]]:
+    schemas: dict[str | None, list[str]] = {}
+    for table in tables:
+        schemas.setdefault(table.schema, []).append(table.name)
+    return schemas
+
+
+def reflect_tables(connection, tables: Iterable[Table]) -> MetaData:
+    """Reflect the tables in bulk, with one MetaData.reflect call per schema."""
+
+    metadata = MetaData()
+    for schema, names in _tables_by_schema(tables).items():
+        metadata.reflect(bind=connection, schema=schema, only=names)
+    return metadata
+
+
+def catalog_fingerprint(connection, tables: Iterable[Table]) -> str:
+    """Hash of the columns the database catalog has for the tables, fetched in bulk."""
+
+    inspector = inspect(connection)
+    digest = hashlib.sha256()
+    for schema, names in sorted(_tables_by_schema(tables).items(), key=lambda i: str(i[0])):
+        columns = inspector.get_multi_columns(schema=schema, filter_names=names)
+        for (table_schema, table_name), table_columns in sorted(columns.items(), key=lambda i: str(i[0])):
+            digest.update(f'{table_schema}.{table_name}'.encode())
+            for column in table_columns:
+                digest.update(
+                    f"{column['name']}:{column['type']!r}:{column['nullable']}:{column.get('default')}".encode()
+                )
+    return digest.hexdigest()
+
+
+def load_snapshot(path: str | os.PathLike, key: str) -> dict | None:
+    """Load the snapshot file, return None if it can't be read or was made for other models/version.
+
+    The snapshot is a pickle, so loading it can run arbitrary code: the path must be trusted, in a directory
+    only writable by the service user (the file is saved with 0600 permissions).
+    """
+
+    try:
+        with open(path, 'rb') as file:
+            snapshot = pickle.load(file)
+    except Exception:
+        # Missing, truncated or made by an incompatible version, reflect the tables again
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION or snapshot.get('key') != key:
+        return None
+    return snapshot
+
+
+def save_snapshot(path: str | os.PathLike, key: str, fingerprint: str, metadata: MetaData) -> None:
+    """Write the snapshot atomically, readable only by its owner, so a concurrent startup never reads a partial file."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    # The mode is only applied on creation, a tmp file left by a crashed process may have other permissions
+    os.fchmod(fd, 0o600)
+    with os.fdopen(fd, 'wb') as file:
+        pickle.dump(
+            {'version': SNAPSHOT_VERSION, 'key': key, 'fingerprint': fingerprint, 'metadata': metadata},
+            file,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, path)
+
+
+def reflect_with_snapshot(connection, tables: list[Table], snapshot_path: str | os.PathLike | None) -> MetaData:
+    """Reflect the tables and, if a path is given, store the result in a snapshot."""
+
+    metadata = reflect_tables(connection, tables)
+    if snapshot_path is not None:
+        save_snapshot(snapshot_path, declaration_key(tables), catalog_fingerprint(connection, tables), metadata)
+    return metadata
+
+
+def is_snapshot_stale(connection, tables: list[Table], snapshot_path: str | os.PathLike) -> bool:
+    """Check if the snapshot is missing, was made for other models or the database catalog changed since."""
+
+    snapshot = load_snapshot(snapshot_path, declaration_key(tables))
+    if snapshot is None:
+        return True
+    return snapshot['fingerprint'] != catalog_fingerprint(connection, tables)
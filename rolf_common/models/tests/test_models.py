@@ -1,4 +1,12 @@
+import time
+
 import pytest
+import pytest_asyncio
+from sqlalchemy import String, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Mapped, mapped_column
+
+from rolf_common.conftest import count_statements
 from rolf_common.models.tests.dummy import DummyModel, SQLModel
 
 @pytest.mark.asyncio
@@ -30,4 +38,66 @@ async def test_to_dict(session):
 async def test_gather_metadata(async_engine):
     metadata = await SQLModel.async_gather_metadata(async_engine)
     tables = [t.name for t in metadata.tables.values()]
-    assert "dummy" in tables
\ No newline at end of file
+    assert "dummy" in tables
+
+class AbstractDummyModel(SQLModel):
+    __abstract__ = True
+
+
+class DeepDummyModel(AbstractDummyModel):
+    __tablename__ = "deep_dummy"
+
+    name: Mapped[str] = mapped_column(String(50))
+
+
+@pytest_asyncio.fixture
+async def file_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reflection.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_gather_metadata_subclass_tree(file_engine):
+    metadata = await SQLModel.async_gather_metadata(file_engine)
+    assert {"dummy", "deep_dummy"} <= set(metadata.tables)
+
+
+@pytest.mark.asyncio
+async def test_gather_metadata_snapshot(file_engine, tmp_path):
+    snapshot_path = tmp_path / "metadata.snapshot"
+
+    start = time.perf_counter()
+    cold = await SQLModel.async_gather_metadata(file_engine, snapshot_path=snapshot_path)
+    cold_time = time.perf_counter() - start
+
+    with count_statements(file_engine) as statements:
+        start = time.perf_counter()
+        warm = await SQLModel.async_gather_metadata(file_engine, snapshot_path=snapshot_path)
+        warm_time = time.perf_counter() - start
+
+    assert statements == []
+    assert warm_time < cold_time
+    assert set(warm.tables) == set(cold.tables)
+    assert [i.name for i in warm.tables["dummy"].c] == [i.name for i in cold.tables["dummy"].c]
+    assert not await SQLModel.async_is_metadata_snapshot_stale(file_engine, snapshot_path)
+
+    async with file_engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE dummy ADD COLUMN extra VARCHAR(10)"))
+
+    assert await SQLModel.async_is_metadata_snapshot_stale(file_engine, snapshot_path)
+
+
+@pytest.mark.asyncio
+async def test_gather_metadata_invalid_snapshot(file_engine, tmp_path):
+    snapshot_path = tmp_path / "metadata.snapshot"
+    # A pickle of int("x"), unpickling fails with other errors than UnpicklingError
+    snapshot_path.write_bytes(b"cbuiltins\nint\n(S'x'\ntR.")
+
+    metadata = await SQLModel.async_gather_metadata(file_engine, snapshot_path=snapshot_path)
+
+    assert "dummy" in metadata.tables
+    assert snapshot_path.stat().st_mode & 0o777 == 0o600
+    assert not await SQLModel.async_is_metadata_snapshot_stale(file_engine, snapshot_path)
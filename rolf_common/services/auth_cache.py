@@ -0,0 +1,171 @@
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Iterable
+
+from rolf_common.schemas.auth import RequiredUser
+
+
+def token_expiration(token: str) -> float | None:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the 'exp' claim (unix time) of a JWT, without verifying it, or None if the token has no expiration
+    """
+    parts = token.split('.')
+    if len(parts) != 3:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4)))
+        return float(payload['exp'])
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+class TokenValidationCache:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Keep the users of the tokens validated by the auth service for a short time, so the same token
+        is not validated again on each request.
+
+        The key is a hash of the token (the token itself is never stored) and the required scopes, and an entry
+        never outlives the token expiration. Concurrent validations of the same key are collapsed into
+        a single call, the other callers wait for its result (or error).
+        Only successful validations are stored.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0) -> None:
+        """
+        :param max_size: Max number of entries kept in the cache
+        :param ttl: Time, in seconds, a validation is kept, limited by the token expiration
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, RequiredUser]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.validations = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def key(token: str, scopes: Iterable[str]) -> str:
+        token_hash = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        return f"{token_hash}:{' '.join(sorted(set(scopes)))}"
+
+    def get(self, token: str, scopes: Iterable[str]) -> RequiredUser | None:
+        return self._get(self.key(token, scopes))
+
+    def _get(self, key: str) -> RequiredUser | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return user
+
+    def set(self, token: str, scopes: Iterable[str], user: RequiredUser) -> None:
+        ttl = self.ttl
+        expiration = token_expiration(token)
+        if expiration is not None:
+            ttl = min(ttl, expiration - time.time())
+        if ttl <= 0:
+            return
+
+        key = self.key(token, scopes)
+        self._entries[key] = (time.monotonic() + ttl, user)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_validate(self, token: str, scopes: list[str],
+                              validate: Callable[[str, list[str]], Awaitable[RequiredUser]]) -> RequiredUser:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Return the cached user of the token, or validate it, sharing the validation already in progress
+
+        :param token: The access token
+        :param scopes: The scopes required by the endpoint
+        :param validate: Coroutine function that validates the token with the auth service
+        """
+        key = self.key(token, scopes)
+        user = self._get(key)
+        if user is not None:
+            self.hits += 1
+            return user
+
+        self.misses += 1
+        future = self._in_flight.get(key)
+        if future is None:
+            self.validations += 1
+            # a task, so the validation goes on for the waiting callers if the first one is cancelled
+            future = asyncio.ensure_future(self._validate(key, token, scopes, validate))
+            # retrieve the error, in case all callers were cancelled
+            future.add_done_callback(lambda i: i.cancelled() or i.exception())
+            self._in_flight[key] = future
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(future)
+
+    async def _validate(self, key: str, token: str, scopes: list[str],
+                        validate: Callable[[str, list[str]], Awaitable[RequiredUser]]) -> RequiredUser:
+        try:
+            user = await validate(token, scopes)
+            self.set(token, scopes, user)
+            return user
+        finally:
+            self._in_flight.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'coalesced': self.coalesced,
+            'validations': self.validations,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+_token_cache: TokenValidationCache | None = None
+
+
+def set_token_cache(cache: TokenValidationCache | None):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Create a global variable to store the token validation cache used by get_user
+    """
+    global _token_cache
+    _token_cache = cache
+
+
+def get_token_cache() -> TokenValidationCache | None:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Get the token validation cache used by get_user, None if validations are not cached
+    """
+    return _token_cache
@@ -0,0 +1,160 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.security import SecurityScopes
+
+from rolf_common.backend.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from rolf_common.backend.http_client import HttpClientManager, set_auth_client
+from rolf_common.services.token_verifier import FALLBACK_MODE, LocalTokenVerifier, set_token_verifier
+from rolf_common.services.user import get_user
+
+SECRET = "shared-secret"
+USER_ID = uuid.uuid4()
+
+
+def encode(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+def make_token(claims, secret=SECRET, algorithm="HS256"):
+    signing_input = f'{encode({"alg": algorithm, "typ": "JWT"})}.{encode(claims)}'
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+
+def valid_claims(**claims):
+    return {"sub": str(USER_ID), "exp": time.time() + 60, "scope": "books:read books:write", **claims}
+
+
+def test_local_verification():
+    verifier = LocalTokenVerifier(secret=SECRET, issuer="auth")
+
+    user = verifier.verify(make_token(valid_claims(iss="auth")), ["books:read"])
+    assert user.user_id == USER_ID
+
+    for token, permissions in [
+        (make_token(valid_claims(iss="auth"), secret="other"), []),
+        (make_token(valid_claims(iss="auth", exp=time.time() - 1)), []),
+        (make_token(valid_claims(iss="other")), []),
+        (make_token(valid_claims(iss="auth")), ["books:delete"]),
+        (make_token(valid_claims(iss="auth", sub="not-an-uuid")), []),
+        (make_token({k: v for k, v in valid_claims(iss="auth").items() if k != "exp"}), []),
+        (make_token({k: v for k, v in valid_claims(iss="auth").items() if k != "sub"}), []),
+    ]:
+        with pytest.raises(HTTPException) as exc:
+            verifier.verify(token, permissions)
+        assert exc.value.status_code == 401
+
+    # opaque tokens and unknown algorithms are left to the auth service
+    assert verifier.verify("opaque-token", []) is None
+    assert verifier.verify(make_token(valid_claims(), algorithm="RS256"), []) is None
+    assert verifier.stats() == {"verified": 1, "rejected": 7, "skipped": 2}
+
+    without_exp = make_token({"sub": str(USER_ID), "iss": "auth"})
+    assert LocalTokenVerifier(secret=SECRET, require_exp=False).verify(without_exp, []).user_id == USER_ID
+
+
+def test_circuit_breaker_transitions():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05, slow_call_duration=0.5)
+
+    breaker.record_failure()
+    breaker.record_success(0.01)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    # a slow call is a failure
+    breaker.record_success(1.0)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_success(0.01)
+    assert breaker.state == CLOSED
+    assert breaker.stats()["opened"] == 2
+
+
+def build_auth_app():
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.down = False
+
+    @app.post("/validate/auth")
+    async def validate(payload: dict):
+        app.state.calls += 1
+        if app.state.down:
+            raise HTTPException(status_code=503)
+        return {"userId": str(USER_ID)}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_fallback_to_local_verification_when_circuit_opens():
+    app = build_auth_app()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    client = HttpClientManager(transport=httpx.ASGITransport(app=app), breaker=breaker)
+    set_auth_client(client)
+    set_token_verifier(LocalTokenVerifier(secret=SECRET, mode=FALLBACK_MODE))
+
+    scopes = SecurityScopes(["books:read"])
+    signed_token = make_token(valid_claims())
+    try:
+        async with client.lifespan():
+            assert (await get_user(scopes, token=signed_token)).user_id == USER_ID
+            assert app.state.calls == 1
+
+            app.state.down = True
+            for _ in range(5):
+                assert (await get_user(scopes, token=signed_token)).user_id == USER_ID
+            # the circuit opened after 3 failures, the next requests did not call the auth service
+            assert app.state.calls == 4
+            assert breaker.state == OPEN
+
+            # tokens that can't be verified locally fail fast while the circuit is open
+            with pytest.raises(HTTPException) as exc:
+                await get_user(scopes, token="opaque-token")
+            assert exc.value.status_code == 503
+
+            app.state.down = False
+            await asyncio.sleep(0.06)
+            assert (await get_user(scopes, token=signed_token)).user_id == USER_ID
+            assert breaker.state == CLOSED
+            assert app.state.calls == 5
+    finally:
+        set_auth_client(None)
+        set_token_verifier(None)
+
+
+@pytest.mark.asyncio
+async def test_local_mode_does_not_call_auth_service():
+    app = build_auth_app()
+    client = HttpClientManager(transport=httpx.ASGITransport(app=app))
+    set_auth_client(client)
+    set_token_verifier(LocalTokenVerifier(secret=SECRET))
+    try:
+        async with client.lifespan():
+            await get_user(SecurityScopes(["books:read"]), token=make_token(valid_claims()))
+            with pytest.raises(HTTPException):
+                await get_user(SecurityScopes(["books:delete"]), token=make_token(valid_claims()))
+            await get_user(SecurityScopes(), token="opaque-token")
+    finally:
+        set_auth_client(None)
+        set_token_verifier(None)
+
+    assert app.state.calls == 1
@@ -0,0 +1,143 @@
+import asyncio
+import base64
+import json
+import time
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.security import SecurityScopes
+
+from rolf_common.backend.http_client import HttpClientManager, get_auth_client, set_auth_client
+from rolf_common.schemas.auth import RequiredUser
+from rolf_common.services import user
+from rolf_common.services.auth_cache import TokenValidationCache, set_token_cache
+from rolf_common.services.user import get_user
+
+USER_ID = uuid.uuid4()
+
+
+def build_auth_app():
+    app = FastAPI()
+    app.state.calls = []
+
+    @app.post("/validate/auth")
+    async def validate(payload: dict):
+        app.state.calls.append(payload)
+        if payload["accessToken"] != "valid":
+            raise HTTPException(status_code=401)
+        return {"userId": str(USER_ID)}
+
+    return app
+
+
+@pytest.fixture
+def auth_app():
+    app = build_auth_app()
+    client = HttpClientManager(transport=httpx.ASGITransport(app=app))
+    set_auth_client(client)
+    yield app, client
+    set_auth_client(None)
+
+
+@pytest.mark.asyncio
+async def test_get_user_uses_process_client(auth_app):
+    app, client = auth_app
+
+    async with client.lifespan():
+        http_client = client.client
+        for _ in range(3):
+            response = await get_user(SecurityScopes(["books:read"]), token="valid")
+            assert response.user_id == USER_ID
+        assert client.client is http_client
+
+        with pytest.raises(HTTPException) as exc:
+            await get_user(SecurityScopes(), token="invalid")
+        assert exc.value.status_code == 401
+
+    assert app.state.calls[0] == {"accessToken": "valid", "permissions": ["books:read"]}
+    assert len(app.state.calls) == 4
+    with pytest.raises(RuntimeError):
+        client.client
+
+
+@pytest.mark.asyncio
+async def test_get_user_auth_service_offline(monkeypatch):
+    assert get_auth_client() is None
+    # nothing listens on port 1
+    monkeypatch.setattr(user, "auth_service_base_url", "http://127.0.0.1:1")
+
+    client = HttpClientManager(retries=0)
+    set_auth_client(client)
+    try:
+        async with client.lifespan():
+            with pytest.raises(HTTPException) as exc:
+                await get_user(SecurityScopes(), token="valid")
+    finally:
+        set_auth_client(None)
+
+    assert exc.value.status_code == 503
+
+
+def make_jwt(expiration):
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    return f'{encode({"alg": "none"})}.{encode({"sub": "user", "exp": expiration})}.signature'
+
+
+@pytest.fixture
+def token_cache():
+    cache = TokenValidationCache(ttl=60)
+    set_token_cache(cache)
+    yield cache
+    set_token_cache(None)
+
+
+@pytest.mark.asyncio
+async def test_token_cache_single_flight(auth_app, token_cache):
+    app, client = auth_app
+
+    async with client.lifespan():
+        users = await asyncio.gather(*(get_user(SecurityScopes(["books:read"]), token="valid") for _ in range(20)))
+        await get_user(SecurityScopes(["books:read"]), token="valid")
+        await get_user(SecurityScopes(["books:write"]), token="valid")
+
+    assert {i.user_id for i in users} == {USER_ID}
+    # one call for the 20 concurrent requests, the next one is cached, other scopes are validated again
+    assert len(app.state.calls) == 2
+    stats = token_cache.stats()
+    assert stats["validations"] == 2
+    assert stats["coalesced"] == 19
+    assert stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_token_cache_does_not_keep_errors(auth_app, token_cache):
+    app, client = auth_app
+
+    async with client.lifespan():
+        results = await asyncio.gather(
+            *(get_user(SecurityScopes(), token="invalid") for _ in range(5)), return_exceptions=True
+        )
+        with pytest.raises(HTTPException):
+            await get_user(SecurityScopes(), token="invalid")
+
+    assert all(isinstance(i, HTTPException) and i.status_code == 401 for i in results)
+    assert len(app.state.calls) == 2
+    assert token_cache.stats()["size"] == 0
+
+
+def test_token_cache_ttl_bounded_by_expiration():
+    cache = TokenValidationCache(ttl=60)
+    user = RequiredUser(user_id=USER_ID)
+
+    cache.set(make_jwt(time.time() - 1), [], user)
+    assert cache.get(make_jwt(time.time() - 1), []) is None
+
+    token = make_jwt(time.time() + 0.05)
+    cache.set(token, ["a", "b"], user)
+    assert cache.get(token, ["b", "a"]) is user
+    time.sleep(0.06)
+    assert cache.get(token, ["a", "b"]) is None
@@ -0,0 +1,235 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Any, Iterable
+
+from fastapi import HTTPException, status
+
+from rolf_common.backend.settings import settings
+from rolf_common.schemas.auth import RequiredUser
+
+try:
+    import jwt
+except ImportError:  # optional, only for public keys (RS256, ES256...), install with rolf_common[jwt]
+    jwt = None
+
+# Use the local verification first, the auth service only for tokens it can't verify
+LOCAL_MODE = 'local'
+# Use the auth service, the local verification only when it is unavailable (or the circuit is open)
+FALLBACK_MODE = 'fallback'
+
+HMAC_ALGORITHMS = {
+    'HS256': hashlib.sha256,
+    'HS384': hashlib.sha384,
+    'HS512': hashlib.sha512,
+}
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+
+class LocalTokenVerifier:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Verify signed tokens (JWT) without calling the auth service: the signature with a shared secret (HMAC)
+        or the public keys of the auth service, the expiration, issuer and audience, and that the scopes
+        claim has all the required permissions. Tokens without the 'exp' or the user id claim are rejected.
+
+        verify returns None when the token can't be verified locally (not a JWT, unknown key or algorithm), so it
+        can be validated by the auth service. Invalid tokens raise a 401, like the auth service.
+    """
+
+    def __init__(self, secret: str | bytes | None = None, public_keys: dict[str | None, Any] | None = None,
+                 algorithms: Iterable[str] = ('HS256',), issuer: str | None = None, audience: str | None = None,
+                 user_id_claim: str = 'sub', scope_claims: Iterable[str] = ('scope', 'scopes', 'permissions'),
+                 leeway: float = 0.0, require_exp: bool = True, mode: str = LOCAL_MODE) -> None:
+        """
+        :param secret: The secret shared with the auth service, for HMAC algorithms
+        :param public_keys: The public keys (PEM or JWK dict) by key id (the 'kid' header, None for tokens without it)
+        :param algorithms: The algorithms accepted
+        :param issuer: The expected 'iss' claim, None to not check
+        :param audience: The expected 'aud' claim, None to not check
+        :param user_id_claim: The claim with the user id
+        :param scope_claims: The claims checked for the scopes, a space separated string or a list
+        :param leeway: Time, in seconds, accepted after the expiration (clock skew)
+        :param require_exp: Reject the tokens without the 'exp' claim, False only if the auth service issues
+            tokens that never expire
+        :param mode: 'local' or 'fallback', see LOCAL_MODE and FALLBACK_MODE
+        """
+        if mode not in (LOCAL_MODE, FALLBACK_MODE):
+            raise ValueError(f'Invalid verification mode {mode}')
+        if public_keys and jwt is None:
+            raise RuntimeError('PyJWT is not installed, install rolf_common[jwt] to verify tokens with public keys')
+
+        self.secret = secret.encode('utf-8') if isinstance(secret, str) else secret
+        self.algorithms = frozenset(algorithms)
+        self.issuer = issuer
+        self.audience = audience
+        self.user_id_claim = user_id_claim
+        self.scope_claims = tuple(scope_claims)
+        self.leeway = leeway
+        self.require_exp = require_exp
+        self.mode = mode
+
+        self._public_keys: dict[str | None, Any] = dict(public_keys or {})
+        self._prepared_keys: dict[tuple[str | None, str], Any] = {}
+
+        self.verified = 0
+        self.rejected = 0
+        self.skipped = 0
+
+    def load_jwks(self, jwks: dict[str, Any]) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Replace the public keys by the ones of a JWKS document ({'keys': [...]}),
+            e.g. fetched from the auth service
+        """
+        if jwt is None:
+            raise RuntimeError('PyJWT is not installed, install rolf_common[jwt] to verify tokens with public keys')
+        self._public_keys = {key.get('kid'): key for key in jwks.get('keys', [])}
+        self._prepared_keys.clear()
+
+    def verify(self, token: str, permissions: list[str]) -> RequiredUser | None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Verify the token and the permissions locally
+
+        :return: The user, or None if the token can't be verified locally
+        """
+        parts = token.split('.')
+        if len(parts) != 3:
+            self.skipped += 1
+            return None
+
+        try:
+            header = json.loads(_b64decode(parts[0]))
+            signature = _b64decode(parts[2])
+            signing_input = f'{parts[0]}.{parts[1]}'.encode('ascii')
+        except ValueError:
+            return self._reject()
+
+        algorithm = header.get('alg') if isinstance(header, dict) else None
+        if algorithm not in self.algorithms:
+            self.skipped += 1
+            return None
+
+        valid = self._verify_signature(algorithm, header.get('kid'), signing_input, signature)
+        if valid is None:
+            self.skipped += 1
+            return None
+        if not valid:
+            return self._reject()
+
+        try:
+            claims = json.loads(_b64decode(parts[1]))
+            if not isinstance(claims, dict) or not self._valid_claims(claims, permissions):
+                return self._reject()
+            user = RequiredUser(user_id=claims[self.user_id_claim])
+        except (ValueError, TypeError):
+            return self._reject()
+
+        self.verified += 1
+        return user
+
+    def _verify_signature(self, algorithm: str, key_id: str | None, signing_input: bytes,
+                          signature: bytes) -> bool | None:
+        if algorithm in HMAC_ALGORITHMS:
+            if self.secret is None:
+                return None
+            expected = hmac.new(self.secret, signing_input, HMAC_ALGORITHMS[algorithm]).digest()
+            return hmac.compare_digest(expected, signature)
+
+        if jwt is None or key_id not in self._public_keys:
+            return None
+
+        jwt_algorithm = jwt.get_algorithm_by_name(algorithm)
+        prepared_key = self._prepared_keys.get((key_id, algorithm))
+        if prepared_key is None:
+            key = self._public_keys[key_id]
+            prepared_key = jwt_algorithm.from_jwk(key) if isinstance(key, dict) else jwt_algorithm.prepare_key(key)
+            self._prepared_keys[(key_id, algorithm)] = prepared_key
+        return jwt_algorithm.verify(signing_input, prepared_key, signature)
+
+    def _valid_claims(self, claims: dict[str, Any], permissions: list[str]) -> bool:
+        now = time.time()
+        if 'exp' not in claims and self.require_exp:
+            return False
+        if 'exp' in claims and float(claims['exp']) + self.leeway < now:
+            return False
+        if 'nbf' in claims and float(claims['nbf']) - self.leeway > now:
+            return False
+        if self.issuer is not None and claims.get('iss') != self.issuer:
+            return False
+        if self.audience is not None:
+            audience = claims.get('aud')
+            audience = [audience] if isinstance(audience, str) else audience or []
+            if self.audience not in audience:
+                return False
+        if not claims.get(self.user_id_claim):
+            return False
+
+        return set(permissions).issubset(self._scopes(claims))
+
+    def _scopes(self, claims: dict[str, Any]) -> set[str]:
+        scopes = set()
+        for claim in self.scope_claims:
+            value = claims.get(claim)
+            if isinstance(value, str):
+                scopes.update(value.split())
+            elif isinstance(value, list):
+                scopes.update(value)
+        return scopes
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'verified': self.verified,
+            'rejected': self.rejected,
+            'skipped': self.skipped,
+        }
+
+
+_token_verifier: LocalTokenVerifier | None = None
+
+
+def set_token_verifier(verifier: LocalTokenVerifier | None):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Create a global variable to store the local token verifier used by get_user
+    """
+    global _token_verifier
+    _token_verifier = verifier
+
+
+def get_token_verifier() -> LocalTokenVerifier | None:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Get the local token verifier used by get_user, None if tokens are only validated by the auth service
+    """
+    return _token_verifier
+
+
+def build_token_verifier() -> LocalTokenVerifier | None:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Build the token verifier with the settings, None if auth_verification_mode is not set
+    """
+    if settings.auth_verification_mode is None:
+        return None
+    return LocalTokenVerifier(
+        secret=settings.auth_jwt_secret,
+        algorithms=settings.auth_jwt_algorithms,
+        issuer=settings.auth_jwt_issuer,
+        audience=settings.auth_jwt_audience,
+        mode=settings.auth_verification_mode,
+    )
@@ -1,46 +1,114 @@
+import time
+
 import httpx
 from httpx import AsyncClient
 from fastapi import Depends, HTTPException
 from fastapi import status
 from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 
+from rolf_common.backend.circuit_breaker import CircuitBreaker
+from rolf_common.backend.http_client import get_auth_client
 from rolf_common.backend.settings import settings
 from rolf_common.schemas.auth import RequiredUser
+from rolf_common.services.auth_cache import get_token_cache
+from rolf_common.services.token_verifier import FALLBACK_MODE, LOCAL_MODE, get_token_verifier
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 auth_service_base_url = settings.auth_service_base_url
 
 
+class AuthServiceUnavailable(HTTPException):
+    """The auth service could not validate the token (offline, slow, failing or the circuit is open)."""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail)
+
+
 async def get_user(permissions: SecurityScopes, token: str = Depends(oauth2_scheme)):
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Token not provided')
 
     permissions: list[str] = permissions.scopes
 
-    async with AsyncClient() as client:
-        payload = {
-            'accessToken': token,
-            'permissions': permissions
-        }
-        # TODO: add some verification to check if system is online, if not change to backup or offline check
-        try:
-            auth_response = await client.post(auth_service_base_url + '/validate/auth', json=payload)
-        except httpx.ConnectError as err:
-           raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail='Connection error with User Service')
-        except Exception as e:
-            raise e
-
-        if auth_response.status_code != status.HTTP_200_OK:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-
-        data = auth_response.json()
-        user_id = data.get('userId')
-
-        if not user_id:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
-
-        response = RequiredUser(
-            user_id=user_id,
-        )
-
-        return response
+    # Set with set_token_cache, the same token and scopes are not validated again for a short time
+    token_cache = get_token_cache()
+    if token_cache is not None:
+        return await token_cache.get_or_validate(token, permissions, validate_token)
+
+    return await validate_token(token, permissions)
+
+
+async def validate_token(token: str, permissions: list[str]) -> RequiredUser:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Validate the token and the permissions, locally if a token verifier is set (see set_token_verifier),
+        otherwise or when it can't verify the token, with the auth service
+    """
+    verifier = get_token_verifier()
+    if verifier is not None and verifier.mode == LOCAL_MODE:
+        user = verifier.verify(token, permissions)
+        if user is not None:
+            return user
+
+    try:
+        return await _validate_remote(token, permissions)
+    except AuthServiceUnavailable:
+        if verifier is not None and verifier.mode == FALLBACK_MODE:
+            user = verifier.verify(token, permissions)
+            if user is not None:
+                return user
+        raise
+
+
+async def _validate_remote(token: str, permissions: list[str]) -> RequiredUser:
+    payload = {
+        'accessToken': token,
+        'permissions': permissions
+    }
+
+    # The process-wide client is set by auth_client_lifespan, without it a client is opened for each request
+    auth_client = get_auth_client()
+    if auth_client is not None:
+        auth_response = await _post_validate(auth_client.client, payload, auth_client.breaker)
+    else:
+        async with AsyncClient() as client:
+            auth_response = await _post_validate(client, payload)
+
+    if auth_response.status_code != status.HTTP_200_OK:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    data = auth_response.json()
+    user_id = data.get('userId')
+
+    if not user_id:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+    response = RequiredUser(
+        user_id=user_id,
+    )
+
+    return response
+
+
+async def _post_validate(client: AsyncClient, payload: dict, breaker: CircuitBreaker | None = None) -> httpx.Response:
+    if breaker is not None and not breaker.allow_request():
+        raise AuthServiceUnavailable('User Service is unavailable')
+
+    start = time.perf_counter()
+    try:
+        response = await client.post(auth_service_base_url + '/validate/auth', json=payload)
+    except httpx.TransportError as err:
+        if breaker is not None:
+            breaker.record_failure()
+        if isinstance(err, httpx.TimeoutException):
+            raise AuthServiceUnavailable('Timeout calling User Service')
+        raise AuthServiceUnavailable('Connection error with User Service')
+
+    if response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+        if breaker is not None:
+            breaker.record_failure()
+        raise AuthServiceUnavailable('User Service error')
+
+    if breaker is not None:
+        breaker.record_success(time.perf_counter() - start)
+    return response
@@ -0,0 +1,170 @@
+import logging
+from urllib.parse import parse_qsl
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from rolf_common import base_middleware
+from rolf_common.base_middleware import LogsMiddleware, RequestLogSampler
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def log_handler(monkeypatch):
+    handler = ListHandler()
+    logger = logging.getLogger("test_base_middleware")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    monkeypatch.setattr(base_middleware, "get_logger", lambda: logger)
+    yield handler
+    logger.removeHandler(handler)
+
+
+def build_app(max_body_bytes=4096, sampler=None):
+    app = FastAPI()
+    app.add_middleware(LogsMiddleware, max_body_bytes=max_body_bytes, sampler=sampler)
+
+    @app.post("/items/{item_id}")
+    async def create_item(item_id: int, payload: dict):
+        return {"item_id": item_id, **payload}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(100):
+                yield b"x" * 1000
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.post("/token")
+    async def token(request: Request):
+        # parsed by hand, request.form() requires python-multipart
+        form = dict(parse_qsl((await request.body()).decode()))
+        return {"accessToken": "abc", "refresh_token": "def", "user": form["username"]}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/fail")
+    async def fail():
+        raise HTTPException(status_code=503, detail="unavailable")
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_logs_request(log_handler):
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/items/1?full=true", json={"name": "Item"})
+
+    assert response.json() == {"item_id": 1, "name": "Item"}
+
+    record = log_handler.records[0]
+    message = record.request_log
+    assert record.is_request
+    assert record.getMessage() == "POST /items/1 200"
+    assert message["path"] == "/items/1"
+    assert message["path_params"] == {"item_id": "1"}
+    assert message["query_params"] == {"full": "true"}
+    assert message["request_body"] == {"name": "Item"}
+    assert message["status_code"] == 200
+    assert message["response_body"] == {"item_id": 1, "name": "Item"}
+    assert message["latency_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_is_not_buffered(log_handler):
+    transport = httpx.ASGITransport(app=build_app(max_body_bytes=100))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/stream")
+
+    assert len(response.content) == 100000
+
+    # only the first 100 bytes are kept, plain text can't be redacted so only its size is logged
+    message = log_handler.records[0].request_log
+    assert message["response_body"] == "<unparsed 100 bytes>"
+
+
+@pytest.mark.asyncio
+async def test_redacts_sensitive_data(log_handler):
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post(
+            "/items/1?token=abc&full=true",
+            json={"name": "Item", "password": "secret", "nested": {"accessToken": "abc"}},
+            headers={"Authorization": "Bearer abc", "Cookie": "session=abc"},
+        )
+
+    message = log_handler.records[0].request_log
+    assert message["request_headers"]["authorization"] == "***"
+    assert message["request_headers"]["cookie"] == "***"
+    assert message["request_body"] == {"name": "Item", "password": "***", "nested": {"accessToken": "***"}}
+    assert message["query_params"] == {"token": "***", "full": "true"}
+    assert message["url"] == "http://test/items/1"
+
+
+@pytest.mark.asyncio
+async def test_redacts_form_bodies_and_responses(log_handler):
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/token", data={"username": "ana", "password": "secret"})
+
+    assert response.json()["accessToken"] == "abc"
+
+    message = log_handler.records[0].request_log
+    assert message["request_body"] == {"username": "ana", "password": "***"}
+    assert message["response_body"] == {"accessToken": "***", "refresh_token": "***", "user": "ana"}
+
+
+@pytest.mark.asyncio
+async def test_truncated_json_body_is_not_logged(log_handler):
+    transport = httpx.ASGITransport(app=build_app(max_body_bytes=20))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.post("/items/1", json={"name": "Item", "password": "a long secret value"})
+
+    message = log_handler.records[0].request_log
+    assert message["request_body"] == "<unparsed 20 bytes>"
+    assert message["response_body"] == "<unparsed 20 bytes>"
+
+
+@pytest.mark.asyncio
+async def test_sampling_keeps_errors_and_skips_excluded_paths(log_handler):
+    sampler = RequestLogSampler(default_rate=0, slow_threshold_ms=None)
+    transport = httpx.ASGITransport(app=build_app(sampler=sampler))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/health")
+        for i in range(10):
+            await client.post("/items/1", json={"name": "Item"})
+        await client.request("GET", "/fail", json={"name": "Item"})
+
+    assert [i.request_log["path"] for i in log_handler.records] == ["/fail"]
+    # the body of a request not sampled at the start is not captured
+    assert log_handler.records[0].request_log["status_code"] == 503
+    assert log_handler.records[0].request_log["request_body"] is None
+
+
+def test_sampler_rates():
+    sampler = RequestLogSampler(path_rates={"/books": 0, "/books/public": 1}, status_rates={"4xx": 0})
+
+    assert sampler.is_excluded("/health/ready")
+    assert not sampler.head_sample("/books/1")
+    assert sampler.head_sample("/books/public/1")
+    assert sampler.head_sample("/authors")
+
+    assert not sampler.should_log(True, 404, 1)
+    assert sampler.should_log(True, 200, 1)
+    assert sampler.should_log(False, 500, 1)
+    assert sampler.should_log(False, 200, 5000)
+    assert not sampler.should_log(False, 200, 1)
@@ -1,56 +1,142 @@
 import inspect
+from functools import cache
 from typing import Any
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Max number of kwargs names whose extraction is kept for each resolver
+MAX_PLANS = 64
+
+_MISSING = object()
+# The extraction depends on the values of the kwargs, not only on their names
+_BY_CONTENT = object()
 
 
 def validate_graphql_input(input_model: type[BaseModel]):
     def decorator(resolver):
+        func_name = resolver.__name__
         sig = inspect.signature(resolver)
         resolver_params = list(sig.parameters.values())
 
-        async def wrapper(*args, **kwargs):
-            func_name = resolver.__name__
+        # Resolved once, the same for every call of the resolver
+        model_fields = frozenset(input_model.model_fields)
+        target_param = _find_target_param(resolver_params, input_model)
+        list_adapter = _list_adapter(input_model)
+        # When the injected kwargs fit the signature, a specialized wrapper calls the resolver directly for the
+        # (obj, info, **kwargs) calls made by Ariadne, without binding the parameters on every call
+        fast_call = _binds(sig, {target_param: None} if target_param else dict.fromkeys(model_fields))
+
+        # How the validation data is taken from the kwargs, by their names. Ariadne passes the arguments of the
+        # field, so the same few names repeat and are resolved once
+        plans: dict[tuple[str, ...], Any] = {}
+
+        def validate_input(kwargs):
+            names = tuple(kwargs)
+            plan = plans.get(names, _MISSING)
+            if plan is _MISSING:
+                plan = _extraction_plan(names, model_fields)
+                if len(plans) < MAX_PLANS:
+                    plans[names] = plan
+
+            if plan is None:
+                validation_data = kwargs
+            elif plan is _BY_CONTENT:
+                validation_data = _extract_validation_data(kwargs, model_fields)
+            else:
+                # A single argument holding the input, e.g. input={...}
+                validation_data = kwargs[plan]
+                if not isinstance(validation_data, (dict, list)):
+                    validation_data = kwargs
 
+            try:
+                if isinstance(validation_data, list):
+                    # A list input is validated in a single call
+                    if not target_param:
+                        raise TypeError(
+                            f"Resolver '{func_name}' has no parameter to receive a list of {input_model.__name__}"
+                        )
+                    return list_adapter.validate_python(validation_data)
+                return input_model.model_validate(validation_data)
+            except ValidationError as ve:
+                raise Exception(
+                    f"Input validation error in resolver '{func_name}': {ve}"
+                ) from ve
+
+        async def wrapper(*args, **kwargs):
             # Ariadne always requires at least (obj, info)
             if len(args) < 2:
                 raise ValueError(
                     f"Resolver '{func_name}' must have at least (obj, info)"
                 )
 
-            try:
-                validation_data = _extract_validation_data(kwargs, input_model)
-                validated_input = input_model.model_validate(validation_data)
+            validated_input = validate_input(kwargs)
 
-                target_param = _find_target_param(resolver_params, input_model)
+            if target_param:
+                # Inject only the validated object
+                new_kwargs = {target_param: validated_input}
+            else:
+                # Inject all model fields as kwargs
+                new_kwargs = validated_input.model_dump()
 
-                if target_param:
-                    # Inject only the validated object
-                    new_kwargs = {target_param: validated_input}
-                else:
-                    # Inject all model fields as kwargs
-                    new_kwargs = validated_input.model_dump()
+            try:
+                bound = sig.bind(*args, **new_kwargs)
+            except TypeError as e:
+                raise TypeError(
+                    f"Error binding parameters for resolver '{func_name}': {e}"
+                )
 
-                try:
-                    bound = sig.bind(*args, **new_kwargs)
-                except TypeError as e:
-                    raise TypeError(
-                        f"Error binding parameters for resolver '{func_name}': {e}"
-                    )
+            return await resolver(*bound.args, **bound.kwargs)
 
-                return await resolver(*bound.args, **bound.kwargs)
+        async def target_wrapper(*args, **kwargs):
+            if len(args) != 2:
+                return await wrapper(*args, **kwargs)
+            return await resolver(args[0], args[1], **{target_param: validate_input(kwargs)})
 
-            except ValidationError as ve:
-                raise Exception(
-                    f"Input validation error in resolver '{func_name}': {ve}"
-                ) from ve
+        async def fields_wrapper(*args, **kwargs):
+            if len(args) != 2:
+                return await wrapper(*args, **kwargs)
+            return await resolver(args[0], args[1], **validate_input(kwargs).model_dump())
 
-        return wrapper
+        if not fast_call:
+            return wrapper
+        return target_wrapper if target_param else fields_wrapper
 
     return decorator
 
 
-def _extract_validation_data(kwargs: dict[str, Any], input_model: type[BaseModel]):
+@cache
+def _list_adapter(input_model: type[BaseModel]) -> TypeAdapter:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the TypeAdapter that validates a list of the input model, built once per model
+    """
+    return TypeAdapter(list[input_model])
+
+
+def _binds(sig: inspect.Signature, kwargs: dict[str, Any]) -> bool:
+    """
+    Check if the resolver accepts (obj, info, **kwargs).
+    """
+    try:
+        sig.bind(None, None, **kwargs)
+    except TypeError:
+        return False
+    return True
+
+
+def _extraction_plan(names: tuple[str, ...], model_fields: frozenset[str]):
+    """
+    Decide, from the kwargs names, how _extract_validation_data takes the data: None for the kwargs themselves,
+    the name of the single kwarg (used if its value is a dict or a list), or _BY_CONTENT if it depends on the values.
+    """
+    if not model_fields.isdisjoint(names):
+        return None
+    if len(names) == 1:
+        return names[0]
+    return _BY_CONTENT
+
+
+def _extract_validation_data(kwargs: dict[str, Any], model_fields: frozenset[str]):
     """
     Extract the dictionary that corresponds to the input model.
 
@@ -59,23 +145,36 @@ def _extract_validation_data(kwargs: dict[str, Any], input_model: type[BaseModel
     - resolver(input={...})
     - resolver(params={...})
     - resolver(input={params:{...}})
+    - resolver(input=[{...}, {...}]), validated as a list
     """
 
-    model_fields = set(input_model.model_fields.keys())
-
     # 1. Direct match: some kwarg matches model fields
-    if model_fields.intersection(kwargs.keys()):
+    if not model_fields.isdisjoint(kwargs):
         return kwargs
 
     # 2. Single dict in kwargs → assume it's the payload
-    dict_values = [v for v in kwargs.values() if isinstance(v, dict)]
-    if len(dict_values) == 1:
-        return dict_values[0]
+    dict_value = None
+    dict_count = 0
+    list_values = []
+    for value in kwargs.values():
+        if isinstance(value, dict):
+            dict_value = value
+            dict_count += 1
+        elif isinstance(value, list):
+            list_values.append(value)
+
+    if dict_count == 1:
+        return dict_value
 
     # 3. Nested dict -> search for first matching dict
-    for key, value in kwargs.items():
-        if isinstance(value, dict) and model_fields.intersection(value.keys()):
-            return value
+    if dict_count:
+        for value in kwargs.values():
+            if isinstance(value, dict) and not model_fields.isdisjoint(value):
+                return value
+
+    # 4. Single list in kwargs → a list of inputs
+    elif len(list_values) == 1:
+        return list_values[0]
 
     # Fallback: return kwargs as-is (may fail validation)
     return kwargs
@@ -0,0 +1,151 @@
+import asyncio
+from typing import Any, Iterable, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from rolf_common.managers.base import BaseDataManager
+from rolf_common.models.base import SQLModel
+
+LOADER_CONTEXT_KEY = 'loader'
+
+
+class BatchLoader:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        Request scoped loader that batches model lookups by id (DataLoader pattern).
+
+        All load/load_many calls made in the same event loop iteration are collected and resolved with
+        a single SELECT ... WHERE id IN (...) per model (chunked by BaseDataManager.get_by_ids).
+        The results are memoized, so an id is fetched at most once per loader.
+        Dispatches run one at a time, since they share the request session: the loads made while a dispatch is
+        running are collected and fetched after it.
+    """
+
+    def __init__(self, session: AsyncSession, data_manager: BaseDataManager | None = None) -> None:
+        """
+        :param session: The request session
+        :param data_manager: The data manager used to fetch the models, default is a BaseDataManager over the session
+        """
+        self.data_manager = data_manager or BaseDataManager(session)
+        self._memo: dict[tuple[Type[SQLModel], str], asyncio.Future] = {}
+        self._pending: dict[Type[SQLModel], dict[str, tuple[Any, asyncio.Future]]] = {}
+        self._dispatch_scheduled = False
+        self._dispatch_tasks: set[asyncio.Task] = set()
+        self._dispatch_lock = asyncio.Lock()
+
+    async def load(self, sql_model: Type[SQLModel], object_id: Any) -> SQLModel | None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Load one model by id, return None if not found
+        """
+        return await self._future(sql_model, object_id)
+
+    async def load_many(self, sql_model: Type[SQLModel], object_ids: Iterable[Any]) -> list[SQLModel | None]:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Load a list of models by id, in the same order. Ids not found are returned as None
+        """
+        futures = [self._future(sql_model, i) for i in object_ids]
+        return list(await asyncio.gather(*futures))
+
+    def prime(self, sql_model: SQLModel) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Store an already fetched model, so loading its id does not query the database
+        """
+        key = (type(sql_model), str(sql_model.id))
+        if key not in self._memo:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(sql_model)
+            self._memo[key] = future
+
+    def clear(self, sql_model: Type[SQLModel] | None = None) -> None:
+        """
+        Created by: Lucas Penha de Moura - 16/10/2026
+            Clear the memoized results, of all models or only of the given one
+        """
+        if sql_model is None:
+            self._memo.clear()
+            return
+
+        for key in [i for i in self._memo if i[0] is sql_model]:
+            del self._memo[key]
+
+    def _future(self, sql_model: Type[SQLModel], object_id: Any) -> asyncio.Future:
+        # GraphQL ids are strings, convert them to the column type (e.g. UUID)
+        python_type = sql_model.id.type.python_type
+        if not isinstance(object_id, python_type):
+            object_id = python_type(object_id)
+
+        key = (sql_model, str(object_id))
+        future = self._memo.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._memo[key] = future
+        self._pending.setdefault(sql_model, {})[key[1]] = (object_id, future)
+
+        if not self._dispatch_scheduled:
+            # Run after the callbacks already scheduled, so the loads of the sibling resolvers are collected
+            self._dispatch_scheduled = True
+            loop.call_soon(self._start_dispatch)
+
+        return future
+
+    def _start_dispatch(self) -> None:
+        task = asyncio.get_running_loop().create_task(self._dispatch())
+        # Keep a reference, otherwise the task may be garbage collected before finishing
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self) -> None:
+        # An AsyncSession does not support concurrent queries, wait for the running dispatch
+        async with self._dispatch_lock:
+            pending = self._pending
+            self._pending = {}
+            self._dispatch_scheduled = False
+
+            for sql_model, entries in pending.items():
+                await self._fetch(sql_model, entries)
+
+    async def _fetch(self, sql_model: Type[SQLModel], entries: dict[str, tuple[Any, asyncio.Future]]) -> None:
+        try:
+            objects = await self.data_manager.get_by_ids(sql_model, [i[0] for i in entries.values()])
+        except Exception as e:
+            for key, (_, future) in entries.items():
+                # Failed loads are not memoized, so they can be retried
+                self._memo.pop((sql_model, key), None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        found = {str(i.id): i for i in objects}
+        for key, (_, future) in entries.items():
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+def attach_loader(context: dict[str, Any], session: AsyncSession,
+                  data_manager: BaseDataManager | None = None) -> BatchLoader:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Create a loader for the request and store it in the GraphQL context.
+        Should be called when building the context_value of each request.
+    """
+    loader = BatchLoader(session, data_manager)
+    context[LOADER_CONTEXT_KEY] = loader
+    return loader
+
+
+def get_loader(info) -> BatchLoader:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Get the request loader from the resolver info
+    """
+    try:
+        return info.context[LOADER_CONTEXT_KEY]
+    except KeyError:
+        raise RuntimeError("Loader is not attached to the GraphQL context, use attach_loader")
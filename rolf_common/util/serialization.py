@@ -0,0 +1,106 @@
+from collections.abc import Mapping
+from functools import cache
+from typing import Any, Iterable
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from rolf_common.models.base import SQLModel
+
+try:
+    import orjson
+except ImportError:  # optional backend, install with rolf_common[orjson]
+    orjson = None
+
+PYDANTIC_BACKEND = 'pydantic'
+ORJSON_BACKEND = 'orjson'
+
+
+def _to_builtin(value: Any) -> Any:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Convert the values the JSON backends don't know into dicts
+    """
+    if isinstance(value, SQLModel):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        # RowMapping fetched with get_all
+        return dict(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+@cache
+def schema_fields(schema: type[BaseModel]) -> tuple[tuple[str, str], ...]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Return the (field name, serialization alias) pairs of a schema, e.g. the camelCase aliases of DefaultModel
+    """
+    return tuple(
+        (name, field.serialization_alias or field.alias or name)
+        for name, field in schema.model_fields.items()
+    )
+
+
+def project_rows(rows: Iterable[SQLModel | Mapping[str, Any]], schema: type[BaseModel]) -> list[dict[str, Any]]:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Build the response dicts of a list of models or RowMappings using the fields and aliases of a schema,
+        without validating each row with the schema (from_attributes).
+
+        Only flat schemas are supported, nested values are kept as they are.
+        When a RowMapping holds a single model (e.g. select(Model)), the model is used.
+
+    :param rows: The models or mappings fetched from the database
+    :param schema: The response schema, usually a DefaultModel
+    :return: The list of dicts keyed by the schema aliases
+    """
+    fields = schema_fields(schema)
+    projected = []
+
+    for row in rows:
+        if isinstance(row, Mapping) and len(row) == 1:
+            value = next(iter(row.values()))
+            if isinstance(value, SQLModel):
+                row = value
+
+        values = row.to_dict() if isinstance(row, SQLModel) else row
+        projected.append({alias: values[name] for name, alias in fields if name in values})
+
+    return projected
+
+
+def dumps(content: Any, backend: str = PYDANTIC_BACKEND) -> bytes:
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+        Serialize the content straight to JSON bytes.
+
+        Models, RowMappings and pydantic schemas (by alias) are serialized in a single pass, UUIDs and timezone aware
+        datetimes are handled by the backend itself, so there's no need to run jsonable_encoder before.
+
+    :param content: The content to be serialized
+    :param backend: 'pydantic' (pydantic-core to_json) or 'orjson', if installed
+    :return: The JSON bytes
+    """
+    if backend == ORJSON_BACKEND:
+        if orjson is None:
+            raise RuntimeError('orjson is not installed, install rolf_common[orjson]')
+        return orjson.dumps(content, default=_to_builtin, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+    return to_json(content, by_alias=True, fallback=_to_builtin)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Created by: Lucas Penha de Moura - 16/10/2026
+
+        JSON response rendered with dumps. Return it from the endpoint to skip FastAPI response model
+        validation and jsonable_encoder.
+    """
+    backend: str = PYDANTIC_BACKEND
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content, self.backend)
@@ -0,0 +1,80 @@
+import pytest
+from pydantic import BaseModel
+
+from rolf_common.util.graphql_input_validation import validate_graphql_input
+
+
+class BookInput(BaseModel):
+    title: str
+    pages: int = 0
+
+
+@pytest.mark.asyncio
+async def test_injects_validated_object():
+    @validate_graphql_input(BookInput)
+    async def resolve_create_book(obj, info, book_input: BookInput):
+        return book_input
+
+    book = await resolve_create_book(None, None, input={"title": "Dune", "pages": "412"})
+    assert book == BookInput(title="Dune", pages=412)
+
+    book = await resolve_create_book(None, None, title="Dune")
+    assert book == BookInput(title="Dune")
+
+
+@pytest.mark.asyncio
+async def test_injects_fields():
+    @validate_graphql_input(BookInput)
+    async def resolve_create_book(obj, info, title, pages):
+        return title, pages
+
+    assert await resolve_create_book(None, None, params={"title": "Dune", "pages": 1}) == ("Dune", 1)
+
+
+@pytest.mark.asyncio
+async def test_validates_list_input():
+    @validate_graphql_input(BookInput)
+    async def resolve_create_books(obj, info, books_input: list[BookInput]):
+        return books_input
+
+    books = await resolve_create_books(None, None, input=[{"title": "Dune"}, {"title": "Emma", "pages": 2}])
+    assert books == [BookInput(title="Dune"), BookInput(title="Emma", pages=2)]
+
+    with pytest.raises(Exception, match="Input validation error in resolver 'resolve_create_books'"):
+        await resolve_create_books(None, None, input=[{"title": "Dune"}, {"pages": 2}])
+
+
+@pytest.mark.asyncio
+async def test_requires_obj_and_info():
+    @validate_graphql_input(BookInput)
+    async def resolve_create_book(obj, info, book_input):
+        return book_input
+
+    with pytest.raises(ValueError):
+        await resolve_create_book(None, title="Dune")
+
+
+@pytest.mark.asyncio
+async def test_binding_error():
+    @validate_graphql_input(BookInput)
+    async def resolve_create_book(obj, info, title, author):
+        return title
+
+    with pytest.raises(TypeError, match="Error binding parameters"):
+        await resolve_create_book(None, None, title="Dune")
+
+
+@pytest.mark.asyncio
+async def test_extraction_follows_the_kwargs_values():
+    @validate_graphql_input(BookInput)
+    async def resolve_create_book(obj, info, book_input: BookInput):
+        return book_input
+
+    # Same names, the dict holding the input depends on its content
+    assert await resolve_create_book(None, None, a={"title": "Dune"}, b={"other": 1}) == BookInput(title="Dune")
+    assert await resolve_create_book(None, None, a={"other": 1}, b={"title": "Emma"}) == BookInput(title="Emma")
+
+    # Same name, other types
+    assert await resolve_create_book(None, None, input={"title": "Dune"}) == BookInput(title="Dune")
+    with pytest.raises(Exception, match="Input validation error"):
+        await resolve_create_book(None, None, input="Dune")
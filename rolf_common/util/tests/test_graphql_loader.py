@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from rolf_common.conftest import count_statements
+from rolf_common.managers import BaseDataManager
+from rolf_common.models.tests.dummy import DummyModel
+from rolf_common.util.graphql_loader import attach_loader, get_loader
+
+
+@pytest.mark.asyncio
+async def test_loader_batches_loads(session, async_engine):
+    objects = await BaseDataManager(session).add_all([DummyModel(name=f"Loader {i}") for i in range(5)])
+    ids = [i.id for i in objects]
+
+    info = SimpleNamespace(context={})
+    attach_loader(info.context, session)
+
+    async def resolver(object_id):
+        return await get_loader(info).load(DummyModel, object_id)
+
+    with count_statements(async_engine) as statements:
+        # Every id requested twice, as sibling resolvers would do
+        loaded = await asyncio.gather(*[resolver(i) for i in ids + ids])
+        many = await get_loader(info).load_many(DummyModel, ids)
+
+    assert [i.id for i in loaded] == ids + ids
+    assert many == loaded[:5]
+    assert len(statements) == 1
+    assert "IN" in statements[0]
+
+
+@pytest.mark.asyncio
+async def test_loader_missing_id(session):
+    loader = attach_loader({}, session)
+    existing = await BaseDataManager(session).add_one(DummyModel(name="Loader missing"))
+
+    loaded = await loader.load_many(DummyModel, [existing.id, "00000000-0000-0000-0000-000000000000"])
+
+    assert loaded == [existing, None]
+
+
+class SlowDataManager(BaseDataManager):
+    def __init__(self, session):
+        super().__init__(session)
+        self.running = 0
+        self.max_running = 0
+        self.batches = []
+
+    async def get_by_ids(self, sql_model, object_ids):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.batches.append(len(object_ids))
+        try:
+            await asyncio.sleep(0.02)
+            return await super().get_by_ids(sql_model, object_ids)
+        finally:
+            self.running -= 1
+
+
+@pytest.mark.asyncio
+async def test_loader_serializes_dispatches(session):
+    objects = await BaseDataManager(session).add_all([DummyModel(name=f"Loader serial {i}") for i in range(4)])
+    ids = [i.id for i in objects]
+    data_manager = SlowDataManager(session)
+    loader = attach_loader({}, session, data_manager)
+
+    first = asyncio.create_task(loader.load(DummyModel, ids[0]))
+    while not data_manager.running:
+        await asyncio.sleep(0)
+
+    # Loads made while the first dispatch is in flight are fetched after it, in one batch
+    loaded = await loader.load_many(DummyModel, ids[1:])
+
+    assert await first == objects[0]
+    assert loaded == objects[1:]
+    assert data_manager.max_running == 1
+    assert data_manager.batches == [1, 3]
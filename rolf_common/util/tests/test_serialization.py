@@ -0,0 +1,56 @@
+import datetime
+import json
+import uuid
+
+import pytest
+from pydantic import ConfigDict
+from sqlalchemy import select
+
+from rolf_common.managers import BaseDataManager
+from rolf_common.models.tests.dummy import DummyModel
+from rolf_common.schemas import SuccessResponseBase
+from rolf_common.schemas.base import DefaultModel
+from rolf_common.util import serialization
+from rolf_common.util.serialization import FastJSONResponse, dumps, project_rows
+
+
+class DummySchema(DefaultModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: uuid.UUID
+    name: str
+    created_at: datetime.datetime
+
+
+def test_dumps_models_and_schemas():
+    created_at = datetime.datetime(2024, 1, 1, 12, tzinfo=datetime.timezone.utc)
+    obj = DummyModel(id=uuid.uuid4(), name="Json", created_at=created_at)
+    schema = DummySchema(id=obj.id, name="Json", createdAt=created_at)
+
+    content = json.loads(dumps({"model": obj, "schema": schema, "response": SuccessResponseBase(status_code=200)}))
+
+    assert content["model"]["id"] == str(obj.id)
+    assert content["model"]["created_at"] == "2024-01-01T12:00:00Z"
+    assert content["schema"] == {"id": str(obj.id), "name": "Json", "createdAt": "2024-01-01T12:00:00Z"}
+    assert content["response"] == {"success": True, "statusCode": 200}
+
+
+@pytest.mark.skipif(serialization.orjson is None, reason="orjson is not installed")
+def test_dumps_backends_match():
+    obj = DummyModel(id=uuid.uuid4(), name="Json", created_at=datetime.datetime.now(datetime.timezone.utc))
+    content = [obj, DummySchema.model_validate(obj)]
+
+    assert json.loads(dumps(content, backend="orjson")) == json.loads(dumps(content))
+
+
+@pytest.mark.asyncio
+async def test_project_rows(session):
+    manager = BaseDataManager(session)
+    await manager.add_all([DummyModel(name=f"Project {i}") for i in range(3)])
+    rows = await manager.get_all(select(DummyModel).where(DummyModel.name.like("Project %")))
+
+    projected = project_rows(rows, DummySchema)
+    expected = [DummySchema.model_validate(i["DummyModel"]).model_dump(by_alias=True) for i in rows]
+
+    assert projected == expected
+    assert json.loads(FastJSONResponse(projected).body) == json.loads(dumps(expected))
@@ -14,4 +14,10 @@ setup(
     install_requires=[
         'motor'
     ],
+    extras_require={
+        'orjson': ['orjson'],
+        'http2': ['httpx[http2]'],
+        'jwt': ['pyjwt[crypto]'],
+        'arrow': ['pyarrow>=18', 'numpy'],
+    },
 )
\ No newline at end of file